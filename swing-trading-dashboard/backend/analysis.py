@@ -0,0 +1,266 @@
+"""
+Per-ticker analysis — every engine for one ticker, as a pure function.
+
+analyze_ticker() takes the ticker's bars and the scan-wide SPY inputs and
+returns plain dicts.  It does no I/O and touches no shared state, so it can
+run in the default thread pool or in a long-lived process pool that
+create_pool() builds.  Process workers import the engines once at startup.
+They receive bars as compact numpy arrays (pack_bars) instead of pickled
+DataFrames.
+
+main._run_scan owns everything with side effects: persisting zones, adding
+sectors, counting and logging setups.
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from constants import MIN_CANDLES_FOR_RS
+from engines.engine1 import calculate_sr_zones
+from engines.engine2 import detect_trendline, scan_near_breakout, scan_vcp
+from engines.engine3 import scan_pullback, scan_relaxed_pullback
+from engines.engine4 import calculate_rs_line, detect_rs_blue_dot
+from engines.engine5 import scan_base_pattern
+from indicators import IndicatorContext
+
+log = logging.getLogger("swing")
+
+# Result keys holding a setup dict (or None), in the order main collects them
+SETUP_KEYS = ("vcp", "near", "pullback", "relaxed_pullback", "base")
+
+
+# ── Bar transport ───────────────────────────────────────────────────────────
+
+def pack_bars(df: Optional[pd.DataFrame]) -> Optional[Dict]:
+    """Compact, pickle-friendly form of a flat OHLCV frame (numpy arrays only)."""
+    if df is None:
+        return None
+    index = df.index
+    tz = getattr(index, "tz", None)
+    return {
+        "index": index.tz_convert("UTC").tz_localize(None).to_numpy() if tz is not None else index.to_numpy(),
+        "tz": str(tz) if tz is not None else None,
+        "name": index.name,
+        "columns": {str(col): df[col].to_numpy() for col in df.columns},
+    }
+
+
+def unpack_bars(packed: Optional[Dict]) -> Optional[pd.DataFrame]:
+    """Inverse of pack_bars."""
+    if packed is None:
+        return None
+    index = pd.DatetimeIndex(packed["index"], name=packed["name"])
+    if packed["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(packed["tz"])
+    return pd.DataFrame(packed["columns"], index=index)
+
+
+# ── Analysis ────────────────────────────────────────────────────────────────
+
+def _floats(setup: Dict, fields: Dict[str, float]) -> None:
+    """Coerce numeric fields to Python floats in place (raises ValueError/TypeError)."""
+    for key, default in fields.items():
+        setup[key] = float(setup.get(key, default))
+
+
+_TRADE_FIELDS = {"entry": 0.0, "stop_loss": 0.0, "take_profit": 0.0, "rr": 2.0}
+
+
+def analyze_ticker(
+    ticker: str,
+    df: pd.DataFrame,
+    spy_df: Optional[pd.DataFrame] = None,
+    spy_3m_return: float = 0.0,
+    gates: Optional[Dict[str, bool]] = None,
+    zones: Optional[List[Dict]] = None,
+) -> Dict:
+    """
+    Run every engine on one ticker's bars.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Flat, de-duplicated daily OHLCV with at least one valid close
+        (indicators.bar_view).  Shared read-only by every engine, never
+        copied; with DEBUG_READONLY_BARS set, a modification raises
+        AssertionError once the engines have run.
+    spy_df : pd.DataFrame, optional
+        SPY bars for the RS line; RS inputs stay neutral when omitted.
+    gates : dict, optional
+        prescreen verdicts; an engine (or upstream input) mapped to False is
+        skipped, and "vcp_u_shape" is handed to scan_vcp.
+    zones : list, optional
+        S/R zones already computed for the batch (calculate_sr_zones_batch);
+        computed here when None.
+
+    Returns
+    -------
+    dict
+        ``zones`` (list) and ``rs_blue_dot`` plus one entry per SETUP_KEYS
+        holding the sanitized setup dict or None.  A setup whose numbers
+        fail to convert ends the analysis early, keeping what was found.
+    """
+    gates = gates or {}
+    result: Dict = {"zones": [], "rs_blue_dot": False}
+    result.update(dict.fromkeys(SETUP_KEYS))
+    ctx = None
+    try:
+        # One shared indicator cache (and bar view) for every engine below
+        ctx = IndicatorContext(df)
+        df = ctx.df
+
+        # ── RS line + S/R zones ──────────────────────────────────────────
+        rs_line = None
+        rs_ratio = 0.0
+        rs_52w_high = 0.0
+        rs_blue_dot = False
+        if spy_df is not None:
+            try:
+                rs_line = calculate_rs_line(df, spy_df)
+            except Exception as exc:
+                log.warning("RS calculation failed for %s: %s", ticker, exc)
+        if zones is None:
+            zones = calculate_sr_zones(ticker, df, ctx) if gates.get("sr_zones", True) else []
+        result["zones"] = zones
+
+        if rs_line and len(rs_line) >= MIN_CANDLES_FOR_RS:
+            try:
+                # Use .item() to safely convert numpy scalars to Python floats
+                rs_today = rs_line[-1]
+                rs_ratio = float(rs_today.item() if hasattr(rs_today, 'item') else rs_today)
+
+                rs_max = max(rs_line)
+                rs_52w_high = float(rs_max.item() if hasattr(rs_max, 'item') else rs_max)
+
+                rs_blue_dot = detect_rs_blue_dot(rs_line)
+            except Exception as rs_exc:
+                log.warning("RS processing failed for %s: %s", ticker, rs_exc)
+                rs_ratio = 0.0
+                rs_52w_high = 0.0
+                rs_blue_dot = False
+        result["rs_blue_dot"] = rs_blue_dot
+
+        # Detect trendline early (used by VCP Path C, near-breakout and pullback)
+        tl = detect_trendline(ticker, df, ctx) if gates.get("trendline", True) else None
+
+        # ── Engine 2: VCP breakout, else near-breakout watchlist ─────────
+        vcp = None
+        if gates.get("vcp", True):
+            vcp = scan_vcp(ticker, df, zones, spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot, tl, ctx,
+                           gates.get("vcp_u_shape"))
+        if vcp:
+            try:
+                _floats(vcp, _TRADE_FIELDS)
+            except (ValueError, TypeError) as conv_err:
+                log.warning("VCP conversion failed for %s: %s", ticker, conv_err)
+                return result
+            result["vcp"] = vcp
+        elif gates.get("near_breakout", True):
+            try:
+                near = scan_near_breakout(ticker, df, zones, tl, ctx)
+                if near:
+                    try:
+                        _floats(near, {"entry": 0.0, "distance_pct": 0.0})
+                    except (ValueError, TypeError) as conv_err:
+                        log.warning("Near-breakout conversion failed for %s: %s", ticker, conv_err)
+                        return result
+                    near["rs_blue_dot"] = rs_blue_dot
+                    result["near"] = near
+            except Exception as near_exc:
+                log.warning("Near-breakout check failed for %s: %s", ticker, near_exc)
+
+        # ── Engine 3: Tactical pullback (strict, then relaxed) ───────────
+        pb = scan_pullback(ticker, df, zones, tl, ctx) if gates.get("pullback", True) else None
+        if pb:
+            try:
+                _floats(pb, _TRADE_FIELDS)
+            except (ValueError, TypeError) as conv_err:
+                log.warning("Pullback conversion failed for %s: %s", ticker, conv_err)
+                return result
+            result["pullback"] = pb
+        elif gates.get("relaxed_pullback", True):
+            try:
+                pb_relaxed = scan_relaxed_pullback(ticker, df, zones, tl, ctx)
+                if pb_relaxed:
+                    try:
+                        _floats(pb_relaxed, _TRADE_FIELDS)
+                    except (ValueError, TypeError) as conv_err:
+                        log.warning("Relaxed pullback conversion failed for %s: %s", ticker, conv_err)
+                        return result
+                    result["relaxed_pullback"] = pb_relaxed
+            except Exception as pb_rel_exc:
+                log.warning("Relaxed pullback check failed for %s: %s", ticker, pb_rel_exc)
+
+        # ── Engine 5: Base pattern (Cup & Handle / Flat Base) ────────────
+        try:
+            base = None
+            if gates.get("base", True):
+                base = scan_base_pattern(ticker, df, spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot, ctx)
+            if base:
+                try:
+                    _floats(base, _TRADE_FIELDS)
+                except (ValueError, TypeError) as conv_err:
+                    log.warning("Base pattern conversion failed for %s: %s", ticker, conv_err)
+                else:
+                    result["base"] = base
+        except Exception as base_exc:
+            log.warning("Base pattern check failed for %s: %s", ticker, base_exc)
+
+    except Exception as exc:
+        log.error("Error processing %s: %s", ticker, exc)
+        import traceback
+        log.error("Traceback for %s:\n%s", ticker, traceback.format_exc())
+    finally:
+        if ctx is not None:
+            ctx.assert_unchanged()
+    return result
+
+
+def analyze_packed(
+    ticker: str,
+    bars: Dict,
+    spy_bars: Optional[Dict],
+    spy_3m_return: float = 0.0,
+    gates: Optional[Dict[str, bool]] = None,
+    zones: Optional[List[Dict]] = None,
+) -> Dict:
+    """analyze_ticker on pack_bars payloads — the process-pool entry point."""
+    return analyze_ticker(ticker, unpack_bars(bars), unpack_bars(spy_bars), spy_3m_return, gates, zones)
+
+
+# ── Process pool ────────────────────────────────────────────────────────────
+
+def _init_worker() -> None:
+    # Engines are imported with this module; warm the SciPy kernels too so
+    # the first real ticker does not pay for lazy imports.
+    from scipy.stats import gaussian_kde  # noqa: F401
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s  %(levelname)-8s  %(message)s")
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def create_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """
+    Long-lived analysis worker pool (*workers* <= 0 means one per core).
+
+    Uses the spawn start method: the server process runs threads, which
+    must not be forked.  Every worker is started and warmed before this
+    returns, so the first scan does not pay the startup cost.
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    for future in [pool.submit(_ready) for _ in range(workers)]:
+        future.result()
+    log.info("Analysis pool ready: %d worker processes", workers)
+    return pool
@@ -0,0 +1,172 @@
+"""
+Columnar, memory-mapped bar archive for the whole universe.
+
+Layout:
+  CURRENT               name of the live version directory
+  v<ns>/index.json      ticker → {offset, length, tz, fields, synced_at}
+  v<ns>/dates.i8        int64 UTC nanoseconds, all tickers back to back
+  v<ns>/<field>.f64     one contiguous float64 array per OHLCV field
+
+Tickers occupy the same [offset, offset + length) slice in every array.
+Arrays are opened read-only with np.memmap, so building a ticker's DataFrame
+only maps pages in on first touch and the column data is never copied.
+
+Each write goes to a fresh version directory and then flips CURRENT, so
+readers holding memmaps of the previous version are never disturbed (and
+Windows never has to rename a directory with mapped files in it).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "index.json"
+DATES_FILE = "dates.i8"
+
+
+def _field_file(field: str) -> str:
+    return field.lower().replace(" ", "_") + ".f64"
+
+
+def _utc_nanos(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8
+
+
+def write_bar_archive(
+    root: str,
+    frames: Dict[str, pd.DataFrame],
+    synced_at: Optional[Dict[str, float]] = None,
+) -> None:
+    """
+    Write *frames* (ticker → daily OHLCV DataFrame) as a new archive version
+    under *root* and make it current.  Superseded versions are removed on a
+    best-effort basis (a version still mapped elsewhere is left for later).
+    """
+    synced_at = synced_at or {}
+    tickers = sorted(t for t, df in frames.items() if df is not None and not df.empty)
+    lengths = [len(frames[t]) for t in tickers]
+    total = int(sum(lengths))
+
+    os.makedirs(root, exist_ok=True)
+    version = f"v{time.time_ns()}"
+    vdir = os.path.join(root, version)
+    os.makedirs(vdir)
+    try:
+        index: Dict[str, Dict] = {}
+        dates = np.empty(total, dtype=np.int64)
+        columns = {f: np.full(total, np.nan, dtype=np.float64) for f in FIELDS}
+
+        offset = 0
+        for ticker, length in zip(tickers, lengths):
+            df = frames[ticker]
+            if isinstance(df.columns, pd.MultiIndex):
+                df = df.set_axis(df.columns.get_level_values(0), axis=1)
+            present: List[str] = []
+            for f in FIELDS:
+                if f in df.columns:
+                    columns[f][offset:offset + length] = df[f].to_numpy(dtype=np.float64)
+                    present.append(f)
+            dates[offset:offset + length] = _utc_nanos(pd.DatetimeIndex(df.index))
+            tz = getattr(df.index, "tz", None)
+            index[ticker] = {
+                "offset": offset,
+                "length": length,
+                "tz": str(tz) if tz is not None else None,
+                "index_name": df.index.name,
+                "fields": present,
+                "synced_at": synced_at.get(ticker),
+            }
+            offset += length
+
+        dates.tofile(os.path.join(vdir, DATES_FILE))
+        for f, arr in columns.items():
+            arr.tofile(os.path.join(vdir, _field_file(f)))
+        with open(os.path.join(vdir, INDEX_FILE), "w", encoding="utf-8") as fh:
+            json.dump({"total": total, "tickers": index}, fh)
+
+        fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(version)
+        os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    except Exception:
+        shutil.rmtree(vdir, ignore_errors=True)
+        raise
+
+    for name in os.listdir(root):
+        if name.startswith("v") and name != version:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+class BarArchive:
+    """Read-only view over an archive written by :func:`write_bar_archive`."""
+
+    def __init__(self, root: str) -> None:
+        with open(os.path.join(root, INDEX_FILE), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        self.root = root  # version directory
+        self.total = int(meta["total"])
+        self._index: Dict[str, Dict] = meta["tickers"]
+        self._dates = self._map(DATES_FILE, np.int64)
+        self._columns = {f: self._map(_field_file(f), np.float64) for f in FIELDS}
+
+    @classmethod
+    def open(cls, root: str) -> Optional["BarArchive"]:
+        """Open the current archive version under *root*, or return None if there is none."""
+        try:
+            with open(os.path.join(root, CURRENT_FILE), "r", encoding="utf-8") as fh:
+                version = fh.read().strip()
+        except FileNotFoundError:
+            return None
+        return cls(os.path.join(root, version))
+
+    def _map(self, name: str, dtype) -> np.ndarray:
+        if self.total == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.root, name), dtype=dtype, mode="r", shape=(self.total,))
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def tickers(self) -> Iterable[str]:
+        return self._index.keys()
+
+    def synced_at(self, ticker: str) -> Optional[float]:
+        entry = self._index.get(ticker)
+        return entry.get("synced_at") if entry else None
+
+    def arrays(self, ticker: str) -> Optional[Dict[str, np.ndarray]]:
+        """Zero-copy read-only slices for *ticker*: ``{"dates": int64 ns, <field>: float64}``."""
+        entry = self._index.get(ticker)
+        if entry is None:
+            return None
+        sl = slice(entry["offset"], entry["offset"] + entry["length"])
+        out = {"dates": self._dates[sl]}
+        for f in entry["fields"]:
+            out[f] = self._columns[f][sl]
+        return out
+
+    def frame(self, ticker: str) -> Optional[pd.DataFrame]:
+        """DataFrame for *ticker* whose columns are views onto the memory-mapped arrays."""
+        entry = self._index.get(ticker)
+        if entry is None:
+            return None
+        arrays = self.arrays(ticker)
+        index = pd.DatetimeIndex(arrays.pop("dates").view("M8[ns]"))
+        if entry["tz"] is not None:
+            index = index.tz_localize("UTC").tz_convert(entry["tz"])
+        index.name = entry.get("index_name")
+        return pd.DataFrame(arrays, index=index, copy=False)
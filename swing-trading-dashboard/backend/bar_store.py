@@ -0,0 +1,256 @@
+"""
+Persistent on-disk OHLCV bar store.
+
+One pickle file per ticker holds the daily bars last downloaded for it, so a
+scan only has to ask the data provider for the missing tail (the bars since
+the last stored date) instead of re-downloading the full history window.
+
+Files are written atomically (temp file + os.replace) so concurrent fetches
+of the same ticker from the scan and the chart endpoint never see a torn file.
+
+compact() folds all per-ticker files into the columnar memory-mapped archive
+(see bar_archive.py) under <root>/archive.  Tickers without a newer pickle
+are then served as zero-copy views onto that archive.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_archive import BarArchive, write_bar_archive
+from constants import BAR_STORE_DIR, BAR_STORE_MAX_AGE_SECONDS, DATA_FETCH_PERIOD
+
+log = logging.getLogger(__name__)
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+# Columns yfinance fills with non-zero values when a corporate action occurs.
+# Any of these in a freshly downloaded tail means the stored Adj Close history
+# has been rewritten upstream and the ticker must be re-downloaded in full.
+_CORPORATE_ACTION_COLS = ("Dividends", "Stock Splits")
+
+
+def period_to_offset(period: str) -> pd.DateOffset:
+    """Convert a yfinance period string (``"2y"``, ``"6mo"``, ``"30d"``) to a DateOffset."""
+    match = _PERIOD_RE.match(period)
+    if match is None:
+        raise ValueError(f"Unsupported period: {period!r}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return pd.DateOffset(days=n)
+    if unit == "wk":
+        return pd.DateOffset(weeks=n)
+    if unit == "mo":
+        return pd.DateOffset(months=n)
+    return pd.DateOffset(years=n)
+
+
+def has_corporate_action(tail: Optional[pd.DataFrame]) -> bool:
+    """Return True if *tail* contains a dividend or split row."""
+    if tail is None or tail.empty:
+        return False
+    for col in _CORPORATE_ACTION_COLS:
+        if col in tail.columns and (tail[col].fillna(0) != 0).any():
+            return True
+    return False
+
+
+def align_index(df: pd.DataFrame, like: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return *df* with its index in the timezone convention of *like*'s index.
+
+    yfinance's Ticker.history() labels daily bars with tz-aware exchange-local
+    midnights while yf.download() labels them with naive dates, and the two
+    cannot be compared or concatenated.  A naive label is read as the same
+    wall-clock date in *like*'s timezone; an aware label compared against a
+    naive store keeps its local date and drops the timezone.
+    """
+    tz = getattr(like.index, "tz", None)
+    if getattr(df.index, "tz", None) == tz:
+        return df
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        index = index.tz_localize(tz)
+    elif tz is None:
+        index = index.tz_localize(None)
+    else:
+        index = index.tz_convert(tz)
+    df = df.copy(deep=False)
+    df.index = index
+    return df
+
+
+# Columns the engines read; bars_fingerprint hashes only these
+FINGERPRINT_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+
+
+def bars_fingerprint(df: pd.DataFrame, salt: str = "") -> str:
+    """
+    Content hash of *df*'s index and OHLCV columns mixed with *salt*.
+
+    Equal fingerprints mean identical bar values, so anything computed purely
+    from the bars (and whatever *salt* encodes) can be reused.  Columns are
+    hashed as float64, since compaction stores an int64 Volume as float64.
+    Dividends and Stock Splits are left out: the engines never read them.
+    """
+    h = hashlib.blake2b(salt.encode(), digest_size=16)
+    # Stored and archived frames differ in datetime unit; hash epoch nanoseconds
+    h.update(np.ascontiguousarray(pd.DatetimeIndex(df.index).as_unit("ns").asi8).tobytes())
+    for col in FINGERPRINT_COLUMNS:
+        if col not in df.columns:
+            continue
+        h.update(str(col).encode())
+        h.update(np.ascontiguousarray(np.asarray(df[col], dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+class BarStore:
+    """Ticker-keyed store of daily OHLCV DataFrames under *root*."""
+
+    def __init__(
+        self,
+        root: str = BAR_STORE_DIR,
+        period: str = DATA_FETCH_PERIOD,
+        max_age_seconds: float = BAR_STORE_MAX_AGE_SECONDS,
+    ) -> None:
+        self.root = root
+        self.archive_root = os.path.join(root, "archive")
+        self.window = period_to_offset(period)
+        self.max_age_seconds = max_age_seconds
+        self._archive: Optional[BarArchive] = None
+        self._archive_loaded = False
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.pkl")
+
+    @property
+    def archive(self) -> Optional[BarArchive]:
+        if not self._archive_loaded:
+            try:
+                self._archive = BarArchive.open(self.archive_root)
+            except Exception as exc:  # noqa: BLE001
+                log.warning("Bar store: archive unreadable (%s), ignoring", exc)
+                self._archive = None
+            self._archive_loaded = True
+        return self._archive
+
+    def load(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Return the stored bars for *ticker*, or None if absent/unreadable."""
+        path = self.path(ticker)
+        try:
+            df = pd.read_pickle(path)
+        except FileNotFoundError:
+            archive = self.archive
+            if archive is not None and ticker.upper() in archive:
+                return archive.frame(ticker.upper())
+            return None
+        except Exception as exc:  # noqa: BLE001
+            log.warning("Bar store: unreadable file for %s (%s), ignoring", ticker, exc)
+            return None
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            return None
+        return df
+
+    def save(self, ticker: str, df: pd.DataFrame) -> None:
+        """Atomically write *df* as the stored bars for *ticker*."""
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, self.path(ticker))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def is_fresh(self, ticker: str) -> bool:
+        """True if *ticker* was synced with the provider within ``max_age_seconds``."""
+        try:
+            synced_at = os.path.getmtime(self.path(ticker))
+        except FileNotFoundError:
+            archive = self.archive
+            synced_at = archive.synced_at(ticker.upper()) if archive is not None else None
+        if synced_at is None:
+            return False
+        return time.time() - synced_at < self.max_age_seconds
+
+    def combine(self, stored: Optional[pd.DataFrame], tail: pd.DataFrame) -> pd.DataFrame:
+        """
+        Append *tail* to *stored* without touching disk.
+
+        Rows in *tail* replace stored rows with the same date (the last stored
+        bar may have been a partial intraday bar).  *tail*'s index is put in
+        *stored*'s timezone convention first (see align_index).  The result is
+        trimmed to the configured history window, measured back from its last bar.
+        """
+        if stored is None or stored.empty:
+            merged = tail
+        else:
+            merged = pd.concat([stored, align_index(tail, stored)])
+            merged = merged[~merged.index.duplicated(keep="last")]
+        merged = merged.sort_index()
+        if not merged.empty:
+            cutoff = merged.index[-1] - self.window
+            merged = merged[merged.index >= cutoff]
+        return merged
+
+    def merge(self, ticker: str, stored: Optional[pd.DataFrame], tail: pd.DataFrame) -> pd.DataFrame:
+        """Combine *stored* with *tail*, persist the result and return it."""
+        merged = self.combine(stored, tail)
+        self.save(ticker, merged)
+        return merged
+
+    def compact(self) -> int:
+        """
+        Rewrite the archive from every stored ticker and drop the folded-in
+        per-ticker files.  A file rewritten while compaction ran is kept, since
+        it is newer than what went into the archive.  Returns the ticker count.
+        """
+        frames: Dict[str, pd.DataFrame] = {}
+        synced_at: Dict[str, float] = {}
+        archive = self.archive
+        if archive is not None:
+            for ticker in archive.tickers:
+                frames[ticker] = archive.frame(ticker)
+                synced_at[ticker] = archive.synced_at(ticker)
+
+        folded: Dict[str, float] = {}
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if not name.endswith(".pkl"):
+                    continue
+                ticker = name[:-4]
+                path = os.path.join(self.root, name)
+                try:
+                    mtime = os.path.getmtime(path)
+                    df = pd.read_pickle(path)
+                except Exception as exc:  # noqa: BLE001
+                    log.warning("Bar store: skipping %s during compaction (%s)", ticker, exc)
+                    continue
+                if isinstance(df, pd.DataFrame) and not df.empty:
+                    frames[ticker] = df
+                    synced_at[ticker] = mtime
+                    folded[ticker] = mtime
+
+        if not folded:
+            return len(frames)
+
+        write_bar_archive(self.archive_root, frames, synced_at)
+        self._archive_loaded = False
+
+        for ticker, mtime in folded.items():
+            path = self.path(ticker)
+            try:
+                if os.path.getmtime(path) == mtime:
+                    os.remove(path)
+            except OSError:
+                pass
+        return len(frames)
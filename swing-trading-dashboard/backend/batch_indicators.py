@@ -0,0 +1,111 @@
+"""
+Cross-sectional indicators over a (tickers × bars) matrix.
+
+BarMatrix stacks many tickers' daily bars into 2-D float64 arrays, one row per
+ticker, RIGHT-aligned: column -1 is every ticker's own latest bar and shorter
+histories are left-padded with NaN.  The engines evaluate each ticker on its
+own last bar, so right alignment makes row *i* of every indicator here equal,
+bit for bit, to the single-ticker function in indicators.py.  (Aligning on a
+union date index instead would put NaN gaps inside a ticker's history and
+change the EMA/ATR recursions.)
+
+Each indicator runs once for the whole matrix instead of once per ticker.
+The pandas rolling/ewm kernels are applied column-wise to the transposed
+matrix, because they are the same kernels the per-ticker path uses.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicators import cci_batch
+
+
+class BarMatrix:
+    """Right-aligned OHLCV arrays (shape ``(len(tickers), n_bars)``) for a group of tickers."""
+
+    def __init__(
+        self,
+        tickers: List[str],
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        volume: np.ndarray,
+        lengths: np.ndarray,
+    ) -> None:
+        self.tickers = tickers
+        self.close = close    # Adj Close when present, else Close (as the engines use)
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self.lengths = lengths
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, Optional[pd.DataFrame]]) -> "BarMatrix":
+        """Stack every frame in *frames*; None/empty frames and frames missing High/Low/Close are skipped."""
+        usable = {}
+        for ticker, df in frames.items():
+            if df is None or df.empty:
+                continue
+            if isinstance(df.columns, pd.MultiIndex):
+                df = df.set_axis(df.columns.get_level_values(0), axis=1)
+            if df.columns.duplicated().any():
+                df = df.loc[:, ~df.columns.duplicated()]
+            if {"High", "Low"}.issubset(df.columns) and {"Adj Close", "Close"} & set(df.columns):
+                usable[ticker] = df
+
+        tickers = list(usable)
+        n_bars = max((len(df) for df in usable.values()), default=0)
+        shape = (len(tickers), n_bars)
+        close, high, low, volume = (np.full(shape, np.nan) for _ in range(4))
+        lengths = np.zeros(len(tickers), dtype=np.int64)
+        for row, ticker in enumerate(tickers):
+            df = usable[ticker]
+            n = len(df)
+            adj = "Adj Close" if "Adj Close" in df.columns else "Close"
+            close[row, n_bars - n:] = df[adj].to_numpy(dtype=np.float64)
+            high[row, n_bars - n:] = df["High"].to_numpy(dtype=np.float64)
+            low[row, n_bars - n:] = df["Low"].to_numpy(dtype=np.float64)
+            if "Volume" in df.columns:
+                volume[row, n_bars - n:] = df["Volume"].to_numpy(dtype=np.float64)
+            lengths[row] = n
+        return cls(tickers, close, high, low, volume, lengths)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+# ── Indicators (rows = tickers, columns = bars) ─────────────────────────────
+
+def _columnwise(values: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(np.atleast_2d(values).T)
+
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """Row-wise ``indicators.ema``."""
+    return _columnwise(values).ewm(span=length, adjust=False, min_periods=length).mean().to_numpy().T
+
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """Row-wise ``indicators.sma``."""
+    return _columnwise(values).rolling(window=length, min_periods=length).mean().to_numpy().T
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Row-wise ``indicators.true_range`` (NaN components are skipped, as DataFrame.max does)."""
+    prev_close = np.full_like(close, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+    tr = np.fmax(high - low, np.abs(high - prev_close))
+    return np.fmax(tr, np.abs(low - prev_close))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    """Row-wise ``indicators.atr`` (Wilder smoothing)."""
+    tr = true_range(high, low, close)
+    return _columnwise(tr).ewm(alpha=1 / length, adjust=False, min_periods=length).mean().to_numpy().T
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 20) -> np.ndarray:
+    """Row-wise ``indicators.cci``."""
+    return cci_batch(high, low, close, length)
@@ -0,0 +1,10 @@
+"""
+Offline performance benchmarks for the scan pipeline.
+
+  scan_benchmark   end-to-end _run_scan over a fixture universe, with
+                   per-stage timings and a regression check vs baseline.json
+  engine_benchmark µs/ticker and allocations per engine across series lengths
+  synthetic        seeded synthetic OHLCV generators with planted patterns
+
+Run from backend/, e.g. ``python -m benchmarks.scan_benchmark --check``.
+"""
@@ -0,0 +1,189 @@
+"""
+Per-engine micro-benchmarks on seeded synthetic price series.
+
+Times each engine entry point in isolation across series lengths and reports
+µs per ticker, peak traced allocation per call (tracemalloc) and how many
+series produced a result (a sanity check that the planted patterns actually
+reach the expensive code paths).
+
+Inputs that an engine consumes from an earlier engine (S/R zones, the
+trendline dict) are computed once up front and are not part of the timing.
+
+Usage (from backend/):
+  python -m benchmarks.engine_benchmark
+  python -m benchmarks.engine_benchmark --lengths 250 1000 --series 20 --engines scan_vcp
+  python -m benchmarks.engine_benchmark --json results.json
+  python -m benchmarks.engine_benchmark --check   # fail on a per-ticker budget overrun
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import PATTERNS, make_pattern_series
+from engines.engine1 import calculate_sr_zones, clear_peak_cache
+from engines.engine2 import detect_trendline, scan_vcp
+from engines.engine3 import scan_pullback, scan_relaxed_pullback
+from engines.engine5 import scan_base_pattern
+
+DEFAULT_LENGTHS = (250, 500, 1000, 2500, 5000)
+DEFAULT_SERIES = 10        # series per length, cycling through the planted patterns
+DEFAULT_SEED = 11
+ALLOC_SAMPLES = 3          # series per length traced with tracemalloc (tracing is slow)
+
+# Per-ticker time budgets (µs) enforced by --check, for any series length.
+# detect_trendline scores every pair of its most prominent pivots, so its
+# cost must stay flat in the number of candidate lines.
+BUDGETS_US: Dict[str, float] = {
+    "detect_trendline": 10_000,
+}
+
+
+def _case_inputs(df):
+    """Upstream inputs each engine expects, computed outside the timed region."""
+    zones = calculate_sr_zones("BENCH", df)
+    trendline = detect_trendline("BENCH", df)
+    return {"df": df, "zones": zones, "trendline": trendline}
+
+
+def _cold_sr_zones(case: Dict) -> List[Dict]:
+    # _case_inputs already filled engine1's KDE peak cache; time the full computation
+    clear_peak_cache()
+    return calculate_sr_zones("BENCH", case["df"])
+
+
+# Engine name → callable taking the case dict built by _case_inputs
+ENGINES: Dict[str, Callable[[Dict], object]] = {
+    "calculate_sr_zones": _cold_sr_zones,
+    "detect_trendline": lambda c: detect_trendline("BENCH", c["df"]),
+    "scan_vcp": lambda c: scan_vcp("BENCH", c["df"], c["zones"], trendline=c["trendline"]),
+    "scan_pullback": lambda c: scan_pullback("BENCH", c["df"], c["zones"], c["trendline"]),
+    "scan_relaxed_pullback": lambda c: scan_relaxed_pullback("BENCH", c["df"], c["zones"], c["trendline"]),
+    "scan_base_pattern": lambda c: scan_base_pattern("BENCH", c["df"]),
+}
+
+
+def build_cases(n_bars: int, n_series: int, seed: int = DEFAULT_SEED) -> List[Dict]:
+    patterns = list(PATTERNS)
+    cases = []
+    for i in range(n_series):
+        pattern = patterns[i % len(patterns)]
+        df = make_pattern_series(pattern, n_bars, seed=seed + i // len(patterns))
+        case = _case_inputs(df)
+        case["pattern"] = pattern
+        cases.append(case)
+    return cases
+
+
+def _is_hit(result) -> bool:
+    if isinstance(result, dict):
+        return any(v is not None for v in result.values()) if set(result) == {"descending", "ascending"} else True
+    return bool(result)
+
+
+def time_engine(fn: Callable[[Dict], object], cases: List[Dict], alloc_samples: int = ALLOC_SAMPLES) -> Dict:
+    """Time *fn* over every case; trace allocations on the first *alloc_samples*."""
+    hits = 0
+    start = time.perf_counter()
+    for case in cases:
+        if _is_hit(fn(case)):
+            hits += 1
+    elapsed = time.perf_counter() - start
+
+    peaks = []
+    for case in cases[:alloc_samples]:
+        tracemalloc.start()
+        try:
+            fn(case)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "us_per_ticker": round(elapsed / len(cases) * 1e6, 1),
+        "peak_alloc_kib": round(max(peaks) / 1024, 1) if peaks else None,
+        "hits": hits,
+        "series": len(cases),
+    }
+
+
+def run_engine_benchmark(
+    lengths=DEFAULT_LENGTHS,
+    n_series: int = DEFAULT_SERIES,
+    engines: Optional[List[str]] = None,
+    seed: int = DEFAULT_SEED,
+) -> Dict[str, Dict[str, Dict]]:
+    """Return ``{engine: {str(length): measurements}}``."""
+    names = engines or list(ENGINES)
+    results: Dict[str, Dict[str, Dict]] = {name: {} for name in names}
+    # Engines print per-ticker diagnostics; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n_bars in lengths:
+            cases = build_cases(n_bars, n_series, seed)
+            for name in names:
+                results[name][str(n_bars)] = time_engine(ENGINES[name], cases)
+    return results
+
+
+def check_budgets(results: Dict[str, Dict[str, Dict]], budgets: Dict[str, float] = BUDGETS_US) -> List[str]:
+    """Return a message for every engine/length over its per-ticker budget."""
+    failures = []
+    for name, budget in budgets.items():
+        for n_bars, m in results.get(name, {}).items():
+            if m["us_per_ticker"] > budget:
+                failures.append(f"{name} @ {n_bars} bars: {m['us_per_ticker']:,.0f} µs > budget {budget:,.0f} µs")
+    return failures
+
+
+def format_results(results: Dict[str, Dict[str, Dict]]) -> str:
+    lengths = sorted({int(n) for per_len in results.values() for n in per_len})
+    header = f"{'engine':<24}" + "".join(f"{n:>14}" for n in lengths)
+    lines = ["µs per ticker (peak KiB allocated per call, hits/series)", header, "─" * len(header)]
+    for name, per_len in results.items():
+        row = f"{name:<24}"
+        for n in lengths:
+            m = per_len.get(str(n))
+            row += f"{m['us_per_ticker']:>14,.0f}" if m else f"{'-':>14}"
+        lines.append(row)
+        row = f"{'':<24}"
+        for n in lengths:
+            m = per_len.get(str(n))
+            row += f"{(str(m['peak_alloc_kib']) + 'K ' + str(m['hits']) + '/' + str(m['series'])):>14}" if m else f"{'':>14}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-engine micro-benchmarks on synthetic OHLCV")
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(DEFAULT_LENGTHS))
+    parser.add_argument("--series", type=int, default=DEFAULT_SERIES)
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--check", action="store_true", help="fail if an engine exceeds its BUDGETS_US entry")
+    args = parser.parse_args(argv)
+
+    results = run_engine_benchmark(args.lengths, args.series, args.engines, args.seed)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if args.check:
+        failures = check_budgets(results)
+        for msg in failures:
+            print(f"OVER BUDGET  {msg}")
+        if failures:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+End-to-end scan benchmark.
+
+Runs main._run_scan over a fixed fixture universe through the offline
+FixtureProvider (no network), with a throwaway SQLite DB and bar store, and
+reports:
+
+  • wall time per scan stage   (regime, spy, fetch, analysis, db_save, compact, total)
+  • CPU time per engine        (thread CPU summed over every call)
+  • peak RSS of the scan process
+
+Each universe size runs in its own subprocess so peak RSS and module state
+are not shared between sizes.  Results are compared with baseline.json and
+the run exits non-zero if any stage regresses beyond the tolerance.
+
+Usage (from backend/):
+  python -m benchmarks.scan_benchmark                      # 100, 500, 2000 tickers
+  python -m benchmarks.scan_benchmark --sizes 100 --check  # compare to baseline
+  python -m benchmarks.scan_benchmark --executor process   # engines in worker processes
+  python -m benchmarks.scan_benchmark --update-baseline    # record a new baseline
+  python -m benchmarks.scan_benchmark --record AAPL MSFT   # record real fixtures (network)
+
+Synthetic fixtures are generated on first use under benchmarks/fixtures/;
+recorded fixtures (--record) are written there too and replayed alongside.
+Baselines are machine-specific: refresh them on the reference machine.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bar_store import BarStore
+from constants import ANALYSIS_WORKERS, CONCURRENCY_LIMIT, DATA_FETCH_PERIOD
+from database import close_db, get_latest_setups, open_db
+from market_data import FixtureProvider, YFinanceProvider, get_provider, save_fixture, set_provider
+from benchmarks.synthetic import SPY_STREAM, make_spy, make_ticker, ticker_name, universe_tickers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(HERE)
+FIXTURE_DIR = os.path.join(HERE, "fixtures")
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+DEFAULT_SIZES = (100, 500, 2000)
+DEFAULT_SEED = 7
+DEFAULT_TOLERANCE = 0.5      # Allowed slowdown vs baseline (0.5 = 50%)
+DEFAULT_MIN_SLACK = 0.25     # Seconds of noise always allowed on top of the tolerance
+
+# Engine entry points, timed by wrapping main.<name> / analysis.<name>
+MAIN_FUNCTIONS = ("check_market_regime", "calculate_sr_zones_batch")
+ENGINE_FUNCTIONS = (
+    "calculate_sr_zones",
+    "calculate_rs_line",
+    "detect_rs_blue_dot",
+    "detect_trendline",
+    "scan_vcp",
+    "scan_near_breakout",
+    "scan_pullback",
+    "scan_relaxed_pullback",
+    "scan_base_pattern",
+)
+
+
+# ── Fixtures ────────────────────────────────────────────────────────────────
+
+def ensure_fixtures(n_tickers: int, root: str = FIXTURE_DIR, seed: int = DEFAULT_SEED) -> List[str]:
+    """Write any missing synthetic fixtures for the first *n_tickers* and SPY; return the tickers."""
+    tickers = universe_tickers(n_tickers)
+    if not os.path.exists(os.path.join(root, "SPY.csv")):
+        save_fixture(root, "SPY", make_spy(np.random.default_rng([seed, SPY_STREAM])))
+    for i in range(n_tickers):
+        if not os.path.exists(os.path.join(root, f"{ticker_name(i)}.csv")):
+            save_fixture(root, ticker_name(i), make_ticker(i, seed))
+    return tickers
+
+
+def record_fixtures(tickers: List[str], root: str = FIXTURE_DIR) -> List[str]:
+    """Download *tickers* (plus SPY) from the live provider and save them as fixtures."""
+    provider = YFinanceProvider()
+    saved = []
+    for ticker in dict.fromkeys(["SPY"] + list(tickers)):
+        df = provider.history(ticker, period=DATA_FETCH_PERIOD)
+        if df is not None and not df.empty:
+            save_fixture(root, ticker, df)
+            saved.append(ticker)
+    return saved
+
+
+# ── Instrumentation ─────────────────────────────────────────────────────────
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+@contextlib.contextmanager
+def engine_cpu_timers(module, names=ENGINE_FUNCTIONS):
+    """Wrap module.<name> so each call adds its thread CPU time to the yielded dict."""
+    totals: Dict[str, float] = {name: 0.0 for name in names}
+    lock = threading.Lock()
+    originals = {name: getattr(module, name) for name in names}
+
+    def _wrap(name, fn):
+        def timed(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - start
+                with lock:
+                    totals[name] += elapsed
+        return timed
+
+    for name, fn in originals.items():
+        setattr(module, name, _wrap(name, fn))
+    try:
+        yield totals
+    finally:
+        for name, fn in originals.items():
+            setattr(module, name, fn)
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────
+
+def run_scan_benchmark(tickers: List[str], fixture_dir: str = FIXTURE_DIR, executor: str = "thread") -> Dict:
+    """
+    Run one full _run_scan over *tickers* in this process and return its measurements.
+
+    With ``executor="process"`` the engines run in an analysis worker pool;
+    per-engine CPU is then only measured for the engines main calls itself.
+    """
+    import analysis
+    import main  # imported lazily: configures logging and loads the universe
+
+    previous = get_provider()
+    saved = (main.DB_PATH, main._bar_store, main._semaphore, main._analysis_pool)
+    with tempfile.TemporaryDirectory(prefix="scan_bench_") as work:
+        db_path = os.path.join(work, "bench.db")
+        set_provider(FixtureProvider(fixture_dir))
+        main.DB_PATH = db_path
+        main._bar_store = BarStore(os.path.join(work, "bar_store"))
+
+        async def _scan():
+            main._semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+            await open_db(db_path)  # pooled connections, as in the server's lifespan
+            try:
+                await main._run_scan("2026-01-02T00:00:00", tickers)
+                return await get_latest_setups(db_path)
+            finally:
+                await close_db(db_path)
+
+        try:
+            if executor == "process":
+                main._analysis_pool = analysis.create_pool(ANALYSIS_WORKERS)
+            with engine_cpu_timers(main, MAIN_FUNCTIONS) as cpu, \
+                    engine_cpu_timers(analysis, ENGINE_FUNCTIONS) as analysis_cpu:
+                setups = asyncio.run(_scan())
+        finally:
+            if main._analysis_pool is not None:
+                main._analysis_pool.shutdown()
+            set_provider(previous)
+            main.DB_PATH, main._bar_store, main._semaphore, main._analysis_pool = saved
+        if executor != "process":
+            cpu.update(analysis_cpu)
+
+    if main._scan_state["last_error"]:
+        raise RuntimeError(f"Scan failed: {main._scan_state['last_error']}")
+    return {
+        "tickers": len(tickers),
+        "executor": executor,
+        "setups": len(setups),
+        "stages": {k: round(v, 4) for k, v in main._scan_state["timings"].items()},
+        "engine_cpu": {k: round(v, 4) for k, v in cpu.items()},
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_isolated(n_tickers: int, fixture_dir: str = FIXTURE_DIR, executor: str = "thread") -> Dict:
+    """Run run_scan_benchmark for *n_tickers* in a fresh interpreter."""
+    fd, out_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.scan_benchmark",
+             "--child", str(n_tickers), "--fixtures", fixture_dir, "--out", out_path,
+             "--executor", executor],
+            cwd=BACKEND_DIR,
+            check=True,
+            stdout=subprocess.DEVNULL,  # engines print per-ticker diagnostics
+        )
+        with open(out_path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    finally:
+        os.remove(out_path)
+
+
+# ── Baseline comparison ─────────────────────────────────────────────────────
+
+def compare(
+    result: Dict,
+    baseline: Dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_slack: float = DEFAULT_MIN_SLACK,
+) -> List[str]:
+    """
+    Return one message per metric in *result* that exceeds its *baseline*
+    value by more than ``tolerance`` (relative) plus ``min_slack`` seconds,
+    or that has no baseline entry at all (the baseline predates it and must
+    be re-recorded).  Baseline metrics the scan no longer reports are ignored.
+    """
+    failures = []
+    for group in ("stages", "engine_cpu"):
+        base_group = baseline.get(group, {})
+        for name, cur in result.get(group, {}).items():
+            base = base_group.get(name)
+            if base is None:
+                failures.append(f"{group}.{name}: {cur:.3f}s has no baseline entry (re-record with --update-baseline)")
+                continue
+            limit = base * (1.0 + tolerance) + min_slack
+            if cur > limit:
+                failures.append(f"{group}.{name}: {cur:.3f}s > {limit:.3f}s (baseline {base:.3f}s)")
+    base_rss, cur_rss = baseline.get("peak_rss_mb"), result.get("peak_rss_mb")
+    if base_rss and cur_rss and cur_rss > base_rss * (1.0 + tolerance):
+        failures.append(f"peak_rss_mb: {cur_rss:.0f} > {base_rss * (1.0 + tolerance):.0f} (baseline {base_rss:.0f})")
+    return failures
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def format_result(result: Dict) -> str:
+    lines = [f"── {result['tickers']} tickers, {result.get('executor', 'thread')} executor  "
+             f"({result['setups']} setups, peak RSS {result['peak_rss_mb']} MB)"]
+    lines += [f"   stage  {k:<24} {v:9.3f}s" for k, v in result["stages"].items()]
+    ranked = sorted(result["engine_cpu"].items(), key=lambda kv: kv[1], reverse=True)
+    lines += [f"   cpu    {k:<24} {v:9.3f}s" for k, v in ranked]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end scan benchmark on fixture data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--check", action="store_true", help="fail on regression vs baseline.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=None)
+    parser.add_argument("--record", nargs="+", metavar="TICKER", help="record live fixtures and exit")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread",
+                        help="analysis backend (process: ANALYSIS_WORKERS worker processes)")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.record:
+        saved = record_fixtures(args.record, args.fixtures)
+        print(f"Recorded {len(saved)} fixtures to {args.fixtures}")
+        return 0
+
+    if args.child is not None:
+        logging.getLogger("swing").setLevel(logging.WARNING)
+        result = run_scan_benchmark(universe_tickers(args.child), args.fixtures, args.executor)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(result, fh)
+        return 0
+
+    baseline = load_baseline()
+    tolerance = args.tolerance if args.tolerance is not None else baseline.get("tolerance", DEFAULT_TOLERANCE)
+    min_slack = baseline.get("min_slack_seconds", DEFAULT_MIN_SLACK)
+
+    results = {}
+    failures = []
+    for size in args.sizes:
+        ensure_fixtures(size, args.fixtures, args.seed)
+        result = run_isolated(size, args.fixtures, args.executor)
+        results[str(size)] = result
+        print(format_result(result))
+        if args.check:
+            base = baseline.get("sizes", {}).get(str(size))
+            if base is None:
+                print(f"   (no baseline for {size} tickers)")
+                continue
+            for msg in compare(result, base, tolerance, min_slack):
+                failures.append(f"[{size}] {msg}")
+
+    if args.update_baseline:
+        baseline.setdefault("tolerance", DEFAULT_TOLERANCE)
+        baseline.setdefault("min_slack_seconds", DEFAULT_MIN_SLACK)
+        baseline.setdefault("sizes", {}).update(results)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=2)
+            fh.write("\n")
+        print(f"Baseline updated: {BASELINE_FILE}")
+
+    if failures:
+        print("\nREGRESSIONS:")
+        for msg in failures:
+            print(f"  {msg}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Seeded synthetic daily OHLCV for benchmarks.
+
+Every generator takes a numpy Generator so the same seed always produces the
+same bars.  Bars carry an America/New_York DatetimeIndex ending on a fixed
+date, with the same column set the yfinance provider returns.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+END_DATE = "2025-12-31"
+TZ = "America/New_York"
+SPY_STREAM = 10**6  # RNG stream id for SPY, distinct from any ticker index
+
+
+def trading_index(n_bars: int, end: str = END_DATE) -> pd.DatetimeIndex:
+    """*n_bars* business days ending on *end*, tz-aware like yfinance history()."""
+    return pd.bdate_range(end=end, periods=n_bars, tz=TZ, name="Date")
+
+
+def bars_from_close(
+    close: np.ndarray,
+    rng: np.random.Generator,
+    index: Optional[pd.DatetimeIndex] = None,
+    base_volume: float = 2_000_000.0,
+) -> pd.DataFrame:
+    """Wrap a close path in plausible Open/High/Low/Volume columns."""
+    n = len(close)
+    close = np.maximum(np.asarray(close, dtype=np.float64), 1.0)
+    prev = np.concatenate(([close[0]], close[:-1]))
+    open_ = prev * (1.0 + rng.normal(0.0, 0.004, n))
+    span = np.abs(rng.normal(0.0, 0.012, n)) * close
+    high = np.maximum(open_, close) + span * rng.uniform(0.2, 1.0, n)
+    low = np.minimum(open_, close) - span * rng.uniform(0.2, 1.0, n)
+    volume = base_volume * rng.lognormal(0.0, 0.35, n)
+    return pd.DataFrame({
+        "Open": open_,
+        "High": high,
+        "Low": np.maximum(low, 0.5),
+        "Close": close,
+        "Adj Close": close,
+        "Volume": np.round(volume),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index if index is not None else trading_index(n))
+
+
+def random_walk(
+    rng: np.random.Generator,
+    n_bars: int,
+    start: float = 50.0,
+    drift: float = 0.0004,
+    vol: float = 0.018,
+) -> np.ndarray:
+    """Geometric random walk close path."""
+    returns = rng.normal(drift, vol, n_bars)
+    return start * np.exp(np.cumsum(returns))
+
+
+def make_spy(rng: np.random.Generator, n_bars: int = 504) -> pd.DataFrame:
+    """SPY-like benchmark that finishes above its 20 EMA (bullish regime)."""
+    close = random_walk(rng, n_bars, start=400.0, drift=0.0005, vol=0.009)
+    close[-30:] = close[-31] * np.linspace(1.0, 1.06, 30)
+    return bars_from_close(close, rng, base_volume=80_000_000.0)
+
+
+def make_ticker(i: int, seed: int = 0, n_bars: int = 504) -> pd.DataFrame:
+    """Synthetic ticker *i*: a random walk whose drift/volatility depend only on (seed, i)."""
+    rng = np.random.default_rng([seed, i])
+    close = random_walk(
+        rng,
+        n_bars,
+        start=float(rng.uniform(15.0, 400.0)),
+        drift=float(rng.normal(0.0005, 0.0008)),
+        vol=float(rng.uniform(0.010, 0.035)),
+    )
+    return bars_from_close(close, rng, base_volume=float(rng.uniform(5e5, 2e7)))
+
+
+def make_universe(n_tickers: int, seed: int = 0, n_bars: int = 504) -> Dict[str, pd.DataFrame]:
+    """
+    ``SYN0000 … SYN<n-1>`` plus ``SPY``.  A larger universe is a superset of
+    a smaller one with the same seed.
+    """
+    frames = {"SPY": make_spy(np.random.default_rng([seed, SPY_STREAM]), n_bars)}
+    for i in range(n_tickers):
+        frames[ticker_name(i)] = make_ticker(i, seed, n_bars)
+    return frames
+
+
+# ── Planted patterns ────────────────────────────────────────────────────────
+# Each planter rewrites the tail of a close path in place, continuing from the
+# last untouched bar, so the pattern is what the engines see "today".
+
+def _anchor(close: np.ndarray, length: int) -> float:
+    return float(close[-length - 1]) if len(close) > length else float(close[0])
+
+
+def plant_uptrend(close: np.ndarray, length: int, gain: float = 0.35) -> None:
+    """Smooth advance of *gain* over the last *length* bars (prior uptrend for bases)."""
+    p0 = _anchor(close, length)
+    close[-length:] = p0 * np.linspace(1.0, 1.0 + gain, length + 1)[1:]
+
+
+def plant_cup(
+    close: np.ndarray,
+    cup_len: int = 90,
+    depth: float = 0.25,
+    handle_len: int = 12,
+    handle_depth: float = 0.08,
+) -> None:
+    """U-shaped cup of *depth* followed by a shallow handle just below the rim."""
+    rim = _anchor(close, cup_len + handle_len)
+    x = np.linspace(-1.0, 1.0, cup_len)
+    close[-cup_len - handle_len:-handle_len] = rim * (1.0 - depth * (1.0 - x ** 2))
+    h = np.linspace(0.0, np.pi, handle_len)
+    close[-handle_len:] = rim * (0.99 - handle_depth * np.sin(h) * 0.5)
+
+
+def plant_flat_base(close: np.ndarray, length: int = 40, width: float = 0.10) -> None:
+    """Sideways range of total *width* ending just under the top of the range."""
+    top = _anchor(close, length)
+    phase = np.linspace(0.0, 4.0 * np.pi, length)
+    close[-length:] = top * (1.0 - width / 2.0 * (1.0 - np.cos(phase)))
+    close[-1] = top * 0.99
+
+
+def plant_vcp(close: np.ndarray, contractions=(0.20, 0.12, 0.06), leg: int = 20) -> None:
+    """Successively shallower pullbacks from the same pivot (volatility contraction)."""
+    length = leg * len(contractions)
+    pivot = _anchor(close, length)
+    out = []
+    for depth in contractions:
+        down = np.linspace(1.0, 1.0 - depth, leg // 2, endpoint=False)
+        up = np.linspace(1.0 - depth, 0.995, leg - leg // 2)
+        out.append(np.concatenate((down, up)))
+    close[-length:] = pivot * np.concatenate(out)
+
+
+def plant_trendline(close: np.ndarray, length: int = 150, decline: float = 0.20, swings: int = 4) -> None:
+    """Falling highs that touch one descending line *swings* times, then a breakout bar."""
+    start = _anchor(close, length)
+    line = start * np.linspace(1.0, 1.0 - decline, length)
+    wave = 0.5 * (1.0 - np.cos(np.linspace(0.0, 2.0 * np.pi * swings, length)))
+    close[-length:] = line * (1.0 - 0.08 * wave)
+    close[-1] = line[-1] * 1.03
+
+
+def plant_pullback(close: np.ndarray, advance: int = 60, dip: int = 4, depth: float = 0.035) -> None:
+    """Steady advance, a short dip back toward the rising EMAs, then a first up day."""
+    p0 = _anchor(close, advance + dip + 1)
+    up = p0 * np.linspace(1.0, 1.25, advance + 1)[1:]
+    down = up[-1] * np.linspace(1.0, 1.0 - depth, dip + 1)[1:]
+    close[-advance - dip - 1:-1] = np.concatenate((up, down))
+    close[-1] = down[-1] * 1.01
+
+
+# name → (planter, bars it rewrites); "walk" is the unmodified random walk
+PATTERNS = {
+    "walk": (None, 0),
+    "cup": (plant_cup, 102),
+    "flat_base": (plant_flat_base, 40),
+    "vcp": (plant_vcp, 60),
+    "trendline": (plant_trendline, 150),
+    "pullback": (plant_pullback, 65),
+}
+
+
+def make_pattern_series(pattern: str, n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Random walk of *n_bars* with *pattern* (a PATTERNS key) planted at the
+    end, preceded by a prior advance so trend-template filters can pass.
+    """
+    rng = np.random.default_rng([seed, n_bars, list(PATTERNS).index(pattern)])
+    close = random_walk(rng, n_bars, start=float(rng.uniform(20.0, 200.0)), drift=0.0006, vol=0.015)
+    planter, tail = PATTERNS[pattern]
+    if planter is not None:
+        plant_uptrend(close[:-tail], min(120, n_bars - tail - 1))
+        planter(close)
+    df = bars_from_close(close, rng, index=trading_index(n_bars), base_volume=float(rng.uniform(1e6, 1e7)))
+    if planter is not None and pattern not in ("trendline", "pullback"):
+        # Bases end on drying-up volume
+        df.iloc[-10:, df.columns.get_loc("Volume")] *= 0.5
+    return df
+
+
+def ticker_name(i: int) -> str:
+    return f"SYN{i:04d}"
+
+
+def universe_tickers(n_tickers: int) -> List[str]:
+    return [ticker_name(i) for i in range(n_tickers)]
@@ -3,6 +3,8 @@ Central constants for the swing trading scanner.
 All hardcoded parameters are defined here for easy tuning and testing.
 """
 
+import os
+
 # ──────────────────────────────────────────────────────────────────────────
 # RS Line & Strength Thresholds
 # ──────────────────────────────────────────────────────────────────────────
@@ -49,6 +51,15 @@ EMA_LONG = 20  # Long-term EMA period
 SMA_LONG = 50  # Long-term SMA period
 CCI_PERIOD = 20  # Commodity Channel Index period
 
+# ──────────────────────────────────────────────────────────────────────────
+# Trendlines (Engine 2)
+# ──────────────────────────────────────────────────────────────────────────
+
+TRENDLINE_LOOKBACK = 120  # Bars searched for swing highs/lows
+TRENDLINE_TOUCH_PCT = 0.008  # Within 0.8% of the line is a touch; beyond it on the wrong side is a violation
+TRENDLINE_MAX_PIVOTS = 12  # Most prominent swing points paired in the candidate search (≤ 66 lines)
+TRENDLINE_VIOLATION_WEIGHT = 2.0  # Candidate score = touches − weight × violations
+
 # ──────────────────────────────────────────────────────────────────────────
 # Risk Management & Stop Loss
 # ──────────────────────────────────────────────────────────────────────────
@@ -66,6 +77,16 @@ CONCURRENCY_LIMIT = 15  # Max concurrent yfinance API requests (lowered for stab
 BATCH_SAVE_SIZE = 100  # Batch size for database operations (if needed)
 FETCH_MAX_RETRIES = 3  # Maximum retry attempts for data fetches
 FETCH_BACKOFF_BASE = 1.0  # Base delay for exponential backoff (seconds)
+FETCH_BATCH_SIZE = 100  # Tickers per multi-ticker download during a scan
+BAR_STORE_DIR = "bar_store"  # On-disk per-ticker OHLCV store (only missing tail is re-downloaded)
+BAR_STORE_MAX_AGE_SECONDS = 900  # Stored bars younger than this are served without a provider call
+
+# ──────────────────────────────────────────────────────────────────────────
+# Market Data Provider
+# ──────────────────────────────────────────────────────────────────────────
+
+MARKET_DATA_PROVIDER = os.environ.get("SWING_DATA_PROVIDER", "yfinance")  # "yfinance" | "fixture" (offline replay)
+MARKET_DATA_FIXTURE_DIR = os.environ.get("SWING_FIXTURE_DIR", "fixtures")  # <TICKER>.parquet/.csv files for "fixture"
 
 # ──────────────────────────────────────────────────────────────────────────
 # Scan Settings
@@ -73,6 +94,15 @@ FETCH_BACKOFF_BASE = 1.0  # Base delay for exponential backoff (seconds)
 
 MAX_TICKERS_PER_SCAN = 2000  # Safety limit on ticker universe size
 SCAN_TIMEOUT_SECONDS = 600  # Maximum scan duration (10 minutes)
+ANALYSIS_EXECUTOR = os.environ.get("SWING_ANALYSIS_EXECUTOR", "process")  # "process" (one worker per core) | "thread"
+ANALYSIS_WORKERS = int(os.environ.get("SWING_ANALYSIS_WORKERS", "0"))  # Worker processes; 0 = os.cpu_count()
+SCAN_QUEUE_SIZE = 200  # Fetched frames buffered between the fetch and compute stages
+SCAN_COMPUTE_WORKERS = 0  # Concurrent per-ticker compute tasks; 0 = 2 × analysis workers
+SR_ZONE_FLUSH_ROWS = 5000  # Buffered S/R zone rows written per transaction during a scan
+SR_ZONE_CACHE_SIZE = 4096  # KDE peak sets memoized per process by engine1 (0 disables)
+SR_KDE_METHOD = os.environ.get("SWING_KDE_METHOD", "scipy")  # Engine1 density: "scipy" (exact) | "fft" (binned convolution)
+DEBUG_READONLY_BARS = os.environ.get("SWING_DEBUG_BARS", "") == "1"  # Assert engines never modify the shared bar view
+ENGINE_VERSION = 2  # Bump on any engine logic change: invalidates incremental-scan fingerprints
 
 # ──────────────────────────────────────────────────────────────────────────
 # Database
@@ -80,3 +110,6 @@ SCAN_TIMEOUT_SECONDS = 600  # Maximum scan duration (10 minutes)
 
 DB_PATH = "trading.db"
 DB_TIMEOUT = 10.0  # SQLite timeout in seconds
+DB_READ_CONNECTIONS = 4  # Pooled reader connections (WAL: reads never wait on the scan writer)
+DB_CACHE_SIZE_KIB = 16384  # Page cache per connection (PRAGMA cache_size)
+DB_STATEMENT_CACHE = 256  # Prepared statements kept per connection (sqlite3 cached_statements)
@@ -2,13 +2,29 @@
 SQLite persistence layer for pre-computed scan results.
 All tables are keyed by scan_timestamp so historical scans are preserved.
 The frontend always reads from the latest completed scan.
+
+The server opens one long-lived ConnectionPool per database file in its
+lifespan hook (open_db / close_db): a single writer plus a few readers, in
+WAL mode.  Without an open pool (scripts, tests) every call connects on
+its own, as before.
 """
 
+import asyncio
 import json
-from typing import Dict, List, Optional
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 import aiosqlite
 
+from constants import (
+    DB_CACHE_SIZE_KIB,
+    DB_READ_CONNECTIONS,
+    DB_STATEMENT_CACHE,
+    DB_TIMEOUT,
+    SR_ZONE_FLUSH_ROWS,
+)
+
 
 # ---------------------------------------------------------------------------
 # Schema
@@ -48,10 +64,33 @@ CREATE TABLE IF NOT EXISTS scan_setups (
     rr             REAL    NOT NULL,
     setup_date     TEXT    NOT NULL,
     metadata       TEXT,
+    quality_score  INTEGER,
+    distance_pct   REAL,
+    sector         TEXT,
+    rs_blue_dot    INTEGER,
+    base_type      TEXT,
     FOREIGN KEY (scan_timestamp) REFERENCES scan_runs(scan_timestamp)
 );
 """
 
+# Setup fields stored in scan_setups' own columns.  PROMOTED_FIELDS are the
+# frequently filtered / sorted extras, typed and indexed; every other extra
+# field goes into the metadata JSON blob, which is only decoded on request.
+_SETUP_FIELDS = ("ticker", "setup_type", "entry", "stop_loss", "take_profit", "rr", "setup_date")
+PROMOTED_FIELDS = {
+    "quality_score": "INTEGER",
+    "distance_pct": "REAL",
+    "sector": "TEXT",
+    "rs_blue_dot": "INTEGER",
+    "base_type": "TEXT",
+}
+_SETUP_COLUMNS = ", ".join(_SETUP_FIELDS + tuple(PROMOTED_FIELDS) + ("metadata",))
+
+# PRAGMA user_version of the current schema; _migrate upgrades older files.
+# 1: PROMOTED_FIELDS moved out of the metadata blob into columns
+# 2: idx_setups_distance orders missing distances last
+SCHEMA_VERSION = 2
+
 _CREATE_SR_ZONES = """
 CREATE TABLE IF NOT EXISTS sr_zones (
     id             INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -80,39 +119,211 @@ CREATE TABLE IF NOT EXISTS trades (
 );
 """
 
+# Per-ticker input fingerprint of each scan (incremental re-scans reuse
+# results of tickers whose fingerprint is unchanged)
+_CREATE_TICKER_FINGERPRINTS = """
+CREATE TABLE IF NOT EXISTS ticker_fingerprints (
+    scan_timestamp TEXT NOT NULL,
+    ticker         TEXT NOT NULL,
+    last_date      TEXT NOT NULL,
+    fingerprint    TEXT NOT NULL,
+    PRIMARY KEY (scan_timestamp, ticker),
+    FOREIGN KEY (scan_timestamp) REFERENCES scan_runs(scan_timestamp)
+);
+"""
+
 _INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_setups_ts         ON scan_setups(scan_timestamp);",
     "CREATE INDEX IF NOT EXISTS idx_setups_type       ON scan_setups(scan_timestamp, setup_type);",
     "CREATE INDEX IF NOT EXISTS idx_setups_ticker     ON scan_setups(ticker);",
+    "CREATE INDEX IF NOT EXISTS idx_setups_ts_ticker  ON scan_setups(scan_timestamp, ticker);",
     "CREATE INDEX IF NOT EXISTS idx_zones_ticker      ON sr_zones(ticker, scan_timestamp);",
     "CREATE INDEX IF NOT EXISTS idx_zones_scan        ON sr_zones(scan_timestamp);",
+    "CREATE INDEX IF NOT EXISTS idx_setups_quality    ON scan_setups(scan_timestamp, setup_type, quality_score DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_setups_distance   ON scan_setups(scan_timestamp, setup_type, distance_pct IS NULL, distance_pct);",
+    "CREATE INDEX IF NOT EXISTS idx_setups_sector     ON scan_setups(scan_timestamp, sector, setup_type);",
     "CREATE INDEX IF NOT EXISTS idx_regime_ts         ON market_regime(scan_timestamp);",
     "CREATE INDEX IF NOT EXISTS idx_trades_status     ON trades(status);",
 ]
 
 
+# ---------------------------------------------------------------------------
+# Connections
+# ---------------------------------------------------------------------------
+
+# Applied to every connection.  journal_mode=WAL is persistent in the file;
+# synchronous=NORMAL is durable under WAL except for the last commits on
+# power loss, which a re-scan regenerates.
+_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA cache_size = -{DB_CACHE_SIZE_KIB}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+async def _connect(db_path: str) -> aiosqlite.Connection:
+    db = await aiosqlite.connect(db_path, timeout=DB_TIMEOUT, cached_statements=DB_STATEMENT_CACHE)
+    for pragma in _PRAGMAS:
+        await db.execute(pragma)
+    return db
+
+
+class ConnectionPool:
+    """
+    Long-lived connections to one SQLite file: one writer and *readers* readers.
+
+    Writers are serialized by a lock, so one caller's commit never includes
+    another caller's half-done statements; a writer that raises is rolled
+    back.  Readers are handed out from a queue and, thanks to WAL, run while
+    the writer holds a transaction.  Each connection keeps its own
+    prepared-statement cache, which only pays off because it stays open.
+    """
+
+    def __init__(self, db_path: str, readers: int = DB_READ_CONNECTIONS) -> None:
+        self.db_path = db_path
+        self.readers = max(1, readers)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._idle: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._all: List[aiosqlite.Connection] = []
+
+    async def open(self) -> "ConnectionPool":
+        self._writer = await _connect(self.db_path)
+        self._all.append(self._writer)
+        for _ in range(self.readers):
+            db = await _connect(self.db_path)
+            self._all.append(db)
+            self._idle.put_nowait(db)
+        return self
+
+    async def close(self) -> None:
+        async with self._write_lock:
+            for db in self._all:
+                await db.close()
+            self._all.clear()
+            self._writer = None
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        db = await self._idle.get()
+        try:
+            yield db
+        finally:
+            self._idle.put_nowait(db)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+
+
+async def open_db(db_path: str, readers: int = DB_READ_CONNECTIONS) -> ConnectionPool:
+    """Create the schema and open the shared pool for *db_path* (idempotent)."""
+    if db_path not in _pools:
+        await init_db(db_path)
+        _pools[db_path] = await ConnectionPool(db_path, readers).open()
+    return _pools[db_path]
+
+
+async def close_db(db_path: Optional[str] = None) -> None:
+    """Close the pool for *db_path*, or every open pool when None."""
+    for path in ([db_path] if db_path is not None else list(_pools)):
+        pool = _pools.pop(path, None)
+        _latest_scan.pop(path, None)
+        if pool is not None:
+            await pool.close()
+
+
+@asynccontextmanager
+async def _write(db_path: str) -> AsyncIterator[aiosqlite.Connection]:
+    """The pooled writer for *db_path*, or a one-off connection if no pool is open."""
+    pool = _pools.get(db_path)
+    if pool is not None:
+        async with pool.writer() as db:
+            yield db
+        return
+    db = await _connect(db_path)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+@asynccontextmanager
+async def _read(db_path: str) -> AsyncIterator[aiosqlite.Connection]:
+    """A pooled reader for *db_path*, or a one-off connection if no pool is open."""
+    pool = _pools.get(db_path)
+    if pool is not None:
+        async with pool.reader() as db:
+            yield db
+        return
+    db = await _connect(db_path)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 # ---------------------------------------------------------------------------
 # Initialise
 # ---------------------------------------------------------------------------
 
 async def init_db(db_path: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
+    async with _write(db_path) as db:
         await db.execute(_CREATE_SCAN_RUNS)
         await db.execute(_CREATE_MARKET_REGIME)
         await db.execute(_CREATE_SCAN_SETUPS)
         await db.execute(_CREATE_SR_ZONES)
         await db.execute(_CREATE_TRADES)
+        await db.execute(_CREATE_TICKER_FINGERPRINTS)
+        await _migrate(db)
         for idx_sql in _INDEXES:
             await db.execute(idx_sql)
         await db.commit()
 
 
+async def _migrate(db: aiosqlite.Connection) -> None:
+    """Upgrade a database file written by an older schema to SCHEMA_VERSION."""
+    async with db.execute("PRAGMA user_version") as cur:
+        version = (await cur.fetchone())[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    if version < 1:
+        # Promote the hot metadata fields into typed columns and strip them from
+        # the blob; explicit nulls stay in the blob, as _setup_row keeps them
+        async with db.execute("PRAGMA table_info(scan_setups)") as cur:
+            existing = {row[1] for row in await cur.fetchall()}
+        for name, sql_type in PROMOTED_FIELDS.items():
+            if name not in existing:
+                await db.execute(f"ALTER TABLE scan_setups ADD COLUMN {name} {sql_type}")
+            await db.execute(
+                f"UPDATE scan_setups SET {name} = json_extract(metadata, '$.{name}'), "
+                f"metadata = json_remove(metadata, '$.{name}') "
+                f"WHERE json_valid(metadata) AND json_type(metadata, '$.{name}') != 'null'"
+            )
+
+    if version < 2:
+        # init_db recreates it with NULLs last
+        await db.execute("DROP INDEX IF EXISTS idx_setups_distance")
+
+    await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
 # ---------------------------------------------------------------------------
 # Scan-run lifecycle
 # ---------------------------------------------------------------------------
 
 async def save_scan_run(db_path: str, scan_timestamp: str) -> None:
-    async with aiosqlite.connect(db_path) as db:
+    async with _write(db_path) as db:
         await db.execute(
             "INSERT OR IGNORE INTO scan_runs (scan_timestamp) VALUES (?)",
             (scan_timestamp,),
@@ -120,22 +331,64 @@ async def save_scan_run(db_path: str, scan_timestamp: str) -> None:
         await db.commit()
 
 
+# created_at has one-second resolution: the row id breaks ties
+_LATEST_SQL = "SELECT scan_timestamp FROM scan_runs WHERE completed = 1 ORDER BY created_at DESC, id DESC LIMIT 1"
+
+# In-process pointer to the latest completed scan: {db_path: (scan_timestamp, file stamp)}.
+# Only kept while a ConnectionPool is open: closing the last connection
+# checkpoints and removes the WAL file, which would invalidate it anyway.
+_latest_scan: Dict[str, Tuple[Optional[str], tuple]] = {}
+
+
+def _file_stamp(db_path: str) -> tuple:
+    """
+    (mtime, size) of the database and its WAL file.  Any commit — from this
+    process or another one — changes it, so a pointer recorded under an
+    older stamp is stale.
+    """
+    stamp = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
 async def complete_scan_run(db_path: str, scan_timestamp: str, tickers_scanned: int) -> None:
-    async with aiosqlite.connect(db_path) as db:
+    async with _write(db_path) as db:
         await db.execute(
             "UPDATE scan_runs SET completed = 1, tickers_scanned = ? WHERE scan_timestamp = ?",
             (tickers_scanned, scan_timestamp),
         )
         await db.commit()
+        if db_path in _pools:
+            # Re-point the latest-scan cache; stamp first, so a later write still invalidates it
+            stamp = _file_stamp(db_path)
+            async with db.execute(_LATEST_SQL) as cur:
+                row = await cur.fetchone()
+            _latest_scan[db_path] = (row[0] if row else None, stamp)
 
 
 async def get_latest_scan_timestamp(db_path: str) -> Optional[str]:
-    async with aiosqlite.connect(db_path) as db:
-        async with db.execute(
-            "SELECT scan_timestamp FROM scan_runs WHERE completed = 1 ORDER BY created_at DESC LIMIT 1"
-        ) as cur:
+    """
+    Latest completed scan.  With a pool open it comes from the in-process
+    pointer while the database file is unchanged, and is re-read from
+    scan_runs after any write by this or another process.
+    """
+    pooled = db_path in _pools
+    stamp = _file_stamp(db_path) if pooled else None
+    cached = _latest_scan.get(db_path)
+    if pooled and cached is not None and cached[1] == stamp:
+        return cached[0]
+    async with _read(db_path) as db:
+        async with db.execute(_LATEST_SQL) as cur:
             row = await cur.fetchone()
-            return row[0] if row else None
+    scan_ts = row[0] if row else None
+    if pooled:
+        _latest_scan[db_path] = (scan_ts, stamp)
+    return scan_ts
 
 
 # ---------------------------------------------------------------------------
@@ -143,7 +396,7 @@ async def get_latest_scan_timestamp(db_path: str) -> Optional[str]:
 # ---------------------------------------------------------------------------
 
 async def save_regime(db_path: str, scan_timestamp: str, regime: Dict) -> None:
-    async with aiosqlite.connect(db_path) as db:
+    async with _write(db_path) as db:
         await db.execute(
             """INSERT INTO market_regime (scan_timestamp, spy_close, spy_20ema, is_bullish, regime)
                VALUES (?, ?, ?, ?, ?)""",
@@ -158,28 +411,29 @@ async def save_regime(db_path: str, scan_timestamp: str, regime: Dict) -> None:
         await db.commit()
 
 
-async def save_setup(db_path: str, scan_timestamp: str, setup: Dict) -> None:
-    # Extra fields (cci, resistance_level, etc.) go into JSON metadata
-    meta_keys = {"ticker", "setup_type", "entry", "stop_loss", "take_profit", "rr", "setup_date"}
-    metadata = json.dumps({k: v for k, v in setup.items() if k not in meta_keys})
+def _setup_row(scan_timestamp: str, setup: Dict) -> Tuple:
+    """INSERT parameters for one setup, in _SETUP_COLUMNS order (after scan_timestamp)."""
+    promoted = [setup.get(name) for name in PROMOTED_FIELDS]
+    if setup.get("rs_blue_dot") is not None:
+        promoted[list(PROMOTED_FIELDS).index("rs_blue_dot")] = int(bool(setup["rs_blue_dot"]))
+    # Extra fields (cci, resistance_level, etc.) go into JSON metadata, and so
+    # does a promoted field set to None: its NULL column cannot tell null from absent
+    metadata = {
+        k: v for k, v in setup.items()
+        if k not in _SETUP_FIELDS and (k not in PROMOTED_FIELDS or v is None)
+    }
+    return (scan_timestamp, *(setup[k] for k in _SETUP_FIELDS), *promoted, json.dumps(metadata))
 
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute(
-            """INSERT INTO scan_setups
-               (scan_timestamp, ticker, setup_type, entry, stop_loss, take_profit, rr, setup_date, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                scan_timestamp,
-                setup["ticker"],
-                setup["setup_type"],
-                setup["entry"],
-                setup["stop_loss"],
-                setup["take_profit"],
-                setup["rr"],
-                setup["setup_date"],
-                metadata,
-            ),
-        )
+
+_INSERT_SETUP = (
+    f"INSERT INTO scan_setups (scan_timestamp, {_SETUP_COLUMNS}) "
+    f"VALUES ({', '.join('?' * (len(_SETUP_FIELDS) + len(PROMOTED_FIELDS) + 2))})"
+)
+
+
+async def save_setup(db_path: str, scan_timestamp: str, setup: Dict) -> None:
+    async with _write(db_path) as db:
+        await db.execute(_INSERT_SETUP, _setup_row(scan_timestamp, setup))
         await db.commit()
 
 
@@ -187,49 +441,104 @@ async def batch_save_setups(db_path: str, scan_timestamp: str, setups: List[Dict
     """Batch insert multiple setups in a single transaction (5-10x faster than individual saves)."""
     if not setups:
         return
+    insert_values = [_setup_row(scan_timestamp, setup) for setup in setups]
+    async with _write(db_path) as db:
+        await db.executemany(_INSERT_SETUP, insert_values)
+        await db.commit()
 
-    # Prepare all records with metadata
-    meta_keys = {"ticker", "setup_type", "entry", "stop_loss", "take_profit", "rr", "setup_date"}
-    insert_values = [
-        (
-            scan_timestamp,
-            setup["ticker"],
-            setup["setup_type"],
-            setup["entry"],
-            setup["stop_loss"],
-            setup["take_profit"],
-            setup["rr"],
-            setup["setup_date"],
-            json.dumps({k: v for k, v in setup.items() if k not in meta_keys}),
-        )
-        for setup in setups
-    ]
 
-    async with aiosqlite.connect(db_path) as db:
+class ZoneWriter:
+    """
+    Buffers the S/R zones of many tickers and inserts them in large transactions.
+
+    add() queues one ticker's zones and writes the buffer once it holds
+    *flush_rows* rows; flush() writes whatever is left and must run before
+    complete_scan_run.  Rows land under a scan that is not yet completed,
+    so a crash mid-scan leaves nothing readers can see.
+    """
+
+    def __init__(self, db_path: str, scan_timestamp: str, flush_rows: int = SR_ZONE_FLUSH_ROWS) -> None:
+        self.db_path = db_path
+        self.scan_timestamp = scan_timestamp
+        self.flush_rows = max(1, flush_rows)
+        self.rows_written = 0
+        self.flushes = 0
+        self._rows: List[Tuple] = []
+
+    async def add(self, ticker: str, zones: List[Dict]) -> None:
+        self._rows.extend(
+            (self.scan_timestamp, ticker, z["level"], z["upper"], z["lower"], z["type"])
+            for z in zones
+        )
+        if len(self._rows) >= self.flush_rows:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every buffered row in one transaction; returns the rows written."""
+        # Swap before awaiting so concurrent add() calls fill the next batch
+        rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        async with _write(self.db_path) as db:
+            await db.executemany(
+                """INSERT INTO sr_zones (scan_timestamp, ticker, level, zone_upper, zone_lower, zone_type)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            await db.commit()
+        self.rows_written += len(rows)
+        self.flushes += 1
+        return len(rows)
+
+
+async def save_fingerprints(db_path: str, scan_timestamp: str, fingerprints: Dict[str, Tuple[str, str]]) -> None:
+    """Store ``{ticker: (last_date, fingerprint)}`` for *scan_timestamp*."""
+    if not fingerprints:
+        return
+    async with _write(db_path) as db:
         await db.executemany(
-            """INSERT INTO scan_setups
-               (scan_timestamp, ticker, setup_type, entry, stop_loss, take_profit, rr, setup_date, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            insert_values,
+            """INSERT OR REPLACE INTO ticker_fingerprints (scan_timestamp, ticker, last_date, fingerprint)
+               VALUES (?, ?, ?, ?)""",
+            [(scan_timestamp, t, last_date, fp) for t, (last_date, fp) in fingerprints.items()],
         )
         await db.commit()
 
 
-async def save_sr_zones(
-    db_path: str, scan_timestamp: str, ticker: str, zones: List[Dict]
-) -> None:
-    if not zones:
-        return
-    async with aiosqlite.connect(db_path) as db:
-        await db.executemany(
+async def copy_ticker_results(
+    db_path: str, from_timestamp: str, to_timestamp: str, tickers: List[str]
+) -> Tuple[int, int]:
+    """
+    Copy the setups and S/R zones of *tickers* from one scan to another,
+    entirely inside SQLite.  Returns ``(setups_copied, zones_copied)``.
+    """
+    if not tickers:
+        return 0, 0
+    setups = zones = 0
+    async with _write(db_path) as db:
+        await db.execute("CREATE TEMP TABLE IF NOT EXISTS copy_tickers (ticker TEXT PRIMARY KEY)")
+        await db.execute("DELETE FROM copy_tickers")
+        await db.executemany("INSERT OR IGNORE INTO copy_tickers (ticker) VALUES (?)", [(t,) for t in tickers])
+        cur = await db.execute(
+            f"""INSERT INTO scan_setups (scan_timestamp, {_SETUP_COLUMNS})
+               SELECT ?, {_SETUP_COLUMNS}
+               FROM scan_setups
+               WHERE scan_timestamp = ? AND ticker IN (SELECT ticker FROM copy_tickers)
+               ORDER BY id""",
+            (to_timestamp, from_timestamp),
+        )
+        setups = cur.rowcount
+        cur = await db.execute(
             """INSERT INTO sr_zones (scan_timestamp, ticker, level, zone_upper, zone_lower, zone_type)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            [
-                (scan_timestamp, ticker, z["level"], z["upper"], z["lower"], z["type"])
-                for z in zones
-            ],
+               SELECT ?, ticker, level, zone_upper, zone_lower, zone_type
+               FROM sr_zones
+               WHERE scan_timestamp = ? AND ticker IN (SELECT ticker FROM copy_tickers)
+               ORDER BY id""",
+            (to_timestamp, from_timestamp),
         )
+        zones = cur.rowcount
+        await db.execute("DELETE FROM copy_tickers")
         await db.commit()
+    return setups, zones
 
 
 # ---------------------------------------------------------------------------
@@ -241,7 +550,7 @@ async def get_latest_regime(db_path: str) -> Optional[Dict]:
     if not scan_ts:
         return None
 
-    async with aiosqlite.connect(db_path) as db:
+    async with _read(db_path) as db:
         async with db.execute(
             """SELECT spy_close, spy_20ema, is_bullish, regime
                FROM market_regime WHERE scan_timestamp = ? LIMIT 1""",
@@ -259,46 +568,98 @@ async def get_latest_regime(db_path: str) -> Optional[Dict]:
     return None
 
 
-async def get_latest_setups(
-    db_path: str, setup_type: Optional[str] = None
-) -> List[Dict]:
+# Orderings query_setups accepts (id = scan insertion order).  Each matches
+# the tail of a scan_setups index, so SQLite reads rows already in order.
+# Setups without a distance sort last, as the old in-memory sort put them.
+SETUP_ORDERS = {
+    "id": "id",
+    "quality": "quality_score DESC, id",
+    "distance": "distance_pct IS NULL, distance_pct, id",
+}
+
+
+def _setup_record(row: Tuple, scan_ts: str, details: bool) -> Dict:
+    """scan_setups row (_SETUP_COLUMNS order) → setup dict; metadata decoded only with *details*."""
+    record = dict(zip(_SETUP_FIELDS, row))
+    record["scan_timestamp"] = scan_ts
+    for name, value in zip(PROMOTED_FIELDS, row[len(_SETUP_FIELDS):]):
+        if value is not None:
+            record[name] = bool(value) if name == "rs_blue_dot" else value
+    metadata = row[-1]
+    if details and metadata:
+        try:
+            record.update(json.loads(metadata))
+        except Exception:
+            pass
+    return record
+
+
+async def query_setups(
+    db_path: str,
+    setup_type: Optional[str] = None,
+    *,
+    sector: Optional[str] = None,
+    base_type: Optional[str] = None,
+    rs_blue_dot: Optional[bool] = None,
+    min_quality: Optional[float] = None,
+    order_by: str = "id",
+    limit: Optional[int] = None,
+    offset: int = 0,
+    details: bool = False,
+) -> Tuple[List[Dict], int]:
+    """
+    Setups of the latest completed scan, filtered, ordered and paginated in SQLite.
+
+    Filters and *order_by* (a SETUP_ORDERS key) use the promoted columns.
+    Rows hold the setup columns plus PROMOTED_FIELDS; the metadata blob is
+    decoded into them only with *details*.  Returns ``(page, total)``, where
+    *total* counts every row matching the filters.
+    """
+    if order_by not in SETUP_ORDERS:
+        raise ValueError(f"order_by must be one of {sorted(SETUP_ORDERS)}")
     scan_ts = await get_latest_scan_timestamp(db_path)
     if not scan_ts:
-        return []
-
-    async with aiosqlite.connect(db_path) as db:
-        if setup_type:
-            sql = """SELECT ticker, setup_type, entry, stop_loss, take_profit, rr, setup_date, metadata
-                     FROM scan_setups WHERE scan_timestamp = ? AND setup_type = ?"""
-            params = (scan_ts, setup_type)
+        return [], 0
+
+    where = ["scan_timestamp = ?"]
+    params: List = [scan_ts]
+    for column, value in (("setup_type", setup_type), ("sector", sector), ("base_type", base_type)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if rs_blue_dot is not None:
+        where.append("rs_blue_dot = ?")
+        params.append(int(rs_blue_dot))
+    if min_quality is not None:
+        where.append("quality_score >= ?")
+        params.append(min_quality)
+    where_sql = " AND ".join(where)
+
+    columns = _SETUP_COLUMNS if details else _SETUP_COLUMNS.replace("metadata", "NULL")
+    sql = f"SELECT {columns} FROM scan_setups WHERE {where_sql} ORDER BY {SETUP_ORDERS[order_by]}"
+    page_params = list(params)
+    if limit is not None or offset:
+        sql += " LIMIT ? OFFSET ?"
+        page_params += [limit if limit is not None else -1, offset]
+
+    async with _read(db_path) as db:
+        async with db.execute(sql, page_params) as cur:
+            rows = await cur.fetchall()
+        if limit is None and not offset:
+            total = len(rows)
         else:
-            sql = """SELECT ticker, setup_type, entry, stop_loss, take_profit, rr, setup_date, metadata
-                     FROM scan_setups WHERE scan_timestamp = ?"""
-            params = (scan_ts,)
+            async with db.execute(f"SELECT COUNT(*) FROM scan_setups WHERE {where_sql}", params) as cur:
+                total = (await cur.fetchone())[0]
+
+    return [_setup_record(row, scan_ts, details) for row in rows], total
 
-        async with db.execute(sql, params) as cur:
-            rows = await cur.fetchall()
 
-        results = []
-        for row in rows:
-            record = {
-                "ticker": row[0],
-                "setup_type": row[1],
-                "entry": row[2],
-                "stop_loss": row[3],
-                "take_profit": row[4],
-                "rr": row[5],
-                "setup_date": row[6],
-                "scan_timestamp": scan_ts,
-            }
-            if row[7]:
-                try:
-                    record.update(json.loads(row[7]))
-                except Exception:
-                    pass
-            results.append(record)
-
-        return results
+async def get_latest_setups(
+    db_path: str, setup_type: Optional[str] = None
+) -> List[Dict]:
+    """Every setup of the latest completed scan (optionally one type), with metadata."""
+    setups, _ = await query_setups(db_path, setup_type, details=True)
+    return setups
 
 
 # ---------------------------------------------------------------------------
@@ -307,7 +668,7 @@ async def get_latest_setups(
 
 async def add_trade(db_path: str, trade: Dict) -> int:
     """Insert a new active trade; returns the new row id."""
-    async with aiosqlite.connect(db_path) as db:
+    async with _write(db_path) as db:
         cur = await db.execute(
             """INSERT INTO trades (ticker, entry_price, quantity, stop_loss, target, entry_date, notes)
                VALUES (?, ?, ?, ?, ?, ?, ?)""",
@@ -327,7 +688,7 @@ async def add_trade(db_path: str, trade: Dict) -> int:
 
 async def get_trades(db_path: str, status: str = "active") -> List[Dict]:
     """Return all trades with the given status."""
-    async with aiosqlite.connect(db_path) as db:
+    async with _read(db_path) as db:
         async with db.execute(
             """SELECT id, ticker, entry_price, quantity, stop_loss, target,
                       entry_date, notes, status, created_at
@@ -354,7 +715,7 @@ async def get_trades(db_path: str, status: str = "active") -> List[Dict]:
 
 async def close_trade(db_path: str, trade_id: int) -> bool:
     """Mark a trade as closed.  Returns True if a row was updated."""
-    async with aiosqlite.connect(db_path) as db:
+    async with _write(db_path) as db:
         cur = await db.execute(
             "UPDATE trades SET status = 'closed' WHERE id = ? AND status = 'active'",
             (trade_id,),
@@ -363,12 +724,22 @@ async def close_trade(db_path: str, trade_id: int) -> bool:
         return cur.rowcount > 0
 
 
+async def get_fingerprints(db_path: str, scan_timestamp: str) -> Dict[str, str]:
+    """``{ticker: fingerprint}`` recorded by *scan_timestamp* (empty for older scans)."""
+    async with _read(db_path) as db:
+        async with db.execute(
+            "SELECT ticker, fingerprint FROM ticker_fingerprints WHERE scan_timestamp = ?",
+            (scan_timestamp,),
+        ) as cur:
+            return {r[0]: r[1] for r in await cur.fetchall()}
+
+
 async def get_sr_zones_for_ticker_from_db(db_path: str, ticker: str) -> List[Dict]:
     scan_ts = await get_latest_scan_timestamp(db_path)
     if not scan_ts:
         return []
 
-    async with aiosqlite.connect(db_path) as db:
+    async with _read(db_path) as db:
         async with db.execute(
             """SELECT level, zone_upper, zone_lower, zone_type
                FROM sr_zones WHERE scan_timestamp = ? AND ticker = ?
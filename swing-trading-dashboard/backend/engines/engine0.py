@@ -9,11 +9,11 @@ Rule: SPY Daily Close vs SPY 20-period EMA.
 from typing import Dict
 
 import pandas as pd
-import yfinance as yf
 
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from indicators import ema as _ema
+from market_data import get_provider
 
 
 def check_market_regime() -> Dict:
@@ -29,18 +29,10 @@ def check_market_regime() -> Dict:
         regime     : str  ("BULLISH" | "BEARISH" | "ERROR: ...")
     """
     try:
-        spy = yf.download(
-            "SPY",
-            period="6mo",
-            interval="1d",
-            auto_adjust=False,
-            prepost=False,
-            progress=False,
-            threads=False,
-        )
-
-        if spy.empty:
-            return _error("No SPY data returned from yfinance")
+        spy = get_provider().history("SPY", period="6mo")
+
+        if spy is None or spy.empty:
+            return _error("No SPY data returned from data provider")
 
         # Flatten MultiIndex columns (newer yfinance versions)
         if isinstance(spy.columns, pd.MultiIndex):
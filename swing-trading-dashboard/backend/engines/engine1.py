@@ -4,26 +4,36 @@ Engine 1: Battlefield Mapper — S/R Infrastructure
 Method:
   1. Resample daily OHLCV → weekly.
   2. Collect weekly closes + weekly pivot highs/lows.
-  3. Apply Kernel Density Estimation (scipy gaussian_kde) on the
-     combined price-point cloud to find institutional clustering.
+  3. Apply Kernel Density Estimation (scipy gaussian_kde, or the binned
+     FFT estimator when SR_KDE_METHOD = "fft") on the combined
+     price-point cloud to find institutional clustering.
   4. Extract local density peaks → significant S/R price levels.
   5. Convert each peak into a ZONE:  level ± (0.2 × Daily ATR).
   6. Merge peaks that are within 1 ATR of each other (remove duplicates).
   7. Classify zones as SUPPORT (below current price) or RESISTANCE (above).
+
+calculate_sr_zones_batch() produces the same zones for many tickers in one
+call: one weekly groupby, one ATR pass and chunked array KDE evaluation.
 """
 
+import hashlib
 import os
 import sys
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from scipy.signal import argrelextrema, find_peaks
+from scipy.signal import argrelextrema, fftconvolve, find_peaks
 from scipy.stats import gaussian_kde
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from indicators import atr as _atr
+import batch_indicators as bi
+from batch_indicators import BarMatrix
+from constants import SR_KDE_METHOD, SR_ZONE_CACHE_SIZE
+from indicators import IndicatorContext, bar_view
+from market_data import get_provider
 
 
 # ---------------------------------------------------------------------------
@@ -33,6 +43,7 @@ from indicators import atr as _atr
 def calculate_sr_zones(
     ticker: str,
     df: Optional[pd.DataFrame] = None,
+    ctx: Optional[IndicatorContext] = None,
 ) -> List[Dict]:
     """
     Parameters
@@ -42,6 +53,9 @@ def calculate_sr_zones(
     df : pd.DataFrame, optional
         Pre-fetched daily OHLCV with columns including 'Adj Close',
         'High', 'Low'.  If None the function downloads 2 years of data.
+    ctx : IndicatorContext, optional
+        Shared per-ticker indicator cache; when given, its frame is used
+        (no copy) and ATR comes from the cache.
 
     Returns
     -------
@@ -50,12 +64,14 @@ def calculate_sr_zones(
         Sorted ascending by level.
     """
     try:
-        data = _load(ticker, df)
+        data = ctx.df if ctx is not None else _load(ticker, df)
         if data is None or len(data) < 60:
             return []
 
         adj_col = _adj_col(data)
-        atr_series = _atr(data["High"], data["Low"], data[adj_col], length=14)
+        if ctx is None:
+            ctx = IndicatorContext(data)
+        atr_series = ctx.atr(14)
 
         if atr_series.dropna().empty:
             return []
@@ -65,161 +81,423 @@ def calculate_sr_zones(
         if daily_atr <= 0:
             return []
 
-        zone_half_width = 0.2 * daily_atr
-
-        # ── Weekly resample ──────────────────────────────────────────────
-        weekly = (
-            data.resample("W")
-            .agg({adj_col: "last", "High": "max", "Low": "min"})
-            .dropna()
-        )
-
-        if len(weekly) < 10:
+        # ── Weekly price cloud → KDE density peaks (memoized) ────────────
+        peaks = _density_peaks(data, adj_col)
+        if peaks is None:
             return []
+        peak_prices, peak_densities = peaks
 
-        # ── Pivot highs / lows (adaptive window) ─────────────────────────
-        order = max(2, len(weekly) // 20)
-        hi = weekly["High"].values
-        lo = weekly["Low"].values
-        cl = weekly[adj_col].values
-
-        ph_idx = argrelextrema(hi, np.greater_equal, order=order)[0]
-        pl_idx = argrelextrema(lo, np.less_equal, order=order)[0]
-
-        # Collect price points with their corresponding dates for recency weighting
-        price_raw = np.concatenate([cl, hi[ph_idx], lo[pl_idx]])
-        dates_raw = np.concatenate([
-            weekly.index.values,
-            weekly.index[ph_idx].values,
-            weekly.index[pl_idx].values,
-        ])
-
-        # Filter out NaN/non-positive prices
-        mask = ~np.isnan(price_raw) & (price_raw > 0)
-        price_points = price_raw[mask]
-        dates_valid = dates_raw[mask]
-
-        if len(price_points) < 10:
-            return []
+        # Get current price for proximity filtering
+        cp_val = data[adj_col].iloc[-1]
+        current_price = float(cp_val.item() if hasattr(cp_val, 'item') else cp_val)
+        return _build_zones(peak_prices, peak_densities, current_price, daily_atr)
 
-        # ── Recency-weighted KDE ──────────────────────────────────────────────
-        # Compute days ago for each price point
-        today = np.datetime64('today', 'D')
-        days_ago = (today - dates_valid.astype('datetime64[D]')).astype(float)
-        days_ago = np.maximum(days_ago, 0.0)
-
-        # Recency weight: 2.0 for ≤90 days, 1.0 for ≥365 days, linear interpolation between
-        weights = np.where(
-            days_ago <= 90,
-            2.0,
-            np.where(
-                days_ago >= 365,
-                1.0,
-                2.0 - (days_ago - 90) / 275.0
-            )
-        )
-        weights = np.maximum(weights, 0.1)  # Ensure all weights are positive
-
-        # Dynamic bandwidth based on coefficient of variation
-        cv = float(price_points.std() / price_points.mean()) if price_points.mean() > 0 else 0.05
-        n = len(price_points)
-        scott_factor = n ** (-1.0 / 5.0)          # Scott's rule
-        bw_scale = max(0.4, min(1.2, cv / 0.05))  # 0.4 – 1.2 multiplier
-
-        # KDE with recency weights
-        kde = gaussian_kde(price_points, bw_method=scott_factor * bw_scale, weights=weights)
-        p_min = price_points.min() * 0.98
-        p_max = price_points.max() * 1.02
-        x = np.linspace(p_min, p_max, 600)
-        density = kde(x)
+    except Exception as exc:  # noqa: BLE001
+        print(f"[Engine1] {ticker}: {exc}")
+        return []
 
-        # Peak detection with find_peaks (lower prominence threshold than argrelextrema)
-        prominence_threshold = np.percentile(density, 5)
-        min_dist = max(4, int(len(x) * 0.008))
-        peak_idx, _ = find_peaks(density, prominence=prominence_threshold, distance=min_dist)
 
-        if len(peak_idx) == 0:
-            return []
+def calculate_sr_zones_batch(frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, List[Dict]]:
+    """
+    calculate_sr_zones for many tickers in one call.
 
-        # Get current price for proximity filtering
-        cp_val = data[adj_col].iloc[-1]
-        current_price = float(cp_val.item() if hasattr(cp_val, 'item') else cp_val)
+    ATR comes from one BarMatrix pass and every ticker's weekly bars from
+    one groupby.  The KDE densities of a chunk of tickers are evaluated as
+    a single array operation, each on its own price grid.  Peaks are shared
+    with calculate_sr_zones through the same cache.
 
-        peak_prices = x[peak_idx]
-        peak_densities = density[peak_idx]
-
-        # Always include peaks within 3% of current price; also include top 70% by density
-        pct_diff = np.abs(peak_prices - current_price) / current_price
-        is_proximity = pct_diff <= 0.03
-
-        threshold = np.percentile(peak_densities, 30)
-        keep_mask = (peak_densities >= threshold) | is_proximity
-        peak_prices = peak_prices[keep_mask]
-        is_proximity_filtered = is_proximity[keep_mask]
-
-        # ── Merge nearby peaks (within 1 ATR) ────────────────────────────
-        merged: List[float] = []
-        cluster: List[float] = [float(np.sort(peak_prices)[0])]
-        for p in np.sort(peak_prices)[1:]:
-            if p - cluster[-1] < daily_atr:
-                cluster.append(p)
-            else:
-                merged.append(float(np.mean(cluster)))
-                cluster = [p]
-        merged.append(float(np.mean(cluster)))
-
-        # ── Build zone dicts with is_primary flag ────────────────────────────
-        zones: List[Dict] = []
-
-        for i, level in enumerate(merged):
-            zone_type = "RESISTANCE" if level > current_price else "SUPPORT"
-            # Mark as primary if within 3% of current price
-            pct_diff = abs(level - current_price) / current_price
-            is_primary = pct_diff <= 0.03
-            zones.append(
-                {
-                    "level": round(level, 2),
-                    "upper": round(level + zone_half_width, 2),
-                    "lower": round(level - zone_half_width, 2),
-                    "type": zone_type,
-                    "atr": round(daily_atr, 2),
-                    "is_primary": is_primary,
-                }
-            )
-
-        zones.sort(key=lambda z: z["level"])
+    Returns
+    -------
+    dict
+        ``{ticker: zones}`` for every key of *frames*; the zones equal
+        calculate_sr_zones(ticker, df), and frames it rejects map to [].
+    """
+    zones: Dict[str, List[Dict]] = {ticker: [] for ticker in frames}
+    usable: Dict[str, pd.DataFrame] = {}
+    for ticker, df in frames.items():
+        data = _flat(df)
+        if data is None or len(data) < 60:
+            continue
+        if not {"High", "Low", _adj_col(data)}.issubset(data.columns):
+            continue
+        usable[ticker] = data
+    if not usable:
+        return zones
+
+    try:
+        # ── ATR and current price: one pass over the stacked bars ────────
+        matrix = BarMatrix.from_frames(usable)
+        atr = bi.atr(matrix.high, matrix.low, matrix.close, 14)
+        valid = ~np.isnan(atr)
+        last = atr.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        daily_atr = np.where(valid.any(axis=1), atr[np.arange(len(matrix)), last], np.nan)
+        current = matrix.close[:, -1]
+        rows = {ticker: row for row, ticker in enumerate(matrix.tickers) if daily_atr[row] > 0}
+
+        # ── Peaks: cache hits, then one batched KDE for the misses ───────
+        today = np.datetime64('today', 'D')
+        peaks: Dict[str, Optional[Tuple[np.ndarray, np.ndarray]]] = {}
+        clouds: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        keys: Dict[str, bytes] = {}
+        for ticker, (cl, hi, lo, dates) in _weekly_bars_batch({t: usable[t] for t in rows}).items():
+            cloud = _price_cloud(cl, hi, lo, dates, today) if len(cl) >= 10 else None
+            if cloud is None:
+                peaks[ticker] = None
+                continue
+            if SR_ZONE_CACHE_SIZE > 0:
+                keys[ticker] = _cloud_key(cloud)
+                hit, cached = _cache_get(keys[ticker])
+                if hit:
+                    peaks[ticker] = cached
+                    continue
+            clouds[ticker] = cloud
+        computed = _batch_density_peaks(clouds)
+        for ticker in clouds:
+            peaks[ticker] = computed.get(ticker)
+            if ticker in keys:
+                _cache_put(keys[ticker], peaks[ticker])
+
+        for ticker, row in rows.items():
+            if peaks[ticker] is not None:
+                zones[ticker] = _build_zones(*peaks[ticker], float(current[row]), float(daily_atr[row]))
         return zones
 
     except Exception as exc:  # noqa: BLE001
-        print(f"[Engine1] {ticker}: {exc}")
-        return []
+        print(f"[Engine1] batch of {len(usable)}: {exc} — falling back to per-ticker zones")
+        return {ticker: calculate_sr_zones(ticker, usable[ticker]) if ticker in usable else [] for ticker in frames}
+
+
+def _build_zones(
+    peak_prices: np.ndarray, peak_densities: np.ndarray, current_price: float, daily_atr: float
+) -> List[Dict]:
+    """Filter density peaks, merge them within 1 ATR and classify against *current_price*."""
+    zone_half_width = 0.2 * daily_atr
+
+    # Always include peaks within 3% of current price; also include top 70% by density
+    pct_diff = np.abs(peak_prices - current_price) / current_price
+    is_proximity = pct_diff <= 0.03
+
+    threshold = np.percentile(peak_densities, 30)
+    keep_mask = (peak_densities >= threshold) | is_proximity
+    peak_prices = np.sort(peak_prices[keep_mask])
+
+    # ── Merge nearby peaks (within 1 ATR of the previous one) ────────────
+    breaks = np.flatnonzero(np.diff(peak_prices) >= daily_atr) + 1
+    merged = [float(np.mean(cluster)) for cluster in np.split(peak_prices, breaks)]
+
+    # ── Build zone dicts with is_primary flag ────────────────────────────
+    zones: List[Dict] = []
+
+    for level in merged:
+        zone_type = "RESISTANCE" if level > current_price else "SUPPORT"
+        # Mark as primary if within 3% of current price
+        pct_diff = abs(level - current_price) / current_price
+        is_primary = pct_diff <= 0.03
+        zones.append(
+            {
+                "level": round(level, 2),
+                "upper": round(level + zone_half_width, 2),
+                "lower": round(level - zone_half_width, 2),
+                "type": zone_type,
+                "atr": round(daily_atr, 2),
+                "is_primary": is_primary,
+            }
+        )
+
+    zones.sort(key=lambda z: z["level"])
+    return zones
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# KDE peaks (memoized)
 # ---------------------------------------------------------------------------
 
-def _load(ticker: str, df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
-    if df is not None:
-        data = df.copy()
+# The KDE sees only the weekly price cloud: weekly closes and pivot prices,
+# their recency weights as of today and the bandwidth factor.  Peaks are
+# cached on a digest of that cloud, so daily bars that resample to the same
+# weekly points hit even when the bars themselves were revised.  Building the
+# cloud is cheap next to the density evaluation; the daily ATR (zone width and
+# merging) and the SUPPORT/RESISTANCE split run on every call.
+_peak_cache: "OrderedDict[bytes, Optional[Tuple[np.ndarray, np.ndarray]]]" = OrderedDict()
+_peak_lock = threading.Lock()
+
+GRID_POINTS = 600            # KDE evaluation grid per ticker
+_KDE_BATCH_CELLS = 1_000_000  # grid × cloud cells per batched density chunk (8 MB per float64 temporary)
+_NS_PER_DAY = 86_400_000_000_000
+
+
+def _cloud_key(cloud: Tuple[np.ndarray, np.ndarray, float]) -> bytes:
+    price_points, weights, bw_factor = cloud
+    h = hashlib.blake2b(f"{bw_factor!r}|{SR_KDE_METHOD}".encode(), digest_size=16)
+    h.update(np.ascontiguousarray(price_points, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    return h.digest()
+
+
+def _cache_get(key: bytes) -> Tuple[bool, Optional[Tuple[np.ndarray, np.ndarray]]]:
+    with _peak_lock:
+        if key in _peak_cache:
+            _peak_cache.move_to_end(key)
+            return True, _peak_cache[key]
+    return False, None
+
+
+def _cache_put(key: bytes, peaks: Optional[Tuple[np.ndarray, np.ndarray]]) -> None:
+    if peaks is not None:
+        for arr in peaks:
+            arr.flags.writeable = False  # Shared by every later hit
+    with _peak_lock:
+        _peak_cache[key] = peaks
+        while len(_peak_cache) > SR_ZONE_CACHE_SIZE:
+            _peak_cache.popitem(last=False)
+
+
+def clear_peak_cache() -> None:
+    with _peak_lock:
+        _peak_cache.clear()
+
+
+def _density_peaks(data: pd.DataFrame, adj_col: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(peak prices, peak densities) of the weekly KDE, or None when there are no usable peaks."""
+    today = np.datetime64('today', 'D')
+    # ── Weekly resample ──────────────────────────────────────────────
+    weekly = (
+        data.resample("W")
+        .agg({adj_col: "last", "High": "max", "Low": "min"})
+        .dropna()
+    )
+
+    if len(weekly) < 10:
+        return None
+
+    cloud = _price_cloud(weekly[adj_col].values, weekly["High"].values, weekly["Low"].values,
+                        weekly.index.values, today)
+    if cloud is None:
+        return None
+    if SR_ZONE_CACHE_SIZE <= 0:
+        return _compute_density_peaks(cloud)
+    key = _cloud_key(cloud)
+    hit, peaks = _cache_get(key)
+    if not hit:
+        peaks = _compute_density_peaks(cloud)
+        _cache_put(key, peaks)
+    return peaks
+
+
+def _compute_density_peaks(
+    cloud: Tuple[np.ndarray, np.ndarray, float]
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    price_points, weights, bw_factor = cloud
+
+    # KDE with recency weights
+    p_min = price_points.min() * 0.98
+    p_max = price_points.max() * 1.02
+    x = np.linspace(p_min, p_max, GRID_POINTS)
+    if SR_KDE_METHOD == "fft":
+        density = _binned_kde_rows(price_points[None], weights[None], np.array([bw_factor]), x[None])[0]
     else:
-        data = yf.download(
-            ticker,
-            period="2y",
-            interval="1d",
-            auto_adjust=False,
-            prepost=False,
-            progress=False,
-            threads=False,
+        kde = gaussian_kde(price_points, bw_method=bw_factor, weights=weights)
+        density = kde(x)
+    return _find_density_peaks(x, density)
+
+
+def _price_cloud(
+    cl: np.ndarray, hi: np.ndarray, lo: np.ndarray, dates: np.ndarray, today: np.datetime64
+) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+    """Weekly closes + pivot highs/lows → (price points, recency weights, KDE bandwidth factor)."""
+    # ── Pivot highs / lows (adaptive window) ─────────────────────────
+    order = max(2, len(cl) // 20)
+    ph_idx = argrelextrema(hi, np.greater_equal, order=order)[0]
+    pl_idx = argrelextrema(lo, np.less_equal, order=order)[0]
+
+    # Collect price points with their corresponding dates for recency weighting
+    price_raw = np.concatenate([cl, hi[ph_idx], lo[pl_idx]])
+    dates_raw = np.concatenate([dates, dates[ph_idx], dates[pl_idx]])
+
+    # Filter out NaN/non-positive prices
+    mask = ~np.isnan(price_raw) & (price_raw > 0)
+    price_points = price_raw[mask]
+    dates_valid = dates_raw[mask]
+
+    if len(price_points) < 10:
+        return None
+
+    # ── Recency-weighted KDE ──────────────────────────────────────────────
+    # Compute days ago for each price point
+    days_ago = (today - dates_valid.astype('datetime64[D]')).astype(float)
+    days_ago = np.maximum(days_ago, 0.0)
+
+    # Recency weight: 2.0 for ≤90 days, 1.0 for ≥365 days, linear interpolation between
+    weights = np.where(
+        days_ago <= 90,
+        2.0,
+        np.where(
+            days_ago >= 365,
+            1.0,
+            2.0 - (days_ago - 90) / 275.0
         )
+    )
+    weights = np.maximum(weights, 0.1)  # Ensure all weights are positive
+
+    # Dynamic bandwidth based on coefficient of variation
+    cv = float(price_points.std() / price_points.mean()) if price_points.mean() > 0 else 0.05
+    n = len(price_points)
+    scott_factor = n ** (-1.0 / 5.0)          # Scott's rule
+    bw_scale = max(0.4, min(1.2, cv / 0.05))  # 0.4 – 1.2 multiplier
+    return price_points, weights, scott_factor * bw_scale
+
+
+def _find_density_peaks(x: np.ndarray, density: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    # Peak detection with find_peaks (lower prominence threshold than argrelextrema)
+    prominence_threshold = np.percentile(density, 5)
+    min_dist = max(4, int(len(x) * 0.008))
+    peak_idx, _ = find_peaks(density, prominence=prominence_threshold, distance=min_dist)
 
-    if data.empty:
+    if len(peak_idx) == 0:
         return None
+    return x[peak_idx], density[peak_idx]
 
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
 
-    return data
+def _weekly_bars_batch(
+    frames: Dict[str, pd.DataFrame],
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    ``data.resample("W").agg(last/max/min).dropna()`` for every frame with a
+    single groupby.  Returns ``{ticker: (close, high, low, week dates)}``;
+    dates are datetime64[ns] in UTC, as ``weekly.index.values`` gives them.
+    """
+    if not frames:
+        return {}
+    ids, weeks, cl, hi, lo = [], [], [], [], []
+    for i, data in enumerate(frames.values()):
+        index = pd.DatetimeIndex(data.index)
+        wall = index.tz_localize(None) if index.tz is not None else index
+        days = wall.as_unit("ns").asi8 // _NS_PER_DAY
+        # W-SUN label: the Sunday closing each bar's week (1970-01-01 was a Thursday)
+        weeks.append(days + (6 - (days + 3) % 7))
+        ids.append(np.full(len(days), i))
+        cl.append(data[_adj_col(data)].to_numpy(dtype=np.float64))
+        hi.append(data["High"].to_numpy(dtype=np.float64))
+        lo.append(data["Low"].to_numpy(dtype=np.float64))
+
+    bars = pd.DataFrame({
+        "t": np.concatenate(ids), "w": np.concatenate(weeks),
+        "c": np.concatenate(cl), "h": np.concatenate(hi), "l": np.concatenate(lo),
+    })
+    weekly = bars.groupby(["t", "w"], sort=True).agg(c=("c", "last"), h=("h", "max"), l=("l", "min")).dropna()
+    t = weekly.index.get_level_values("t").to_numpy()
+    w = weekly.index.get_level_values("w").to_numpy()
+    c, h, l = (weekly[col].to_numpy() for col in ("c", "h", "l"))
+    bounds = np.searchsorted(t, np.arange(len(frames) + 1))
+
+    out = {}
+    for i, (ticker, data) in enumerate(frames.items()):
+        a, b = bounds[i], bounds[i + 1]
+        labels = w[a:b].astype("datetime64[D]").astype("datetime64[ns]")
+        tz = pd.DatetimeIndex(data.index).tz
+        if tz is not None:
+            labels = pd.DatetimeIndex(labels).tz_localize(tz).tz_convert("UTC").tz_localize(None).to_numpy()
+        out[ticker] = (c[a:b], h[a:b], l[a:b], labels)
+    return out
+
+
+def _batch_density_peaks(
+    clouds: Dict[str, Tuple[np.ndarray, np.ndarray, float]],
+) -> Dict[str, Optional[Tuple[np.ndarray, np.ndarray]]]:
+    """KDE peaks for many price clouds; densities are evaluated a chunk of clouds at a time."""
+    tickers = sorted(clouds, key=lambda t: len(clouds[t][0]))  # Similar sizes share a chunk: less padding
+    out: Dict[str, Optional[Tuple[np.ndarray, np.ndarray]]] = {}
+    start = 0
+    while start < len(tickers):
+        width = len(clouds[tickers[start]][0])
+        step = max(1, _KDE_BATCH_CELLS // (GRID_POINTS * width))
+        chunk = tickers[start:start + step]
+        width = len(clouds[chunk[-1]][0])
+        start += len(chunk)
+
+        # Clouds left-aligned and zero-weight padded to the chunk's widest
+        points = np.zeros((len(chunk), width))
+        weights = np.zeros((len(chunk), width))
+        bw = np.empty(len(chunk))
+        for row, ticker in enumerate(chunk):
+            p, w, bw[row] = clouds[ticker]
+            points[row, :len(p)] = p
+            weights[row, :len(w)] = w
+        p_min = np.array([clouds[t][0].min() for t in chunk]) * 0.98
+        p_max = np.array([clouds[t][0].max() for t in chunk]) * 1.02
+        x = np.linspace(p_min, p_max, GRID_POINTS, axis=1)
+
+        if SR_KDE_METHOD == "fft":
+            density = _binned_kde_rows(points, weights, bw, x)
+        else:
+            density = _direct_kde_rows(points, weights, bw, x)
+        for row, ticker in enumerate(chunk):
+            out[ticker] = _find_density_peaks(x[row], density[row])
+    return out
+
+
+def _kde_sigma(points: np.ndarray, w: np.ndarray, bw_factor: np.ndarray) -> np.ndarray:
+    # gaussian_kde bandwidth: weighted (unbiased) variance × bw_factor², per row
+    mean = np.sum(w * points, axis=1, keepdims=True)
+    var = np.sum(w * (points - mean) ** 2, axis=1) / (1.0 - np.sum(w ** 2, axis=1))
+    return np.sqrt(var) * bw_factor
+
+
+def _direct_kde_rows(points: np.ndarray, weights: np.ndarray, bw_factor: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Exact weighted Gaussian KDE, one row per cloud: the gaussian_kde sum
+    evaluated for every row and grid point at once.  *points*/*weights* are
+    zero-weight padded; *x* holds each row's grid.
+    """
+    w = weights / weights.sum(axis=1, keepdims=True)
+    sigma = _kde_sigma(points, w, bw_factor)
+    z = (x[:, :, None] - points[:, None, :]) / sigma[:, None, None]
+    return np.einsum("rgp,rp->rg", np.exp(-0.5 * z * z), w) / (np.sqrt(2.0 * np.pi) * sigma)[:, None]
+
+
+def _binned_kde_rows(points: np.ndarray, weights: np.ndarray, bw_factor: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Weighted Gaussian KDE per row by linear binning and one FFT
+    convolution: O(n + m log m) per cloud instead of O(n × m).
+
+    Uses gaussian_kde's bandwidth and normalisation, so densities agree
+    with scipy up to binning error.  Inputs are shaped as for
+    _direct_kde_rows.
+    """
+    w = weights / weights.sum(axis=1, keepdims=True)
+    sigma = _kde_sigma(points, w, bw_factor)
+
+    # Linear binning: split each weight between its two neighbouring grid nodes
+    rows, m = x.shape
+    dx = x[:, 1] - x[:, 0]
+    pos = (points - x[:, :1]) / dx[:, None]
+    lo = np.clip(np.floor(pos).astype(int), 0, m - 2)
+    frac = np.clip(pos - lo, 0.0, 1.0)
+    flat = lo + (np.arange(rows) * m)[:, None]
+    grid = np.bincount(flat.ravel(), weights=(w * (1.0 - frac)).ravel(), minlength=rows * m)
+    grid += np.bincount((flat + 1).ravel(), weights=(w * frac).ravel(), minlength=rows * m)
+
+    offsets = np.arange(-(m - 1), m)[None, :] * dx[:, None]
+    kernel = np.exp(-0.5 * (offsets / sigma[:, None]) ** 2) / (np.sqrt(2.0 * np.pi) * sigma)[:, None]
+    density = fftconvolve(grid.reshape(rows, m), kernel, mode="same", axes=1)
+    return np.maximum(density, 0.0)  # FFT round-off can dip just below zero
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _load(ticker: str, df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    if df is None:
+        df = get_provider().history(ticker, period="2y")
+    return _flat(df)
+
+
+def _flat(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Read-only bar view of *df* (no copy when already flat), or None if empty."""
+    if df is None or df.empty:
+        return None
+    return bar_view(df)
 
 
 def _adj_col(df: pd.DataFrame) -> str:
@@ -6,7 +6,7 @@ Two detection paths — both still surface as "VCP" setup type:
 PATH A — DRY (Coiled Spring):
   1. Trend      : 8 EMA > 20 EMA  AND  Close > 50 SMA
   2. Contraction: Mean True Range of last 5 bars < Mean TR of prior 20 bars
-  3. U-shape    : scipy curve_fit parabola over last 15 bars → a > 0
+  3. U-shape    : least-squares parabola over last 15 bars → a > 0
                   (U-shape accumulation, reject V-shape drops)
   4. Volume     : Dry-up phase (last 3 days avg < 50-day Vol SMA)
   5. Location   : Price is consolidating strictly just below an Engine 1
@@ -27,15 +27,22 @@ Risk Math (both paths):
 
 import os
 import sys
+from collections.abc import Sequence
 from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import curve_fit
 from scipy.signal import find_peaks
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from indicators import ema as _ema, sma as _sma, atr as _atr, true_range as _tr
+from constants import (
+    TRENDLINE_LOOKBACK,
+    TRENDLINE_MAX_PIVOTS,
+    TRENDLINE_TOUCH_PCT,
+    TRENDLINE_VIOLATION_WEIGHT,
+)
+from indicators import IndicatorContext, bar_view
+from polyfit import quadratic_fit
 
 
 # ---------------------------------------------------------------------------
@@ -45,22 +52,24 @@ from indicators import ema as _ema, sma as _sma, atr as _atr, true_range as _tr
 def _detect_descending_trendline(
     ticker: str,
     df: pd.DataFrame,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """
     Detect a descending trendline from the last 120 days of High prices.
 
     Algorithm:
     1. Find swing highs using find_peaks on last 120 days
-    2. Take the 2 most prominent peaks
-    3. Fit a line through them (compute slope)
-    4. Validate: negative slope, ≥2 touches within 0.8%
-    5. Generate {time, value} series from peak1 to today
+    2. Pair up the most prominent peaks (TRENDLINE_MAX_PIVOTS) into candidate lines
+    3. Keep descending lines; score each by touches within 0.8% minus
+       weighted violations (highs above the line after peak1)
+    4. Take the best score (≥2 touches)
+    5. Generate {time, value} series from peak1 to today (a TrendlineSeries)
 
-    Returns dict with keys: series, peak1, peak2, slope, touches
+    Returns dict with keys: series, peak1, peak2, slope, touches, violations
     Or None if no valid descending trendline found.
     """
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 30:
             return None
 
@@ -68,7 +77,7 @@ def _detect_descending_trendline(
         dates = data.index
 
         # Use last 120 days for peak detection
-        lookback = min(120, len(high))
+        lookback = min(TRENDLINE_LOOKBACK, len(high))
         highs = high[-lookback:]
         date_slice = dates[-lookback:]
 
@@ -79,53 +88,17 @@ def _detect_descending_trendline(
         if len(peak_idx) < 2:
             return None
 
-        # Sort by prominence (descending), take top 2, then sort by time
-        prominences = props["prominences"]
-        sorted_order = np.argsort(prominences)[::-1]
-        top2_raw = peak_idx[sorted_order[:2]]
-        top2 = sorted(top2_raw.tolist())  # Sort by time index
-
-        p1_idx, p2_idx = top2[0], top2[1]
+        # Best-scoring descending line through two of the peaks
+        best = _best_trendline(highs, date_slice, peak_idx, props["prominences"], descending=True)
+        if best is None:
+            return None
+        p1_idx, p2_idx, slope, touches, violations = best
         p1_price = float(highs[p1_idx])
-        p2_price = float(highs[p2_idx])
         p1_date = date_slice[p1_idx]
         p2_date = date_slice[p2_idx]
 
-        # Compute slope (price per day)
-        day_diff = (p2_date - p1_date).days
-        if day_diff <= 0:
-            return None
-
-        slope = (p2_price - p1_price) / day_diff
-
-        # Validate: must be descending (negative slope)
-        if slope >= 0:
-            return None
-
-        # Count touches: bars within 0.8% of trendline value
-        touches = 0
-        for i in range(len(highs)):
-            days_from_p1 = (date_slice[i] - p1_date).days
-            trendline_val = p1_price + slope * days_from_p1
-            if trendline_val > 0 and abs(highs[i] - trendline_val) / trendline_val <= 0.008:
-                touches += 1
-
-        if touches < 2:
-            return None
-
-        # Generate series at actual trading dates from p1 to end of df
-        series = []
-        for date in data.index:
-            if date < p1_date:
-                continue
-            days_from_p1 = (date - p1_date).days
-            val = p1_price + slope * days_from_p1
-            if val > 0:
-                series.append({
-                    "time": date.strftime("%Y-%m-%d"),
-                    "value": round(float(val), 2)
-                })
-
+        # Series at actual trading dates from p1 to end of df
+        series = TrendlineSeries.from_line(dates, p1_date, p1_price, slope)
         if not series:
             return None
 
@@ -137,10 +110,11 @@ def _detect_descending_trendline(
             },
             "peak2": {
                 "date": p2_date.strftime("%Y-%m-%d"),
-                "price": round(p2_price, 2),
+                "price": round(float(highs[p2_idx]), 2),
             },
             "slope": round(slope, 6),
             "touches": touches,
+            "violations": violations,
         }
 
     except Exception as exc:  # noqa: BLE001
@@ -151,22 +125,24 @@ def _detect_descending_trendline(
 def _detect_ascending_trendline(
     ticker: str,
     df: pd.DataFrame,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """
     Detect an ascending trendline from the last 120 days of Low prices.
 
     Algorithm (mirrors descending):
     1. Find swing lows using find_peaks (inverted)
-    2. Take 2 most prominent lows
-    3. Fit line through them (compute slope)
-    4. Validate: positive slope, ≥2 touches within 0.8%
-    5. Generate {time, value} series from trough1 to today
+    2. Pair up the most prominent lows into candidate lines
+    3. Keep ascending lines; score each by touches within 0.8% minus
+       weighted violations (lows below the line after trough1)
+    4. Take the best score (≥2 touches)
+    5. Generate {time, value} series from trough1 to today (a TrendlineSeries)
 
-    Returns dict with keys: series, trough1, trough2, slope, touches
+    Returns dict with keys: series, trough1, trough2, slope, touches, violations
     Or None if no valid ascending trendline found.
     """
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 30:
             return None
 
@@ -174,7 +150,7 @@ def _detect_ascending_trendline(
         dates = data.index
 
         # Use last 120 days for trough detection
-        lookback = min(120, len(low))
+        lookback = min(TRENDLINE_LOOKBACK, len(low))
         lows = low[-lookback:]
         date_slice = dates[-lookback:]
 
@@ -186,53 +162,17 @@ def _detect_ascending_trendline(
         if len(trough_idx) < 2:
             return None
 
-        # Sort by prominence (descending), take top 2, then sort by time
-        prominences = props["prominences"]
-        sorted_order = np.argsort(prominences)[::-1]
-        top2_raw = trough_idx[sorted_order[:2]]
-        top2 = sorted(top2_raw.tolist())  # Sort by time index
-
-        t1_idx, t2_idx = top2[0], top2[1]
+        # Best-scoring ascending line through two of the troughs
+        best = _best_trendline(lows, date_slice, trough_idx, props["prominences"], descending=False)
+        if best is None:
+            return None
+        t1_idx, t2_idx, slope, touches, violations = best
         t1_price = float(lows[t1_idx])
-        t2_price = float(lows[t2_idx])
         t1_date = date_slice[t1_idx]
         t2_date = date_slice[t2_idx]
 
-        # Compute slope (price per day)
-        day_diff = (t2_date - t1_date).days
-        if day_diff <= 0:
-            return None
-
-        slope = (t2_price - t1_price) / day_diff
-
-        # Validate: must be ascending (positive slope)
-        if slope <= 0:
-            return None
-
-        # Count touches: bars within 0.8% of trendline value
-        touches = 0
-        for i in range(len(lows)):
-            days_from_t1 = (date_slice[i] - t1_date).days
-            trendline_val = t1_price + slope * days_from_t1
-            if trendline_val > 0 and abs(lows[i] - trendline_val) / trendline_val <= 0.008:
-                touches += 1
-
-        if touches < 2:
-            return None
-
-        # Generate series at actual trading dates from t1 to end of df
-        series = []
-        for date in data.index:
-            if date < t1_date:
-                continue
-            days_from_t1 = (date - t1_date).days
-            val = t1_price + slope * days_from_t1
-            if val > 0:
-                series.append({
-                    "time": date.strftime("%Y-%m-%d"),
-                    "value": round(float(val), 2)
-                })
-
+        # Series at actual trading dates from t1 to end of df
+        series = TrendlineSeries.from_line(dates, t1_date, t1_price, slope)
         if not series:
             return None
 
@@ -244,10 +184,11 @@ def _detect_ascending_trendline(
             },
             "trough2": {
                 "date": t2_date.strftime("%Y-%m-%d"),
-                "price": round(t2_price, 2),
+                "price": round(float(lows[t2_idx]), 2),
             },
             "slope": round(slope, 6),
             "touches": touches,
+            "violations": violations,
         }
 
     except Exception as exc:  # noqa: BLE001
@@ -258,6 +199,7 @@ def _detect_ascending_trendline(
 def detect_trendline(
     ticker: str,
     df: pd.DataFrame,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """
     Detect both descending (resistance) and ascending (support) trendlines.
@@ -274,10 +216,10 @@ def detect_trendline(
     """
     try:
         # Detect descending (resistance)
-        descending = _detect_descending_trendline(ticker, df)
+        descending = _detect_descending_trendline(ticker, df, ctx)
 
         # Detect ascending (support)
-        ascending = _detect_ascending_trendline(ticker, df)
+        ascending = _detect_ascending_trendline(ticker, df, ctx)
 
         # Return None only if both are None
         if descending is None and ascending is None:
@@ -298,6 +240,7 @@ def scan_near_breakout(
     df: pd.DataFrame,
     sr_zones: List[Dict],
     trendline: Optional[Dict] = None,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """
     Returns a near-breakout dict if price is within 1.5% BELOW a resistance
@@ -308,7 +251,7 @@ def scan_near_breakout(
     Or None if not near any level.
     """
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 20:
             return None
 
@@ -479,6 +422,9 @@ def scan_vcp(
     rs_ratio: float = 0.0,
     rs_52w_high: float = 0.0,
     rs_blue_dot: bool = False,
+    trendline: Optional[Dict] = None,
+    ctx: Optional[IndicatorContext] = None,
+    u_shape: Optional[bool] = None,
 ) -> Optional[Dict]:
     """
     Returns a setup dict if a valid VCP (Path A), Confirmed Breakout (Path B),
@@ -496,11 +442,23 @@ def scan_vcp(
         52-week high of the RS ratio.
     rs_blue_dot : bool
         True if RS ratio is at 52-week high (institutional signal).
+    trendline : dict, optional
+        detect_trendline() result for this ticker, computed once by the
+        caller and shared with the other engines; Path C needs it.
+    ctx : IndicatorContext, optional
+        Shared per-ticker indicator cache built by the caller; a private one
+        is created when omitted.
+    u_shape : bool, optional
+        Path A's U-shape verdict for the last 15 closes, fitted for the
+        whole batch by the pre-screen (prescreen "vcp_u_shape"); fitted
+        here when omitted.
     """
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 60:
             return None
+        if ctx is None:
+            ctx = IndicatorContext(data)
 
         adj = _adj_col(data)
         close  = data[adj]
@@ -512,11 +470,11 @@ def scan_vcp(
             return None
 
         # ── Indicators ───────────────────────────────────────────────────
-        ema8  = _ema(close, 8)
-        ema20 = _ema(close, 20)
-        sma50 = _sma(close, 50)
-        sma200 = _sma(close, 200)  # Professional VCP: long-term trend filter
-        atr14 = _atr(high, low, close, 14)
+        ema8  = ctx.ema(8)
+        ema20 = ctx.ema(20)
+        sma50 = ctx.sma(50)
+        sma200 = ctx.sma(200)  # Professional VCP: long-term trend filter
+        atr14 = ctx.atr(14)
 
         # Extract scalars and use .item() for numpy types to avoid Series comparison errors
         lc   = float(close.iloc[-1].item() if hasattr(close.iloc[-1], 'item') else close.iloc[-1])
@@ -538,7 +496,7 @@ def scan_vcp(
             return None
 
         # ── Shared: Volume SMA ────────────────────────────────────────────
-        vol_sma50 = volume.rolling(50).mean()
+        vol_sma50 = ctx.vol_sma(50)
         vol_sma_val = vol_sma50.iloc[-1]
         if pd.isna(vol_sma_val):
             return None
@@ -566,7 +524,7 @@ def scan_vcp(
         base_depth_pct, is_valid_depth = _calculate_base_depth(high, low, lookback=30)
 
         # ── FEATURE 3: Count volatility contractions (3T, 4T, 5T pattern) ────
-        tr = _tr(high, low, close).dropna()
+        tr = ctx.true_range().dropna()
         contraction_count, contraction_pattern, is_progressive = _count_contractions(tr, lookback=25)
 
         # ── PATH B — Confirmed Breakout ───────────────────────────────────
@@ -630,11 +588,10 @@ def scan_vcp(
 
         # ── PATH C — Trendline Breakout ────────────────────────────────────
         # Check if price broke above a descending trendline with volume
-        trendline_result = detect_trendline(ticker, df)
         is_trendline_breakout = False
         trendline_data = None
 
-        desc_tl = trendline_result.get("descending") if trendline_result else None
+        desc_tl = trendline.get("descending") if trendline else None
         if desc_tl is not None and desc_tl.get("series"):
             tl_today = desc_tl["series"][-1]["value"]
             # Breakout: close above descending trendline + vol surge ≥120% + trend filter (already checked)
@@ -643,7 +600,7 @@ def scan_vcp(
                 pct_above_tl = (lc - tl_today) / tl_today
                 if 0 < pct_above_tl <= 0.02 and lvol >= 1.2 * avg_vol:
                     is_trendline_breakout = True
-                    trendline_data = trendline_result
+                    trendline_data = trendline_to_json(trendline)
 
         if is_trendline_breakout and trendline_data is not None:
             entry      = round(lh * 1.001, 2)
@@ -810,27 +767,22 @@ def scan_vcp(
             return None
 
         # ── A3. U-shape parabolic check ───────────────────────────────────
-        lb      = min(15, len(close) - 5)
-        recent  = close.values[-lb:].astype(float)
-        if np.any(np.isnan(recent)):
-            return None
-
-        xv             = np.arange(lb, dtype=float)
-        mean_p, std_p  = recent.mean(), recent.std()
-        if std_p < 1e-8:
-            return None
-
-        yn   = (recent - mean_p) / std_p
-        is_u = False
-        try:
-            popt, _ = curve_fit(_parabola, xv, yn, maxfev=2000)
-            a, b, _ = popt
+        if u_shape is None:
+            lb      = min(15, len(close) - 5)
+            recent  = close.values[-lb:].astype(float)
+            if np.any(np.isnan(recent)):
+                return None
+
+            mean_p, std_p  = recent.mean(), recent.std()
+            if std_p < 1e-8:
+                return None
+
+            yn   = (recent - mean_p) / std_p
+            a, b, _  = quadratic_fit(yn)
             vertex_x = -b / (2.0 * a) if abs(a) > 1e-8 else -1.0
-            is_u = a > 0.005 and 0.0 <= vertex_x <= float(lb)
-        except Exception:
-            is_u = False
+            u_shape  = a > 0.005 and 0.0 <= vertex_x <= float(lb)
 
-        if not is_u:
+        if not u_shape:
             return None
 
         # ── A4. Volume dry-up ─────────────────────────────────────────────
@@ -903,19 +855,146 @@ def scan_vcp(
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# Trendline series
 # ---------------------------------------------------------------------------
 
-def _parabola(x: np.ndarray, a: float, b: float, c: float) -> np.ndarray:
-    return a * x**2 + b * x + c
+_NS_PER_DAY = 86_400_000_000_000
+
+
+class TrendlineSeries(Sequence):
+    """
+    A trendline's ``{"time": "YYYY-MM-DD", "value": float}`` points at
+    trading dates, stored as two arrays and materialized per item on access.
+
+    Engines only read the last point, so a scan never builds the per-bar
+    dicts.  trendline_to_json() turns a trendline into plain lists for
+    JSON.
+    """
+
+    __slots__ = ("days", "values")
+
+    def __init__(self, days: np.ndarray, values: np.ndarray) -> None:
+        self.days = days        # datetime64[D] calendar dates
+        self.values = values    # float64 line values (all > 0)
+
+    @classmethod
+    def from_line(
+        cls, index: pd.DatetimeIndex, anchor: pd.Timestamp, anchor_price: float, slope: float
+    ) -> "TrendlineSeries":
+        """Line values at every bar of *index* from *anchor* on, keeping positive values only."""
+        ns = _as_ns(index)
+        anchor_ns = pd.Timestamp(anchor).as_unit("ns").value
+        after = ns >= anchor_ns
+        values = anchor_price + slope * ((ns[after] - anchor_ns) // _NS_PER_DAY)
+        keep = values > 0
+        wall = index.tz_localize(None) if index.tz is not None else index
+        days = wall[after][keep].values.astype("datetime64[D]")
+        return cls(days, values[keep])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return {"time": str(self.days[i]), "value": round(float(self.values[i]), 2)}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TrendlineSeries, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def to_list(self) -> List[Dict]:
+        times = np.datetime_as_string(self.days, unit="D").tolist()
+        return [{"time": t, "value": round(v, 2)} for t, v in zip(times, self.values.tolist())]
+
+
+def trendline_to_json(trendline: Optional[Dict]) -> Optional[Dict]:
+    """Copy of a detect_trendline result with every series as a plain list of dicts."""
+    if trendline is None:
+        return None
+    out = {}
+    for side, line in trendline.items():
+        if isinstance(line, dict) and isinstance(line.get("series"), TrendlineSeries):
+            line = dict(line, series=line["series"].to_list())
+        out[side] = line
+    return out
+
 
+def _as_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    return pd.DatetimeIndex(index).as_unit("ns").asi8
 
-def _prep(df: pd.DataFrame) -> Optional[pd.DataFrame]:
-    if df is None or df.empty:
+
+def _best_trendline(
+    prices: np.ndarray,
+    index: pd.DatetimeIndex,
+    pivots: np.ndarray,
+    prominences: np.ndarray,
+    descending: bool,
+) -> Optional[tuple]:
+    """
+    Score every line through two pivots at once and return the best as
+    ``(anchor1, anchor2, slope, touches, violations)``, or None.
+
+    Only the TRENDLINE_MAX_PIVOTS most prominent pivots are paired, so at
+    most 66 candidates × len(prices) bars are evaluated, as one broadcast.
+    Bars are counted from the first anchor on.  A touch is a bar within
+    TRENDLINE_TOUCH_PCT of the line; a violation is a bar beyond it on the
+    wrong side (today excluded, so a fresh breakout does not count).  Ties
+    go to the candidate with the later second anchor, then the more
+    prominent pair.
+    """
+    if len(pivots) > TRENDLINE_MAX_PIVOTS:
+        top = np.argsort(prominences)[::-1][:TRENDLINE_MAX_PIVOTS]
+        pivots, prominences = pivots[top], prominences[top]
+    order = np.argsort(pivots)
+    pivots, prominences = pivots[order], prominences[order]
+    first, second = np.triu_indices(len(pivots), k=1)
+    a, b = pivots[first], pivots[second]
+
+    ns = _as_ns(index)
+    day_diff = (ns[b] - ns[a]) // _NS_PER_DAY
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (prices[b] - prices[a]) / day_diff
+    ok = (day_diff > 0) & ((slope < 0) if descending else (slope > 0))
+    if not ok.any():
         return None
-    data = df.copy()
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
+    a, b, slope = a[ok], b[ok], slope[ok]
+    pair_prominence = (prominences[first] + prominences[second])[ok]
+
+    # (candidates × bars) line values, days counted from each candidate's own anchor
+    days = (ns[None, :] - ns[a][:, None]) // _NS_PER_DAY
+    line = prices[a][:, None] + slope[:, None] * days
+    bars = np.arange(len(prices))
+    in_play = (bars[None, :] >= a[:, None]) & (line > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap = (prices[None, :] - line) / line
+        touches = np.count_nonzero(in_play & (np.abs(gap) <= TRENDLINE_TOUCH_PCT), axis=1)
+        wrong_side = gap > TRENDLINE_TOUCH_PCT if descending else gap < -TRENDLINE_TOUCH_PCT
+    violations = np.count_nonzero(wrong_side & in_play & (bars[None, :] < len(prices) - 1), axis=1)
+
+    score = touches - TRENDLINE_VIOLATION_WEIGHT * violations
+    score = np.where(touches >= 2, score, -np.inf)
+    best = np.lexsort((pair_prominence, b, score))[-1]
+    if not np.isfinite(score[best]):
+        return None
+    return int(a[best]), int(b[best]), float(slope[best]), int(touches[best]), int(violations[best])
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _prep(df: pd.DataFrame, ctx: Optional[IndicatorContext] = None) -> Optional[pd.DataFrame]:
+    # Read-only bar view shared with the caller and the other engines: never copied
+    if ctx is not None:
+        data = ctx.df
+        if data is None or data.empty:
+            return None
+    else:
+        if df is None or df.empty:
+            return None
+        data = bar_view(df)
     required = {"High", "Low", "Volume"}
     if not required.issubset(data.columns):
         return None
@@ -27,7 +27,7 @@ import numpy as np
 import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from indicators import ema as _ema, sma as _sma, atr as _atr, cci as _cci
+from indicators import IndicatorContext, bar_view
 
 
 # ---------------------------------------------------------------------------
@@ -71,15 +71,18 @@ def scan_pullback(
     df: pd.DataFrame,
     sr_zones: List[Dict],
     trendline: Optional[Dict] = None,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """
     Returns a setup dict if a valid tactical pullback is found, else None.
     Checks both horizontal support zones AND ascending trendlines.
     """
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 60:
             return None
+        if ctx is None:
+            ctx = IndicatorContext(data)
 
         adj = _adj_col(data)
         close = data[adj]
@@ -90,11 +93,11 @@ def scan_pullback(
             return None
 
         # ── Indicators ───────────────────────────────────────────────────
-        ema8 = _ema(close, 8)
-        ema20 = _ema(close, 20)
-        sma50 = _sma(close, 50)
-        cci20 = _cci(high, low, close, 20)
-        atr14 = _atr(high, low, close, 14)
+        ema8 = ctx.ema(8)
+        ema20 = ctx.ema(20)
+        sma50 = ctx.sma(50)
+        cci20 = ctx.cci(20)
+        atr14 = ctx.atr(14)
 
         cci_clean = cci20.dropna()
         if len(cci_clean) < 2:
@@ -206,6 +209,7 @@ def scan_relaxed_pullback(
     df: pd.DataFrame,
     sr_zones: List[Dict],
     trendline: Optional[Dict] = None,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """
     Relaxed tactical pullback: triggers when no strict pullback found.
@@ -219,9 +223,11 @@ def scan_relaxed_pullback(
     Also checks for ascending trendline support if no horizontal zone found.
     """
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 60:
             return None
+        if ctx is None:
+            ctx = IndicatorContext(data)
 
         adj = _adj_col(data)
         close = data[adj]
@@ -233,11 +239,11 @@ def scan_relaxed_pullback(
             return None
 
         # ── Indicators ───────────────────────────────────────────────────
-        ema8 = _ema(close, 8)
-        ema20 = _ema(close, 20)
-        sma50 = _sma(close, 50)
-        cci20 = _cci(high, low, close, 20)
-        atr14 = _atr(high, low, close, 14)
+        ema8 = ctx.ema(8)
+        ema20 = ctx.ema(20)
+        sma50 = ctx.sma(50)
+        cci20 = ctx.cci(20)
+        atr14 = ctx.atr(14)
 
         cci_clean = cci20.dropna()
         if len(cci_clean) < 2:
@@ -276,7 +282,7 @@ def scan_relaxed_pullback(
             return None
 
         # ── 4. Low Volume: 3-day avg <= 100% of 50-day SMA ────────────────
-        vol_sma50 = volume.rolling(50).mean()
+        vol_sma50 = ctx.vol_sma(50)
         vsm_val = vol_sma50.iloc[-1]
         vsm_scalar = float(vsm_val.item() if hasattr(vsm_val, 'item') else vsm_val)
         if pd.isna(vsm_scalar) or vsm_scalar <= 0:
@@ -347,12 +353,16 @@ def scan_relaxed_pullback(
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _prep(df: pd.DataFrame) -> Optional[pd.DataFrame]:
-    if df is None or df.empty:
-        return None
-    data = df.copy()
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
+def _prep(df: pd.DataFrame, ctx: Optional[IndicatorContext] = None) -> Optional[pd.DataFrame]:
+    # Read-only bar view shared with the caller and the other engines: never copied
+    if ctx is not None:
+        data = ctx.df
+        if data is None or data.empty:
+            return None
+    else:
+        if df is None or df.empty:
+            return None
+        data = bar_view(df)
     required = {"High", "Low"}
     if not required.issubset(data.columns):
         return None
@@ -16,6 +16,7 @@ import pandas as pd
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from constants import TRADING_DAYS_IN_YEAR, RS_BLUE_DOT_TOLERANCE_PCT
+from indicators import bar_view
 
 
 def calculate_rs_line(
@@ -41,11 +42,9 @@ def calculate_rs_line(
         if ticker_df is None or ticker_df.empty or spy_df is None or spy_df.empty:
             return None
 
-        # Flatten MultiIndex if needed
-        if isinstance(ticker_df.columns, pd.MultiIndex):
-            ticker_df.columns = ticker_df.columns.get_level_values(0)
-        if isinstance(spy_df.columns, pd.MultiIndex):
-            spy_df.columns = spy_df.columns.get_level_values(0)
+        # Flatten MultiIndex if needed (views: the callers' frames are shared)
+        ticker_df = bar_view(ticker_df)
+        spy_df = bar_view(spy_df)
 
         # Use Adj Close if available, else Close
         ticker_close_col = "Adj Close" if "Adj Close" in ticker_df.columns else "Close"
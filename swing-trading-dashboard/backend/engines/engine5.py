@@ -34,10 +34,10 @@ from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import curve_fit
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from indicators import atr as _atr
+from indicators import IndicatorContext, bar_view
+from polyfit import quadratic_fit
 
 
 def scan_base_pattern(
@@ -47,10 +47,11 @@ def scan_base_pattern(
     rs_ratio: float = 0.0,
     rs_52w_high: float = 0.0,
     rs_blue_dot: bool = False,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """Main entry point. Returns the highest-quality base setup found, or None."""
-    ch = scan_cup_handle(ticker, df, spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot)
-    fb = scan_flat_base(ticker, df, spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot)
+    ch = scan_cup_handle(ticker, df, spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot, ctx)
+    fb = scan_flat_base(ticker, df, spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot, ctx)
     candidates = [s for s in [ch, fb] if s is not None and s.get("quality_score", 0) >= 25]
     if not candidates:
         return None
@@ -64,12 +65,15 @@ def scan_cup_handle(
     rs_ratio: float = 0.0,
     rs_52w_high: float = 0.0,
     rs_blue_dot: bool = False,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """Scan for a Cup & Handle pattern. Returns setup dict or None."""
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 60:
             return None
+        if ctx is None:
+            ctx = IndicatorContext(data)
 
         adj = _adj_col(data)
         close_s = data[adj]
@@ -81,8 +85,8 @@ def scan_cup_handle(
             return None
 
         # ── Trend filter: price must be above 200 SMA and 50 SMA ────────
-        sma200 = close_s.rolling(200).mean()
-        sma50 = close_s.rolling(50).mean()
+        sma200 = ctx.sma(200)
+        sma50 = ctx.sma(50)
         lc_val = close_s.iloc[-1]
         lc_raw = float(lc_val.item() if hasattr(lc_val, 'item') else lc_val)
         l200_val = sma200.iloc[-1]
@@ -113,13 +117,13 @@ def scan_cup_handle(
         close = close_s.values.astype(float)
         volume = volume_s.values.astype(float)
 
-        atr14 = _atr(high_s, low_s, close_s, 14)
+        atr14 = ctx.atr(14)
         latr_val = atr14.iloc[-1]
         latr = float(latr_val.item() if hasattr(latr_val, 'item') else latr_val)
         if np.isnan(latr) or latr <= 0:
             return None
 
-        vol_sma_series = volume_s.rolling(50).mean()
+        vol_sma_series = ctx.vol_sma(50)
         vol_sma_val = vol_sma_series.iloc[-1]
         vol_sma50 = float(vol_sma_val.item() if hasattr(vol_sma_val, 'item') else vol_sma_val)
         if np.isnan(vol_sma50) or vol_sma50 <= 0:
@@ -232,12 +236,15 @@ def scan_flat_base(
     rs_ratio: float = 0.0,
     rs_52w_high: float = 0.0,
     rs_blue_dot: bool = False,
+    ctx: Optional[IndicatorContext] = None,
 ) -> Optional[Dict]:
     """Scan for a Flat Base pattern. Returns setup dict or None."""
     try:
-        data = _prep(df)
+        data = _prep(df, ctx)
         if data is None or len(data) < 60:
             return None
+        if ctx is None:
+            ctx = IndicatorContext(data)
 
         adj = _adj_col(data)
         close_s = data[adj]
@@ -249,8 +256,8 @@ def scan_flat_base(
             return None
 
         # ── Trend filter: price must be above 200 SMA and 50 SMA ────────
-        sma200 = close_s.rolling(200).mean()
-        sma50 = close_s.rolling(50).mean()
+        sma200 = ctx.sma(200)
+        sma50 = ctx.sma(50)
         lc_val = close_s.iloc[-1]
         lc = float(lc_val.item() if hasattr(lc_val, 'item') else lc_val)
         l200_val = sma200.iloc[-1]
@@ -314,8 +321,8 @@ def scan_flat_base(
                 return None
 
         # Volume contraction: 10-day avg <= 75% of 50-day avg
-        vol_sma50_s = volume_s.rolling(50).mean()
-        vol_sma10_s = volume_s.rolling(10).mean()
+        vol_sma50_s = ctx.vol_sma(50)
+        vol_sma10_s = ctx.vol_sma(10)
         vsm50_val = vol_sma50_s.iloc[-1]
         vsm10_val = vol_sma10_s.iloc[-1]
         vsm50 = float(vsm50_val.item() if hasattr(vsm50_val, 'item') else vsm50_val)
@@ -329,7 +336,7 @@ def scan_flat_base(
             return None
 
         # ATR
-        atr14 = _atr(high_s, low_s, close_s, 14)
+        atr14 = ctx.atr(14)
         latr_val = atr14.iloc[-1]
         latr = float(latr_val.item() if hasattr(latr_val, 'item') else latr_val)
         if np.isnan(latr) or latr <= 0:
@@ -469,14 +476,7 @@ def _is_u_shaped(close: np.ndarray, cup: Dict) -> bool:
         if len(segment) < 6:
             return False
 
-        x = np.arange(len(segment), dtype=float)
-        y = segment
-
-        def parabola(x, a, b, c):
-            return a * x ** 2 + b * x + c
-
-        popt, _ = curve_fit(parabola, x, y, maxfev=3000)
-        return float(popt[0]) > 0
+        return float(quadratic_fit(segment)[0]) > 0
     except Exception:
         return False
 
@@ -568,12 +568,16 @@ def _quality_score(
     return int(round(rs_pts + tight_pts + vol_pts + rs_high_pts))
 
 
-def _prep(df: pd.DataFrame) -> Optional[pd.DataFrame]:
-    if df is None or df.empty:
-        return None
-    data = df.copy()
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
+def _prep(df: pd.DataFrame, ctx: Optional[IndicatorContext] = None) -> Optional[pd.DataFrame]:
+    # Read-only bar view shared with the caller and the other engines: never copied
+    if ctx is not None:
+        data = ctx.df
+        if data is None or data.empty:
+            return None
+    else:
+        if df is None or df.empty:
+            return None
+        data = bar_view(df)
     required = {"High", "Low", "Volume"}
     if not required.issubset(data.columns):
         return None
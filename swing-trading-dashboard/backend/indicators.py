@@ -3,8 +3,37 @@ Native technical indicator implementations.
 No external TA library required — pure pandas / numpy.
 """
 
+import threading
+
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from constants import DEBUG_READONLY_BARS
+
+
+def bar_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flat, de-duplicated view of an OHLCV frame — the form every engine reads.
+
+    Returns *df* itself when it is already normalized, so calling this again
+    on its own output is free.  The result may share memory with *df* and
+    must be treated as read-only.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.set_axis(df.columns.get_level_values(0), axis=1)
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
+    return df
+
+
+def bars_digest(df: pd.DataFrame) -> tuple:
+    """Cheap fingerprint of a frame's labels and values (for immutability checks)."""
+    return (
+        tuple(df.columns),
+        len(df),
+        int(pd.util.hash_pandas_object(df, index=True).sum()),
+    )
 
 
 def ema(series: pd.Series, length: int) -> pd.Series:
@@ -61,10 +90,126 @@ def cci(
     """
     tp = (high + low + close) / 3.0
     tp_sma = tp.rolling(window=length, min_periods=length).mean()
-    mean_dev = tp.rolling(window=length, min_periods=length).apply(
-        lambda x: np.mean(np.abs(x - x.mean())), raw=True
+    mean_dev = pd.Series(
+        mean_deviation(tp.to_numpy(dtype=np.float64), length), index=tp.index
     )
     # Avoid division by zero
     denom = constant * mean_dev
     denom = denom.replace(0, np.nan)
     return (tp - tp_sma) / denom
+
+
+def mean_deviation(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Rolling mean absolute deviation ``mean(|x − mean(x)|)`` over the last axis.
+
+    Evaluated on strided windows (no per-bar Python call); each window is
+    reduced exactly as ``np.mean(np.abs(x - x.mean()))`` would, so the result
+    is bit-identical to the old ``rolling().apply(lambda ...)``.  Windows that
+    are incomplete or contain NaN give NaN.
+    """
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < length:
+        return out
+    windows = sliding_window_view(values, length, axis=-1)
+    out[..., length - 1:] = np.abs(windows - windows.mean(axis=-1, keepdims=True)).mean(axis=-1)
+    return out
+
+
+def cci_batch(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    length: int = 20,
+    constant: float = 0.015,
+    chunk_rows: int = 256,
+) -> np.ndarray:
+    """
+    CCI for a (tickers × bars) matrix; row *i* equals ``cci()`` of ticker *i*.
+
+    Rows are processed in chunks of *chunk_rows* to bound the
+    (rows × bars × length) window temporary.
+    """
+    tp = (np.asarray(high, dtype=np.float64)
+          + np.asarray(low, dtype=np.float64)
+          + np.asarray(close, dtype=np.float64)) / 3.0
+    tp = np.atleast_2d(tp)
+    out = np.empty_like(tp)
+    for start in range(0, tp.shape[0], chunk_rows):
+        block = tp[start:start + chunk_rows]
+        # Column-wise pandas rolling mean == per-Series rolling mean, bit for bit
+        tp_sma = pd.DataFrame(block.T).rolling(window=length, min_periods=length).mean().to_numpy().T
+        denom = constant * mean_deviation(block, length)
+        denom[denom == 0] = np.nan
+        out[start:start + chunk_rows] = (block - tp_sma) / denom
+    return out
+
+
+class IndicatorContext:
+    """
+    Lazily computed, memoized indicators for one ticker's OHLCV frame.
+
+    Built once per ticker (in the scan's _process, the chart endpoint and
+    trade enrichment) and passed to every engine, so each indicator series
+    is computed at most once per ticker and the frame is never copied.
+    The frame is shared between engines and must be treated as read-only;
+    with DEBUG_READONLY_BARS set, assert_unchanged() verifies that.
+
+    Indicators are computed on the adjusted close (``Adj Close`` when
+    present, else ``Close``), exactly as the engines do on their own.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = bar_view(df)
+        self._cache: dict = {}
+        self._lock = threading.Lock()
+        self._digest = bars_digest(self.df) if DEBUG_READONLY_BARS else None
+
+    def assert_unchanged(self) -> None:
+        """Raise AssertionError if the shared frame was modified (debug mode only)."""
+        if self._digest is not None:
+            assert bars_digest(self.df) == self._digest, "engine modified the shared bar view"
+
+    def _memo(self, key, compute):
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+    @property
+    def close_col(self) -> str:
+        return "Adj Close" if "Adj Close" in self.df.columns else "Close"
+
+    @property
+    def close(self) -> pd.Series:
+        return self.df[self.close_col]
+
+    @property
+    def high(self) -> pd.Series:
+        return self.df["High"]
+
+    @property
+    def low(self) -> pd.Series:
+        return self.df["Low"]
+
+    @property
+    def volume(self) -> pd.Series:
+        return self.df["Volume"]
+
+    def ema(self, length: int) -> pd.Series:
+        return self._memo(("ema", length), lambda: ema(self.close, length))
+
+    def sma(self, length: int) -> pd.Series:
+        return self._memo(("sma", length), lambda: sma(self.close, length))
+
+    def atr(self, length: int = 14) -> pd.Series:
+        return self._memo(("atr", length), lambda: atr(self.high, self.low, self.close, length))
+
+    def true_range(self) -> pd.Series:
+        return self._memo(("tr",), lambda: true_range(self.high, self.low, self.close))
+
+    def cci(self, length: int = 20) -> pd.Series:
+        return self._memo(("cci", length), lambda: cci(self.high, self.low, self.close, length))
+
+    def vol_sma(self, length: int = 50) -> pd.Series:
+        return self._memo(("vol_sma", length), lambda: sma(self.volume, length))
@@ -16,9 +16,23 @@ Endpoints
 
 Architecture
 ────────────
-  • yfinance calls run in a ThreadPoolExecutor (blocking I/O).
+  • Market data comes from market_data.get_provider() — yfinance by default,
+    or an offline fixture replay (SWING_DATA_PROVIDER=fixture).
+  • Provider calls run in a ThreadPoolExecutor (blocking I/O).
+  • Scans download tickers in batches (one provider call per FETCH_BATCH_SIZE)
+    and feed a bounded queue drained by compute workers, so fetching overlaps
+    analysis and at most SCAN_QUEUE_SIZE frames wait in memory.
+  • Each batch is pre-screened in one vectorized pass (prescreen.py); engines
+    whose necessary last-bar conditions fail are not called for that ticker.
+  • Daily bars are cached per ticker in an on-disk bar store; only the
+    missing tail since the last stored date is downloaded.  After each scan
+    the store is compacted into a columnar np.memmap archive.
   • asyncio.Semaphore(5) caps concurrent yfinance requests.
-  • Heavy maths (KDE, curve_fit) also run in executor threads.
+  • S/R zone KDEs are computed for a whole batch in one call
+    (engines.engine1.calculate_sr_zones_batch).  The remaining per-ticker
+    work runs in analysis.analyze_ticker, on a pool of long-lived worker
+    processes (ANALYSIS_EXECUTOR="process", one per core) or in executor
+    threads ("thread").
   • All scan results are persisted to SQLite via aiosqlite.
   • Frontend reads only from the DB — no on-the-fly computation.
 
@@ -31,54 +45,73 @@ Run
 import asyncio
 import json
 import logging
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from typing import Annotated, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
-
-from indicators import ema as _ema, sma as _sma, cci as _cci, atr as _atr
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from analysis import analyze_packed, analyze_ticker, create_pool, pack_bars
+from bar_store import BarStore, align_index, bars_fingerprint, has_corporate_action
 from constants import (
+    ANALYSIS_EXECUTOR,
+    ANALYSIS_WORKERS,
+    BAR_STORE_DIR,
     CONCURRENCY_LIMIT,
     DATA_FETCH_PERIOD,
     DB_PATH,
+    DB_READ_CONNECTIONS,
     DAYS_3_MONTHS,
+    ENGINE_VERSION,
     FETCH_BACKOFF_BASE,
+    FETCH_BATCH_SIZE,
     FETCH_MAX_RETRIES,
     MAX_TICKERS_PER_SCAN,
     MIN_CANDLES_FOR_ANALYSIS,
     MIN_CANDLES_FOR_RS,
+    SCAN_COMPUTE_WORKERS,
+    SCAN_QUEUE_SIZE,
+    SR_KDE_METHOD,
     TRADING_DAYS_IN_YEAR,
 )
+from market_data import get_provider
 from database import (
+    close_db,
     complete_scan_run,
+    copy_ticker_results,
+    get_fingerprints,
     get_latest_regime,
     get_latest_scan_timestamp,
     get_latest_setups,
     get_sr_zones_for_ticker_from_db,
-    init_db,
+    query_setups,
+    open_db,
+    save_fingerprints,
     save_regime,
     save_scan_run,
     save_setup,
     batch_save_setups,
-    save_sr_zones,
+    ZoneWriter,
     add_trade,
     get_trades,
     close_trade,
 )
 from engines.engine0 import check_market_regime
-from engines.engine1 import calculate_sr_zones
-from engines.engine2 import scan_vcp, detect_trendline, scan_near_breakout
-from engines.engine3 import scan_pullback, scan_relaxed_pullback
-from engines.engine4 import calculate_rs_line, detect_rs_blue_dot, get_rs_stats
-from engines.engine5 import scan_base_pattern
+from engines.engine1 import calculate_sr_zones_batch
+from engines.engine2 import detect_trendline, trendline_to_json
+from engines.engine4 import get_rs_stats
+from indicators import IndicatorContext, bar_view
+from prescreen import prescreen
+from read_model import VIEWS as SETUP_VIEWS, SetupsReadModel
 from tickers import SCAN_UNIVERSE
 from universe_builder import load_universe, UNIVERSE_FILE
 
@@ -130,8 +163,12 @@ _scan_state: Dict = {
     "started_at": None,
     "last_completed": None,
     "last_error": None,
+    "timings": {},  # Wall-clock seconds per stage of the last scan
 }
 _semaphore: Optional[asyncio.Semaphore] = None
+_analysis_pool: Optional[ProcessPoolExecutor] = None  # None ⇒ engines run in the default thread pool
+_bar_store = BarStore(BAR_STORE_DIR)
+_setups_model = SetupsReadModel()  # Latest scan's setups, pre-decoded and pre-rendered
 
 
 # ────────────────────────────────────────────────────────────────────────────
@@ -140,11 +177,21 @@ _semaphore: Optional[asyncio.Semaphore] = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _semaphore
+    global _semaphore, _analysis_pool
     _semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
-    await init_db(DB_PATH)
-    log.info("SQLite DB initialised at %s", DB_PATH)
-    yield
+    await open_db(DB_PATH)
+    log.info("SQLite DB initialised at %s (WAL, %d pooled readers)", DB_PATH, DB_READ_CONNECTIONS)
+    await _setups_model.refresh(DB_PATH)
+    if ANALYSIS_EXECUTOR == "process":
+        loop = asyncio.get_event_loop()
+        _analysis_pool = await loop.run_in_executor(None, create_pool, ANALYSIS_WORKERS)
+    try:
+        yield
+    finally:
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown(cancel_futures=True)
+            _analysis_pool = None
+        await close_db()
 
 
 app = FastAPI(
@@ -171,10 +218,17 @@ app.add_middleware(
 # Data helpers
 # ────────────────────────────────────────────────────────────────────────────
 
-async def _fetch(ticker: str, retry_count: int = 0) -> Optional[pd.DataFrame]:
+async def _download(
+    ticker: str,
+    start: Optional[str] = None,
+    retry_count: int = 0,
+) -> Optional[pd.DataFrame]:
     """
     Download daily OHLCV for one ticker with retry logic and exponential backoff.
 
+    With *start* (``YYYY-MM-DD``) only bars from that date onward are requested;
+    otherwise the full ``DATA_FETCH_PERIOD`` window is downloaded.
+
     Semaphore is acquired per-attempt (not held across retries) to prevent
     deadlock when multiple tasks retry simultaneously.
     """
@@ -184,13 +238,9 @@ async def _fetch(ticker: str, retry_count: int = 0) -> Optional[pd.DataFrame]:
         async with _semaphore:
             loop = asyncio.get_event_loop()
             try:
-                def _do_download(t=ticker):
-                    """Bind ticker via default arg; use Ticker().history() for thread-safe isolation."""
-                    return yf.Ticker(t).history(
-                        period=DATA_FETCH_PERIOD,
-                        interval="1d",
-                        auto_adjust=False,
-                    )
+                def _do_download(t=ticker, s=start):
+                    """Bind ticker via default arg (closure-safe across executor threads)."""
+                    return get_provider().history(t, period=DATA_FETCH_PERIOD, start=s)
                 df = await loop.run_in_executor(None, _do_download)
 
                 if df is None or df.empty:
@@ -211,12 +261,6 @@ async def _fetch(ticker: str, retry_count: int = 0) -> Optional[pd.DataFrame]:
                         )
                         return None
                 else:
-                    # Flatten MultiIndex (newer yfinance versions)
-                    if isinstance(df.columns, pd.MultiIndex):
-                        df.columns = df.columns.get_level_values(0)
-                    # Deduplicate columns (yfinance can produce duplicates)
-                    if df.columns.duplicated().any():
-                        df = df.loc[:, ~df.columns.duplicated()]
                     return df
 
             except Exception as exc:
@@ -243,15 +287,186 @@ async def _fetch(ticker: str, retry_count: int = 0) -> Optional[pd.DataFrame]:
     return None
 
 
+async def _download_batch(
+    tickers: List[str],
+    start: Optional[str] = None,
+) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Download daily OHLCV for a group of tickers in one provider call.
+
+    Retries and backoff apply to the batch: after each attempt, only the
+    tickers still missing are requested again.  Tickers missing after the
+    final retry map to None.
+    """
+    results: Dict[str, Optional[pd.DataFrame]] = {t: None for t in tickers}
+    missing = list(tickers)
+    for attempt in range(FETCH_MAX_RETRIES + 1):
+        error: Optional[str] = None
+        async with _semaphore:
+            loop = asyncio.get_event_loop()
+            try:
+                def _do_download(batch=list(missing), s=start):
+                    return get_provider().download(
+                        batch, period=DATA_FETCH_PERIOD, start=s, actions=True,
+                    )
+                frames = await loop.run_in_executor(None, _do_download)
+                for ticker, ticker_df in frames.items():
+                    results[ticker] = ticker_df
+            except Exception as exc:
+                error = type(exc).__name__
+
+        missing = [t for t in missing if results[t] is None]
+        if not missing:
+            break
+        if attempt < FETCH_MAX_RETRIES:
+            backoff_delay = FETCH_BACKOFF_BASE * (2 ** attempt)
+            log.warning(
+                "Batch fetch: %d/%d tickers missing%s (attempt %d/%d), retrying in %.1fs...",
+                len(missing),
+                len(tickers),
+                f" after {error}" if error else "",
+                attempt + 1,
+                FETCH_MAX_RETRIES,
+                backoff_delay,
+            )
+            await asyncio.sleep(backoff_delay)
+
+    if missing:
+        log.warning(
+            "Fetch DROPPED %d tickers after %d retries: %s",
+            len(missing), FETCH_MAX_RETRIES, ", ".join(missing[:20]),
+        )
+    return results
+
+
+async def _store_tail(
+    ticker: str,
+    stored: Optional[pd.DataFrame],
+    tail: pd.DataFrame,
+) -> pd.DataFrame:
+    """Append a downloaded *tail* to the stored bars and persist the result."""
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(None, _bar_store.merge, ticker, stored, tail)
+    except Exception as exc:
+        log.warning("Bar store write failed for %s: %s", ticker, exc)
+        return _bar_store.combine(stored, tail)
+
+
+def _new_corporate_action(stored: Optional[pd.DataFrame], tail: pd.DataFrame) -> bool:
+    if stored is None:
+        return False
+    tail = align_index(tail, stored)
+    return has_corporate_action(tail[tail.index > stored.index[-1]])
+
+
+async def _fetch(ticker: str, retry_count: int = 0) -> Optional[pd.DataFrame]:
+    """
+    Daily OHLCV for one ticker, served from the local bar store when possible.
+
+    • Stored bars synced within BAR_STORE_MAX_AGE_SECONDS → returned as-is.
+    • Stored bars older than that → only the tail since the last stored date
+      is downloaded and appended (a dividend/split in the tail forces a full
+      re-download, since Adj Close history is rewritten upstream).
+    • Nothing stored → full DATA_FETCH_PERIOD download.
+    If the provider fails, previously stored bars are served rather than
+    dropping the ticker.
+    """
+    loop = asyncio.get_event_loop()
+    stored = await loop.run_in_executor(None, _bar_store.load, ticker)
+    if stored is not None and _bar_store.is_fresh(ticker):
+        return stored
+
+    start = stored.index[-1].strftime("%Y-%m-%d") if stored is not None else None
+    tail = await _download(ticker, start=start, retry_count=retry_count)
+    if tail is None:
+        if stored is not None:
+            log.warning("Fetch %s: provider unavailable, serving stored bars", ticker)
+        return stored
+
+    if _new_corporate_action(stored, tail):
+        log.info("Fetch %s: dividend/split since %s, re-downloading full history", ticker, start)
+        full = await _download(ticker, retry_count=retry_count)
+        if full is None:
+            return stored
+        stored, tail = None, full
+
+    return await _store_tail(ticker, stored, tail)
+
+
+async def _fetch_many(tickers: List[str]) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    Batched counterpart of _fetch() for the scan hot path.
+
+    Tickers needing a provider call are grouped by the date their missing
+    tail starts at (nearly all share one) and downloaded FETCH_BATCH_SIZE at
+    a time.  Returns ticker → DataFrame, or None for tickers that could not
+    be fetched and have nothing stored.
+    """
+    loop = asyncio.get_event_loop()
+    stored: Dict[str, Optional[pd.DataFrame]] = await loop.run_in_executor(
+        None, lambda: {t: _bar_store.load(t) for t in tickers}
+    )
+
+    results: Dict[str, Optional[pd.DataFrame]] = {}
+    by_start: Dict[Optional[str], List[str]] = {}
+    for ticker in tickers:
+        prev = stored[ticker]
+        if prev is not None and _bar_store.is_fresh(ticker):
+            results[ticker] = prev
+            continue
+        start = prev.index[-1].strftime("%Y-%m-%d") if prev is not None else None
+        by_start.setdefault(start, []).append(ticker)
+
+    tails: Dict[str, Optional[pd.DataFrame]] = {}
+    for start, group in by_start.items():
+        for i in range(0, len(group), FETCH_BATCH_SIZE):
+            tails.update(await _download_batch(group[i:i + FETCH_BATCH_SIZE], start=start))
+
+    refetch = [t for t, tail in tails.items() if tail is not None and _new_corporate_action(stored[t], tail)]
+    if refetch:
+        log.info("Batch fetch: %d tickers had a dividend/split, re-downloading full history", len(refetch))
+        for i in range(0, len(refetch), FETCH_BATCH_SIZE):
+            full = await _download_batch(refetch[i:i + FETCH_BATCH_SIZE])
+            for ticker, full_df in full.items():
+                if full_df is not None:
+                    stored[ticker] = None
+                tails[ticker] = full_df
+
+    for ticker, tail in tails.items():
+        if tail is None:
+            if stored[ticker] is not None:
+                log.warning("Fetch %s: provider unavailable, serving stored bars", ticker)
+            results[ticker] = stored[ticker]
+        else:
+            results[ticker] = await _store_tail(ticker, stored[ticker], tail)
+    return results
+
+
 # ────────────────────────────────────────────────────────────────────────────
 # Background scan worker
 # ────────────────────────────────────────────────────────────────────────────
 
-async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
+async def _refresh_setups_model() -> None:
+    """Rebuild the setup endpoints' read model after a scan completes."""
+    try:
+        start = time.time()
+        snap = await _setups_model.refresh(DB_PATH)
+        log.info("Setups read model rebuilt: %d setups  [%.2fs]", len(snap.items["all"]), time.time() - start)
+    except Exception as exc:
+        # Not fatal: the next request rebuilds it
+        log.warning("Setups read model rebuild failed: %s", exc)
+
+
+async def _run_scan(scan_ts: str, tickers: List[str], incremental: bool = False) -> None:
     """
     Full scan pipeline:
       Engine 0 → (if bullish) Engine 1 → Engine 2 + Engine 3
     Results written to SQLite; frontend reads from DB.
+
+    With *incremental*, tickers whose bar fingerprint matches the previous
+    completed scan are not re-analysed; their setups and S/R zones are
+    copied forward into this scan instead.
     """
     global _scan_state
     scan_start_time = time.time()
@@ -263,7 +478,9 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
         total=len(tickers),
         started_at=scan_ts,
         last_error=None,
+        timings={},
     )
+    timings: Dict[str, float] = _scan_state["timings"]
 
     try:
         await save_scan_run(DB_PATH, scan_ts)
@@ -273,6 +490,7 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
         regime_start = time.time()
         regime = await loop.run_in_executor(None, check_market_regime)
         regime_time = time.time() - regime_start
+        timings["regime"] = regime_time
         await save_regime(DB_PATH, scan_ts, regime)
         log.info(
             "Engine 0: %s  (SPY=%.2f  EMA20=%.2f)  [%.1fs]",
@@ -286,6 +504,7 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
             log.info("Market is BEARISH — RS calculations + Engines 2 & 3 disabled (0s saved)")
             await complete_scan_run(DB_PATH, scan_ts, 0)
             _scan_state["last_completed"] = scan_ts
+            await _refresh_setups_model()
             return
 
         # ── SPY data (consolidated single fetch for 3m return + RS Line) ──
@@ -309,6 +528,7 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
             log.warning("Could not fetch SPY data for RS/3m return: %s", exc)
 
         spy_fetch_time = time.time() - spy_fetch_start
+        timings["spy"] = spy_fetch_time
         log.info("SPY fetch completed  [%.1fs]", spy_fetch_time)
 
         # ── Per-ticker processing ─────────────────────────────────────────
@@ -320,22 +540,56 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
         base_count = 0
         process_start_time = time.time()
 
-        async def _process(ticker: str, idx: int) -> None:
+        # ── Fingerprints (incremental re-scans) ──────────────────────────
+        # Engine output depends on the ticker's bars plus the scan-wide inputs
+        # in the salt: engine version and KDE backend, today's date (KDE recency
+        # weights) and SPY.
+        scan_salt = "|".join([
+            str(ENGINE_VERSION),
+            SR_KDE_METHOD,
+            date.today().isoformat(),
+            bars_fingerprint(spy_df_full) if spy_df_full is not None else "-",
+        ])
+        prior_ts = await get_latest_scan_timestamp(DB_PATH) if incremental else None
+        prior_fps = await get_fingerprints(DB_PATH, prior_ts) if prior_ts else {}
+        fingerprints: Dict[str, Tuple[str, str]] = {}
+        reused: List[str] = []
+        # S/R zones are buffered across tickers and written in large transactions
+        zone_writer = ZoneWriter(DB_PATH, scan_ts)
+
+        # SPY is shipped to process workers with every ticker; pack it once
+        spy_bars = pack_bars(spy_df_full) if _analysis_pool is not None else None
+
+        async def _process(
+            ticker: str,
+            df: Optional[pd.DataFrame],
+            gates: Optional[Dict[str, bool]] = None,
+            zones: Optional[List[Dict]] = None,
+            fp: Optional[Tuple[str, str]] = None,
+        ) -> None:
+            global _analysis_pool
             nonlocal vcp_count, pb_count, base_count, dropped_tickers
 
             try:
+                # ── Incremental: unchanged since the previous scan ──────────
+                # The producer fingerprinted the bars and queued no frame;
+                # results are copied forward after the pipeline
+                if fp is not None and prior_fps.get(ticker) == fp[1]:
+                    fingerprints[ticker] = fp
+                    reused.append(ticker)
+                    return
+
                 # ── Data Integrity Check ────────────────────────────────────
                 # Skip tickers with empty/delisted data immediately
-                df = await _fetch(ticker)
                 if df is None or len(df) < MIN_CANDLES_FOR_ANALYSIS:
                     if df is None:
                         dropped_tickers.append(ticker)  # Record as dropped
                     log.debug("Skipped %s: insufficient data", ticker)
                     return
 
-                # Deduplicate columns (belt-and-suspenders after _fetch)
-                if df.columns.duplicated().any():
-                    df = df.loc[:, ~df.columns.duplicated()]
+                # Normalize once (flat, de-duplicated columns); every engine
+                # reads this same view and none of them copies it
+                df = bar_view(df)
 
                 # Check for empty Close column or all-NaN values
                 close_col = "Adj Close" if "Adj Close" in df.columns else "Close"
@@ -349,71 +603,33 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
                     log.debug("Skipped %s: all-NaN price data", ticker)
                     return
 
-                # ── Parallelize RS + S/R zone calculations (independent operations) ──
-                rs_line = None
-                rs_ratio = 0.0
-                rs_52w_high = 0.0
-                rs_blue_dot = False
-                zones: List[Dict] = []
-
-                # Run RS and S/R zone calculations in parallel
-                rs_task = None
-                if spy_df_full is not None:
-                    rs_task = loop.run_in_executor(None, calculate_rs_line, df, spy_df_full)
-
-                sr_task = loop.run_in_executor(None, calculate_sr_zones, ticker, df)
-
-                # Await both in parallel
-                if rs_task:
-                    try:
-                        rs_line, zones = await asyncio.gather(rs_task, sr_task)
-                    except Exception as exc:
-                        log.warning("Parallel RS/SR calculation failed for %s: %s", ticker, exc)
-                        rs_line = None
-                        zones = await sr_task  # Fall back to SR-only
-                else:
-                    zones = await sr_task
+                fingerprints[ticker] = fp or (str(df.index[-1].date()), bars_fingerprint(df, scan_salt))
 
-                # Process RS results if available
-                if rs_line and len(rs_line) >= MIN_CANDLES_FOR_RS:
+                # ── Engines (analysis.analyze_ticker, thread or process pool) ──
+                result = None
+                pool = _analysis_pool
+                if pool is not None:
                     try:
-                        # Use .item() to safely convert numpy scalars to Python floats
-                        rs_today = rs_line[-1]
-                        rs_ratio = float(rs_today.item() if hasattr(rs_today, 'item') else rs_today)
+                        result = await loop.run_in_executor(
+                            pool, analyze_packed, ticker, pack_bars(df), spy_bars, spy_3m_return, gates, zones
+                        )
+                    except BrokenProcessPool as exc:
+                        # A worker died (e.g. OOM-killed): finish this scan on threads
+                        log.error("Analysis pool failed (%s) — falling back to threads", exc)
+                        if _analysis_pool is pool:
+                            _analysis_pool = None
+                            pool.shutdown(wait=False, cancel_futures=True)
+                if result is None:
+                    result = await loop.run_in_executor(
+                        None, analyze_ticker, ticker, df, spy_df_full, spy_3m_return, gates, zones
+                    )
 
-                        rs_max = max(rs_line)
-                        rs_52w_high = float(rs_max.item() if hasattr(rs_max, 'item') else rs_max)
+                if result["zones"]:
+                    await zone_writer.add(ticker, result["zones"])
 
-                        rs_blue_dot = await loop.run_in_executor(
-                            None, detect_rs_blue_dot, rs_line
-                        )
-                    except Exception as rs_exc:
-                        log.warning("RS processing failed for %s: %s", ticker, rs_exc)
-                        rs_ratio = 0.0
-                        rs_52w_high = 0.0
-                        rs_blue_dot = False
-                if zones:
-                    await save_sr_zones(DB_PATH, scan_ts, ticker, zones)
-
-                # Detect trendline early (used by VCP follow-up, near-breakout, and pullback)
-                tl = await loop.run_in_executor(None, detect_trendline, ticker, df)
-
-                # Engine 2: VCP breakout (with RS parameters for Path E)
-                vcp = await loop.run_in_executor(
-                    None, scan_vcp, ticker, df, zones, spy_3m_return,
-                    rs_ratio, rs_52w_high, rs_blue_dot
-                )
+                # Engine 2: VCP breakout, else near-breakout watchlist
+                vcp = result["vcp"]
                 if vcp:
-                    # Sanitize VCP output: ensure all numeric fields are proper floats
-                    try:
-                        vcp["entry"] = float(vcp.get("entry", 0.0))
-                        vcp["stop_loss"] = float(vcp.get("stop_loss", 0.0))
-                        vcp["take_profit"] = float(vcp.get("take_profit", 0.0))
-                        vcp["rr"] = float(vcp.get("rr", 2.0))
-                    except (ValueError, TypeError) as conv_err:
-                        log.warning("VCP conversion failed for %s: %s", ticker, conv_err)
-                        return
-
                     # Add sector to setup and collect for batch save
                     vcp["sector"] = SECTORS.get(ticker, "Unknown")
                     collected_setups.append(vcp)
@@ -422,105 +638,119 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
                     setup_type = "RS LEAD" if vcp.get("is_rs_lead") else "VCP"
                     log.info("  %s      %-6s  entry=%.2f", setup_type, ticker, vcp["entry"])
 
-                else:
-                    # Only check near-breakout if not already a full setup
-                    # Wrap entire near-breakout logic in try-except for robustness
-                    try:
-                        near = await loop.run_in_executor(
-                            None, scan_near_breakout, ticker, df, zones, tl
-                        )
-                        if near:
-                            # Sanitize near-breakout output: ensure numeric fields are proper floats
-                            try:
-                                near["entry"] = float(near.get("entry", 0.0))
-                                near["distance_pct"] = float(near.get("distance_pct", 0.0))
-                            except (ValueError, TypeError) as conv_err:
-                                log.warning("Near-breakout conversion failed for %s: %s", ticker, conv_err)
-                                return
-
-                            near["sector"] = SECTORS.get(ticker, "Unknown")
-                            near["rs_blue_dot"] = rs_blue_dot
-                            collected_setups.append(near)
-                            log.info("  NEAR     %-6s  dist=%.1f%%", ticker, near["distance_pct"])
-                    except Exception as near_exc:
-                        log.warning("Near-breakout check failed for %s: %s", ticker, near_exc)
-                        # Continue to pullback checks even if near-breakout fails
+                near = result["near"]
+                if near:
+                    near["sector"] = SECTORS.get(ticker, "Unknown")
+                    collected_setups.append(near)
+                    log.info("  NEAR     %-6s  dist=%.1f%%", ticker, near["distance_pct"])
 
                 # Engine 3: Tactical pullback (strict, then relaxed)
-                pb = await loop.run_in_executor(None, scan_pullback, ticker, df, zones, tl)
+                pb = result["pullback"]
                 if pb:
-                    # Sanitize pullback output
-                    try:
-                        pb["entry"] = float(pb.get("entry", 0.0))
-                        pb["stop_loss"] = float(pb.get("stop_loss", 0.0))
-                        pb["take_profit"] = float(pb.get("take_profit", 0.0))
-                        pb["rr"] = float(pb.get("rr", 2.0))
-                    except (ValueError, TypeError) as conv_err:
-                        log.warning("Pullback conversion failed for %s: %s", ticker, conv_err)
-                        return
-
                     pb["sector"] = SECTORS.get(ticker, "Unknown")
                     collected_setups.append(pb)
                     pb_count += 1
                     log.info("  PULLBACK %-6s  entry=%.2f", ticker, pb["entry"])
-                else:
-                    # Only check relaxed if no strict pullback found
-                    try:
-                        pb_relaxed = await loop.run_in_executor(
-                            None, scan_relaxed_pullback, ticker, df, zones, tl
-                        )
-                        if pb_relaxed:
-                            # Sanitize relaxed pullback output
-                            try:
-                                pb_relaxed["entry"] = float(pb_relaxed.get("entry", 0.0))
-                                pb_relaxed["stop_loss"] = float(pb_relaxed.get("stop_loss", 0.0))
-                                pb_relaxed["take_profit"] = float(pb_relaxed.get("take_profit", 0.0))
-                                pb_relaxed["rr"] = float(pb_relaxed.get("rr", 2.0))
-                            except (ValueError, TypeError) as conv_err:
-                                log.warning("Relaxed pullback conversion failed for %s: %s", ticker, conv_err)
-                                return
-
-                            pb_relaxed["sector"] = SECTORS.get(ticker, "Unknown")
-                            collected_setups.append(pb_relaxed)
-                            pb_count += 1
-                            log.info("  PULLBACK %-6s  entry=%.2f (relaxed)", ticker, pb_relaxed["entry"])
-                    except Exception as pb_rel_exc:
-                        log.warning("Relaxed pullback check failed for %s: %s", ticker, pb_rel_exc)
+
+                pb_relaxed = result["relaxed_pullback"]
+                if pb_relaxed:
+                    pb_relaxed["sector"] = SECTORS.get(ticker, "Unknown")
+                    collected_setups.append(pb_relaxed)
+                    pb_count += 1
+                    log.info("  PULLBACK %-6s  entry=%.2f (relaxed)", ticker, pb_relaxed["entry"])
 
                 # Engine 5: Base pattern (Cup & Handle / Flat Base)
-                try:
-                    base = await loop.run_in_executor(
-                        None, scan_base_pattern, ticker, df,
-                        spy_3m_return, rs_ratio, rs_52w_high, rs_blue_dot
-                    )
-                    if base:
-                        try:
-                            base["entry"] = float(base.get("entry", 0.0))
-                            base["stop_loss"] = float(base.get("stop_loss", 0.0))
-                            base["take_profit"] = float(base.get("take_profit", 0.0))
-                            base["rr"] = float(base.get("rr", 2.0))
-                        except (ValueError, TypeError) as conv_err:
-                            log.warning("Base pattern conversion failed for %s: %s", ticker, conv_err)
-                        else:
-                            base["sector"] = SECTORS.get(ticker, "Unknown")
-                            collected_setups.append(base)
-                            base_count += 1
-                            log.info("  BASE     %-6s  %s  Q=%d  entry=%.2f",
-                                     ticker, base.get("base_type", ""), base.get("quality_score", 0), base["entry"])
-                except Exception as base_exc:
-                    log.warning("Base pattern check failed for %s: %s", ticker, base_exc)
+                base = result["base"]
+                if base:
+                    base["sector"] = SECTORS.get(ticker, "Unknown")
+                    collected_setups.append(base)
+                    base_count += 1
+                    log.info("  BASE     %-6s  %s  Q=%d  entry=%.2f",
+                             ticker, base.get("base_type", ""), base.get("quality_score", 0), base["entry"])
 
             except Exception as exc:
                 log.error("Error processing %s: %s", ticker, exc)
                 import traceback
                 log.error("Traceback for %s:\n%s", ticker, traceback.format_exc())
             finally:
-                _scan_state["progress"] = idx + 1
+                _scan_state["progress"] += 1  # Workers finish out of order; count completions
+
+        # ── Fetch → compute pipeline ─────────────────────────────────────
+        # One producer fetches batches (one provider call per batch), pre-screens
+        # and fingerprints them, computes the S/R zones of the batch's changed
+        # tickers in one call and feeds a bounded queue (unchanged tickers of an
+        # incremental scan go in as frameless reuse-only items); a fixed pool of
+        # compute workers drains it.  Fetching overlaps analysis, and the queue
+        # bound caps how many frames are alive at once.
+        n_workers = SCAN_COMPUTE_WORKERS or 2 * (ANALYSIS_WORKERS or os.cpu_count() or 1)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SCAN_QUEUE_SIZE)
+        fetch_time = 0.0
+        prescreen_time = 0.0
+        zones_time = 0.0
+        idle_time = 0.0  # Summed time compute workers waited on an empty queue
+        prescreen_passed: Dict[str, int] = {}
+
+        async def _producer() -> None:
+            nonlocal fetch_time, prescreen_time, zones_time
+            try:
+                for b in range(0, len(tickers), FETCH_BATCH_SIZE):
+                    batch = tickers[b:b + FETCH_BATCH_SIZE]
+                    fetch_start = time.time()
+                    frames = await _fetch_many(batch)
+                    fetch_time += time.time() - fetch_start
+                    # Evaluate every engine's necessary conditions for the whole batch at once
+                    prescreen_start = time.time()
+                    gates = await loop.run_in_executor(None, prescreen, frames)
+                    prescreen_time += time.time() - prescreen_start
+                    for verdicts in gates.values():
+                        for key, ok in verdicts.items():
+                            prescreen_passed[key] = prescreen_passed.get(key, 0) + ok
+                    # Fingerprint before the batch zones so unchanged tickers
+                    # (incremental scans) skip the KDE as well as the engines
+                    fps = {
+                        t: (str(df.index[-1].date()), bars_fingerprint(bar_view(df), scan_salt))
+                        for t, df in frames.items() if df is not None and len(df)
+                    }
+                    unchanged = {t for t, fp in fps.items() if prior_fps.get(t) == fp[1]}
+                    # S/R zones for every changed ticker with a zone consumer still in play
+                    zones_start = time.time()
+                    needs_zones = {
+                        t: df for t, df in frames.items()
+                        if df is not None and t not in unchanged
+                        and (gates.get(t) or {}).get("sr_zones", True)
+                    }
+                    batch_zones = await loop.run_in_executor(None, calculate_sr_zones_batch, needs_zones)
+                    zones_time += time.time() - zones_start
+                    for t in batch:
+                        df = frames.pop(t, None)
+                        if t in unchanged:
+                            await queue.put((t, None, None, None, fps[t]))  # Reuse only: no frame
+                        else:
+                            await queue.put((t, df, gates.get(t), batch_zones.get(t), fps.get(t)))
+            finally:
+                for _ in range(n_workers):
+                    await queue.put(None)  # One stop marker per worker
+
+        async def _worker() -> None:
+            nonlocal idle_time
+            while True:
+                wait_start = time.time()
+                item = await queue.get()
+                idle_time += time.time() - wait_start
+                if item is None:
+                    return
+                await _process(*item)
+                del item  # Release the frame before waiting for the next one
 
-        # Gather all ticker tasks; semaphore handles concurrency internally
-        await asyncio.gather(*[_process(t, i) for i, t in enumerate(tickers)])
+        await asyncio.gather(_producer(), *[_worker() for _ in range(n_workers)])
 
         process_time = time.time() - process_start_time
+        timings["fetch"] = fetch_time  # Producer time; overlaps analysis
+        timings["prescreen"] = prescreen_time
+        timings["sr_zones"] = zones_time
+        timings["analysis"] = process_time - idle_time / n_workers  # Mean busy time per compute worker
+        timings["compute_idle"] = idle_time / n_workers
+        timings["process"] = process_time
         log.info(
             "Per-ticker processing completed  [%.1fs]  vcp=%d  pb=%d  base=%d  total_setups=%d",
             process_time,
@@ -529,14 +759,39 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
             base_count,
             len(collected_setups),
         )
+        log.info(
+            "Pre-screen passed  %s",
+            "  ".join(f"{key}={n}" for key, n in prescreen_passed.items()),
+        )
+
+        # ── Remaining buffered S/R zones (before the scan is marked complete) ──
+        zones_save_start = time.time()
+        await zone_writer.flush()
+        timings["zones_save"] = time.time() - zones_save_start
+        log.info(
+            "Saved %d S/R zone rows in %d transactions  [%.1fs]",
+            zone_writer.rows_written, zone_writer.flushes, timings["zones_save"],
+        )
 
         # ── Batch Save All Setups (5-10x faster than individual saves) ──────
         if collected_setups:
             db_save_start = time.time()
             await batch_save_setups(DB_PATH, scan_ts, collected_setups)
             db_save_time = time.time() - db_save_start
+            timings["db_save"] = db_save_time
             log.info("Batch saved %d setups to database  [%.1fs]", len(collected_setups), db_save_time)
 
+        # ── Incremental: carry unchanged tickers' results forward ──────────
+        reuse_start = time.time()
+        if reused:
+            setups_copied, zones_copied = await copy_ticker_results(DB_PATH, prior_ts, scan_ts, reused)
+            log.info(
+                "Incremental: %d unchanged tickers reused  (%d setups, %d zones copied from %s)",
+                len(reused), setups_copied, zones_copied, prior_ts,
+            )
+        await save_fingerprints(DB_PATH, scan_ts, fingerprints)
+        timings["reuse"] = time.time() - reuse_start
+
         # ── Sector Summary with Bold Highlighting ───────────────────────────
         # Sectors with 3+ setups are highlighted in bold for institutional rotation
         try:
@@ -568,6 +823,16 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
 
         await complete_scan_run(DB_PATH, scan_ts, len(tickers))
         _scan_state["last_completed"] = scan_ts
+        await _refresh_setups_model()
+
+        # ── Fold fetched bars into the memory-mapped archive ──────────────
+        try:
+            compact_start = time.time()
+            archived = await loop.run_in_executor(None, _bar_store.compact)
+            timings["compact"] = time.time() - compact_start
+            log.info("Bar store compacted: %d tickers archived  [%.1fs]", archived, time.time() - compact_start)
+        except Exception as exc:
+            log.warning("Bar store compaction failed: %s", exc)
 
         # ── Data Quality Report ───────────────────────────────────────────
         processed_tickers = len(tickers) - len(dropped_tickers)
@@ -584,6 +849,7 @@ async def _run_scan(scan_ts: str, tickers: List[str]) -> None:
             log.info("✓ DATA QUALITY: All %d tickers processed successfully (0 dropped)", len(tickers))
 
         total_scan_time = time.time() - scan_start_time
+        timings["total"] = total_scan_time
         log.info(
             "✔ Scan complete  VCP=%d  Pullbacks=%d  Processed=%d/%d  Total=%.1fs  (Regime=%.1fs, SPY=%.1fs, Process=%.1fs)",
             vcp_count,
@@ -613,10 +879,13 @@ async def health():
 
 
 @app.post("/api/run-scan")
-async def trigger_scan(background_tasks: BackgroundTasks):
+async def trigger_scan(background_tasks: BackgroundTasks, incremental: bool = False):
     """
     Trigger a full market scan.  Returns immediately; scan runs in background.
     Poll /api/scan-status to track progress.
+
+    ``?incremental=true`` re-analyses only tickers whose bars changed since
+    the previous completed scan and copies the rest forward.
     """
     if _scan_state["in_progress"]:
         return {
@@ -626,12 +895,13 @@ async def trigger_scan(background_tasks: BackgroundTasks):
         }
 
     scan_ts = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S")
-    background_tasks.add_task(_run_scan, scan_ts, ACTIVE_UNIVERSE)
+    background_tasks.add_task(_run_scan, scan_ts, ACTIVE_UNIVERSE, incremental)
 
     return {
         "status": "started",
         "scan_timestamp": scan_ts,
         "tickers": len(ACTIVE_UNIVERSE),
+        "incremental": incremental,
         "message": f"Scanning {len(ACTIVE_UNIVERSE)} tickers in background",
     }
 
@@ -648,6 +918,7 @@ async def scan_status():
         "started_at": _scan_state["started_at"],
         "last_completed": _scan_state["last_completed"],
         "last_error": _scan_state["last_error"],
+        "timings": {k: round(v, 3) for k, v in _scan_state["timings"].items()},
     }
 
 
@@ -666,42 +937,89 @@ async def get_regime():
     return regime
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class SetupsQuery:
+    """Optional filters / pagination of the setup endpoints (query parameters, served by SQLite)."""
+
+    def __init__(
+        self,
+        sector: Optional[str] = None,
+        base_type: Optional[str] = None,
+        rs_blue_dot: Optional[bool] = None,
+        min_quality: Optional[float] = None,
+        limit: Annotated[Optional[int], Query(ge=1, le=1000)] = None,
+        offset: Annotated[int, Query(ge=0)] = 0,
+        details: bool = True,  # False: promoted columns only, metadata blob not decoded
+    ) -> None:
+        self.sector = sector
+        self.base_type = base_type
+        self.rs_blue_dot = rs_blue_dot
+        self.min_quality = min_quality
+        self.limit = limit
+        self.offset = offset
+        self.details = details
+
+    def is_default(self) -> bool:
+        filters = (self.sector, self.base_type, self.rs_blue_dot, self.min_quality, self.limit)
+        return all(f is None for f in filters) and not self.offset and self.details
+
+
+async def _setups_response(request: Request, view: str, q: SetupsQuery) -> Response:
+    """
+    One setup view of the latest scan.  The unfiltered view is the read
+    model's pre-rendered body (304 when the client already has it); filtered
+    or paginated requests are answered by SQLite on the promoted columns.
+    """
+    if not q.is_default():
+        setup_type, order_by, items_key = SETUP_VIEWS[view]
+        items, total = await query_setups(
+            DB_PATH, setup_type,
+            sector=q.sector, base_type=q.base_type, rs_blue_dot=q.rs_blue_dot, min_quality=q.min_quality,
+            order_by=order_by, limit=q.limit, offset=q.offset, details=q.details,
+        )
+        return JSONResponse({items_key: items, "count": len(items), "total": total})
+
+    snap = await _setups_model.snapshot(DB_PATH)
+    body, etag = snap.bodies[view]
+    # no-cache: browsers revalidate every poll, which the ETag turns into a 304
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/setups")
-async def get_all_setups():
+async def get_all_setups(request: Request, q: SetupsQuery = Depends()):
     """All VCP + Pullback setups from the latest scan."""
-    setups = await get_latest_setups(DB_PATH)
-    return {"setups": setups, "count": len(setups)}
+    return await _setups_response(request, "all", q)
 
 
 @app.get("/api/setups/vcp")
-async def get_vcp_setups():
+async def get_vcp_setups(request: Request, q: SetupsQuery = Depends()):
     """VCP breakout setups from the latest scan."""
-    setups = await get_latest_setups(DB_PATH, setup_type="VCP")
-    return {"setups": setups, "count": len(setups)}
+    return await _setups_response(request, "vcp", q)
 
 
 @app.get("/api/setups/pullback")
-async def get_pullback_setups():
+async def get_pullback_setups(request: Request, q: SetupsQuery = Depends()):
     """Tactical pullback setups from the latest scan."""
-    setups = await get_latest_setups(DB_PATH, setup_type="PULLBACK")
-    return {"setups": setups, "count": len(setups)}
+    return await _setups_response(request, "pullback", q)
 
 
 @app.get("/api/setups/base")
-async def get_base_setups():
-    """Cup & Handle and Flat Base setups from the latest scan."""
-    setups = await get_latest_setups(DB_PATH, setup_type="BASE")
-    setups.sort(key=lambda x: x.get("quality_score", 0), reverse=True)
-    return {"setups": setups, "count": len(setups)}
+async def get_base_setups(request: Request, q: SetupsQuery = Depends()):
+    """Cup & Handle and Flat Base setups from the latest scan, best quality first."""
+    return await _setups_response(request, "base", q)
 
 
 @app.get("/api/watchlist")
-async def get_watchlist():
-    """Near-breakout tickers from the latest scan (within 1.5% of KDE/TDL level)."""
-    items = await get_latest_setups(DB_PATH, setup_type="WATCHLIST")
-    # Sort by distance_pct ascending (closest first)
-    items.sort(key=lambda x: x.get("distance_pct", 99))
-    return {"items": items, "count": len(items)}
+async def get_watchlist(request: Request, q: SetupsQuery = Depends()):
+    """Near-breakout tickers from the latest scan (within 1.5% of KDE/TDL level), closest first."""
+    return await _setups_response(request, "watchlist", q)
 
 
 @app.get("/api/sr-zones/{ticker}")
@@ -733,16 +1051,14 @@ async def get_chart_data(ticker: str):
     if len(df) < 55:
         raise HTTPException(status_code=422, detail=f"Insufficient history for {sym}")
 
-    adj = "Adj Close" if "Adj Close" in df.columns else "Close"
-    close_adj = df[adj]
-    high = df["High"]
-    low = df["Low"]
+    ctx = IndicatorContext(df)
+    close_adj = ctx.close
 
     # Indicators on Adj Close
-    ema8 = _ema(close_adj, 8)
-    ema20 = _ema(close_adj, 20)
-    sma50 = _sma(close_adj, 50)
-    cci20 = _cci(high, low, close_adj, 20)
+    ema8 = ctx.ema(8)
+    ema20 = ctx.ema(20)
+    sma50 = ctx.sma(50)
+    cci20 = ctx.cci(20)
 
     def _series(idx, vals, dec=2):
         out = []
@@ -778,14 +1094,14 @@ async def get_chart_data(ticker: str):
     trendline = None
     try:
         loop = asyncio.get_event_loop()
-        trendline = await loop.run_in_executor(None, detect_trendline, sym, df)
+        trendline = trendline_to_json(await loop.run_in_executor(None, detect_trendline, sym, df, ctx))
     except Exception as exc:
         log.warning("Trendline detection failed %s: %s", sym, exc)
 
     # Fetch latest base setup for this ticker (for chart overlay)
     base_setup = None
     try:
-        all_base = await get_latest_setups(DB_PATH, setup_type="BASE")
+        all_base = (await _setups_model.snapshot(DB_PATH)).items["base"]
         for s in all_base:
             if s.get("ticker") == sym and s.get("geometry"):
                 base_setup = {
@@ -801,10 +1117,10 @@ async def get_chart_data(ticker: str):
         log.warning("Base setup lookup failed for %s: %s", sym, exc)
 
     # SMA 200 for chart display
-    sma200 = _sma(close_adj, 200)
+    sma200 = ctx.sma(200)
 
     # ATR (14-period) for chart metadata
-    atr14 = _atr(high, low, close_adj, 14)
+    atr14 = ctx.atr(14)
     last_atr = float(atr14.iloc[-1]) if pd.notna(atr14.iloc[-1]) else None
     last_close = float(close_adj.iloc[-1]) if pd.notna(close_adj.iloc[-1]) else None
     atr_pct = round(last_atr / last_close * 100, 2) if last_atr and last_close else None
@@ -813,7 +1129,7 @@ async def get_chart_data(ticker: str):
     last_sma200 = float(sma200.iloc[-1]) if pd.notna(sma200.iloc[-1]) else None
     above_200sma = (last_close > last_sma200) if last_close and last_sma200 else None
 
-    # Ticker metadata from yfinance info (name, sector, industry, market cap)
+    # Ticker metadata from the data provider (name, sector, industry, market cap)
     ticker_info = {
         "name": None, "sector": None, "industry": None,
         "market_cap": None, "atr": round(last_atr, 2) if last_atr else None,
@@ -821,7 +1137,7 @@ async def get_chart_data(ticker: str):
     }
     try:
         loop = asyncio.get_event_loop()
-        info = await loop.run_in_executor(None, lambda: yf.Ticker(sym).info)
+        info = await loop.run_in_executor(None, lambda: get_provider().info(sym))
         ticker_info["name"] = info.get("shortName") or info.get("longName")
         ticker_info["sector"] = info.get("sector")
         ticker_info["industry"] = info.get("industry")
@@ -872,14 +1188,12 @@ async def _enrich_trade(trade: Dict) -> Dict:
         if df is None or len(df) < 25:
             return result
 
-        adj = "Adj Close" if "Adj Close" in df.columns else "Close"
-        close = df[adj]
-        high  = df["High"]
-        low   = df["Low"]
+        ctx = IndicatorContext(df)
+        close = ctx.close
 
-        ema8_s  = _ema(close, 8)
-        ema20_s = _ema(close, 20)
-        cci20_s = _cci(high, low, close, 20)
+        ema8_s  = ctx.ema(8)
+        ema20_s = ctx.ema(20)
+        cci20_s = ctx.cci(20)
 
         lc   = float(close.iloc[-1])
         l8   = float(ema8_s.iloc[-1])
@@ -0,0 +1,250 @@
+"""
+Market-data provider abstraction.
+
+Every place that needs OHLCV bars or ticker metadata (the scan, the chart
+endpoint, the regime check, S/R mapping, the universe builder) goes through
+get_provider() instead of importing yfinance directly, so the network source
+can be swapped for a deterministic replay of local fixture files.
+
+Providers
+─────────
+  YFinanceProvider   live data from Yahoo Finance (default)
+  FixtureProvider    replays <TICKER>.parquet / <TICKER>.csv files from a
+                     directory (plus an optional info.json), fully offline
+
+All providers return per-ticker DataFrames with flat columns
+(Open, High, Low, Close, Adj Close, Volume[, Dividends, Stock Splits])
+and a DatetimeIndex; a ticker with no data is simply absent / None.
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import pandas as pd
+import yfinance as yf
+
+from bar_store import period_to_offset
+from constants import MARKET_DATA_FIXTURE_DIR, MARKET_DATA_PROVIDER
+
+log = logging.getLogger(__name__)
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Flatten MultiIndex columns and drop duplicated columns (yfinance quirks)."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
+    return df
+
+
+def split_batch_frame(df: pd.DataFrame, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Split a group_by="ticker" multi-ticker download into per-ticker frames.
+    Tickers that are absent or entirely NaN are left out of the result.
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    if df is None or df.empty:
+        return frames
+    multi = isinstance(df.columns, pd.MultiIndex)
+    level0 = set(df.columns.get_level_values(0)) if multi else set()
+    for ticker in tickers:
+        if multi:
+            if ticker not in level0:
+                continue
+            ticker_df = df[ticker].copy()
+        elif len(tickers) == 1:
+            ticker_df = df.copy()
+        else:
+            continue
+        # Rows that are entirely NaN are dates the ticker did not trade
+        ticker_df = normalize_columns(ticker_df).dropna(how="all")
+        if not ticker_df.empty:
+            frames[ticker] = ticker_df
+    return frames
+
+
+class MarketDataProvider(ABC):
+    """
+    Interface for daily-bar and metadata sources.
+
+    ``period`` is a yfinance-style window (``"2y"``, ``"6mo"``); ``start`` is a
+    ``YYYY-MM-DD`` date.  Exactly one of them is used, ``start`` taking priority.
+    Provider errors propagate as exceptions; callers own retry policy.
+    Subclasses must implement every method; an incomplete one cannot be
+    instantiated.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def history(
+        self,
+        ticker: str,
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Daily bars for one ticker (None or empty if there are none)."""
+
+    @abstractmethod
+    def download(
+        self,
+        tickers: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        actions: bool = False,
+    ) -> Dict[str, pd.DataFrame]:
+        """Daily bars for several tickers; tickers without data are omitted."""
+
+    @abstractmethod
+    def info(self, ticker: str) -> Dict:
+        """Ticker metadata (shortName, sector, industry, marketCap, quoteType, ...)."""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance data via yfinance."""
+
+    name = "yfinance"
+
+    def history(self, ticker, period=None, start=None):
+        # Ticker().history() keeps per-call state isolated, so it is safe
+        # to call from several executor threads at once.
+        kwargs = {"start": start} if start is not None else {"period": period}
+        df = yf.Ticker(ticker).history(interval="1d", auto_adjust=False, **kwargs)
+        if df is None or df.empty:
+            return df
+        return normalize_columns(df)
+
+    def download(self, tickers, period=None, start=None, actions=False):
+        kwargs = {"start": start} if start is not None else {"period": period}
+        df = yf.download(
+            " ".join(tickers),
+            interval="1d",
+            auto_adjust=False,
+            actions=actions,
+            prepost=False,
+            progress=False,
+            threads=True,
+            group_by="ticker",
+            **kwargs,
+        )
+        return split_batch_frame(df, list(tickers))
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info or {}
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Offline replay of recorded bars from *root*.
+
+    Each ticker is read from ``<TICKER>.parquet`` (preferred) or
+    ``<TICKER>.csv`` with the date as the first column.  A ``period`` window
+    is measured back from the fixture's own last bar, not from today, so a
+    replay is identical no matter when it runs.  Metadata comes from an
+    optional ``info.json`` mapping ticker → info dict.
+    """
+
+    name = "fixture"
+    INFO_FILE = "info.json"
+
+    def __init__(self, root: str = MARKET_DATA_FIXTURE_DIR) -> None:
+        self.root = root
+        self._info: Optional[Dict[str, Dict]] = None
+
+    def _read(self, ticker: str) -> Optional[pd.DataFrame]:
+        base = os.path.join(self.root, ticker.upper())
+        if os.path.exists(base + ".parquet"):
+            df = pd.read_parquet(base + ".parquet")
+        elif os.path.exists(base + ".csv"):
+            df = pd.read_csv(base + ".csv", index_col=0)
+            # Recorded timestamps carry UTC offsets that change across DST,
+            # so parse them as UTC rather than as mixed-offset objects.
+            df.index = pd.to_datetime(df.index, utc=True) if _has_offset(df.index) \
+                else pd.to_datetime(df.index)
+        else:
+            return None
+        if df.empty:
+            return None
+        return normalize_columns(df).sort_index()
+
+    def history(self, ticker, period=None, start=None):
+        df = self._read(ticker)
+        if df is None:
+            return None
+        if start is not None:
+            cutoff = pd.Timestamp(start)
+            if df.index.tz is not None:
+                cutoff = cutoff.tz_localize(df.index.tz)
+            return df[df.index >= cutoff]
+        if period is not None:
+            return df[df.index >= df.index[-1] - period_to_offset(period)]
+        return df
+
+    def download(self, tickers, period=None, start=None, actions=False):
+        frames: Dict[str, pd.DataFrame] = {}
+        for ticker in tickers:
+            df = self.history(ticker, period=period, start=start)
+            if df is None or df.empty:
+                continue
+            if not actions:
+                df = df.drop(columns=["Dividends", "Stock Splits"], errors="ignore")
+            frames[ticker] = df
+        return frames
+
+    def info(self, ticker):
+        if self._info is None:
+            try:
+                with open(os.path.join(self.root, self.INFO_FILE), "r", encoding="utf-8") as fh:
+                    self._info = json.load(fh)
+            except FileNotFoundError:
+                self._info = {}
+        return dict(self._info.get(ticker.upper(), {}))
+
+
+def save_fixture(root: str, ticker: str, df: pd.DataFrame, fmt: str = "csv") -> str:
+    """Write *df* as the fixture file for *ticker* under *root*; returns the path."""
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{ticker.upper()}.{fmt}")
+    if fmt == "parquet":
+        df.to_parquet(path)
+    elif fmt == "csv":
+        df.to_csv(path)
+    else:
+        raise ValueError(f"Unsupported fixture format: {fmt!r}")
+    return path
+
+
+def _has_offset(index: pd.Index) -> bool:
+    if len(index) == 0:
+        return False
+    label = str(index[0])
+    return len(label) > 19 and label[-6] in "+-" and label[-3] == ":"
+
+
+# ── Active provider ─────────────────────────────────────────────────────────
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def get_provider() -> MarketDataProvider:
+    """Return the process-wide provider, created from constants on first use."""
+    global _provider
+    if _provider is None:
+        if MARKET_DATA_PROVIDER == "fixture":
+            _provider = FixtureProvider(MARKET_DATA_FIXTURE_DIR)
+        elif MARKET_DATA_PROVIDER == "yfinance":
+            _provider = YFinanceProvider()
+        else:
+            raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {MARKET_DATA_PROVIDER!r}")
+        log.info("Market data provider: %s", _provider.name)
+    return _provider
+
+
+def set_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Install *provider* for the whole process (None resets to the configured default)."""
+    global _provider
+    _provider = provider
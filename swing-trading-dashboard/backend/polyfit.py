@@ -0,0 +1,46 @@
+"""
+Closed-form least-squares polynomial fits on evenly spaced samples.
+
+A quadratic ``y ≈ a·x² + b·x + c`` is linear in (a, b, c), so its least-squares
+fit is a projection: with x = 0..n-1 the design (Vandermonde) matrix depends
+only on n, and its pseudo-inverse is computed once per window length.  A fit
+is then a (3 × n) @ (n,) product, and a batch of equal-length windows (many
+tickers' last n closes) is a single matrix multiply.  This replaces scipy's
+iterative curve_fit, which converges to the same solution.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=512)
+def _quadratic_pinv(n: int) -> np.ndarray:
+    """Pseudo-inverse (3 × n) of the design matrix [x², x, 1] for x = 0..n-1 (read-only)."""
+    x = np.arange(n, dtype=float)
+    pinv = np.linalg.pinv(np.column_stack([x * x, x, np.ones(n)]))
+    pinv.flags.writeable = False
+    return pinv
+
+
+def quadratic_fit(y: np.ndarray) -> np.ndarray:
+    """
+    Least-squares ``(a, b, c)`` of ``a·x² + b·x + c`` through *y* sampled at
+    x = 0..len(y)-1.  Needs at least 3 points; NaN in *y* gives NaN coefficients.
+    """
+    y = np.asarray(y, dtype=float)
+    if len(y) < 3:
+        raise ValueError(f"quadratic fit needs at least 3 points, got {len(y)}")
+    return _quadratic_pinv(len(y)) @ y
+
+
+def quadratic_fit_batch(windows: np.ndarray) -> np.ndarray:
+    """
+    quadratic_fit for every row of *windows* (shape ``(k, n)``) at once.
+    Returns shape ``(k, 3)``: columns a, b, c.  Rows containing NaN give NaN.
+    """
+    windows = np.asarray(windows, dtype=float)
+    if windows.ndim != 2 or windows.shape[1] < 3:
+        raise ValueError(f"expected (k, n >= 3) windows, got shape {windows.shape}")
+    return windows @ _quadratic_pinv(windows.shape[1]).T
+
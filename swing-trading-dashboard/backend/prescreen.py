@@ -0,0 +1,188 @@
+"""
+Pre-screen — each engine's cheap necessary conditions, for a whole batch at once.
+
+Every engine bails out early on simple last-bar tests, such as the trend
+template, the EMA value zone or the CCI hook.  This stage evaluates those
+tests for every ticker of a fetch batch on a BarMatrix, before any
+per-ticker work runs.  Each rule restates an early ``return None`` from an
+engine, so a failed rule means that engine cannot produce a setup.
+Skipping the engine call therefore never changes scan results.
+
+Adding a rule: append ``(name, predicate)`` to the engine's entry in RULES.
+The predicate takes a LastBar and returns a bool array, one entry per
+ticker.  NaN inputs must evaluate False only where the engine itself would
+return None.
+
+REQUIRES names the upstream work each engine consumes.  S/R zones and the
+trendline are only computed when at least one consumer passed.
+
+VERDICTS are per-ticker results an engine takes as an input instead of
+computing them itself, such as the U-shape fit of VCP Path A, which is one
+matrix multiply for the whole batch.
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import batch_indicators as bi
+from batch_indicators import BarMatrix
+from polyfit import quadratic_fit_batch
+
+
+class LastBar:
+    """Last-bar values every rule reads, computed once per batch (arrays aligned with ``matrix.tickers``)."""
+
+    def __init__(self, matrix: BarMatrix) -> None:
+        close, high, low, volume = matrix.close, matrix.high, matrix.low, matrix.volume
+        self.n_bars = matrix.lengths
+        self.n_closes = np.count_nonzero(~np.isnan(close), axis=1)
+
+        self.lc = close[:, -1]
+        self.lh = high[:, -1]
+        self.ll = low[:, -1]
+        self.l8 = bi.ema(close, 8)[:, -1]
+        self.l20 = bi.ema(close, 20)[:, -1]
+        self.l50 = bi.sma(close, 50)[:, -1]
+        sma200 = bi.sma(close, 200)
+        self.l200 = sma200[:, -1]
+        self.l200_prev = sma200[:, -21] if sma200.shape[1] >= 21 else np.full(len(matrix), np.nan)
+        self.latr = bi.atr(high, low, close, 14)[:, -1]
+        cci = bi.cci(high, low, close, 20)
+        self.cci = cci[:, -1]
+        self.cci_prev = cci[:, -2] if cci.shape[1] >= 2 else np.full(len(matrix), np.nan)
+        self.vsm50 = bi.sma(volume, 50)[:, -1]
+
+        with np.errstate(invalid="ignore"):
+            last3 = volume[:, -3:]
+            count3 = np.count_nonzero(~np.isnan(last3), axis=1)
+            self.vol3 = np.where(count3 > 0, np.nansum(last3, axis=1) / np.maximum(count3, 1), np.nan)
+        yr = np.where(np.isnan(low[:, -252:]), np.inf, low[:, -252:]).min(axis=1)
+        self.yr_low = np.where(np.isinf(yr), np.nan, yr)
+        self.u_shape = _u_shape(close[:, -U_SHAPE_BARS:])
+
+    def finite(self, *names: str) -> np.ndarray:
+        return np.logical_and.reduce([np.isfinite(getattr(self, n)) for n in names])
+
+
+U_SHAPE_BARS = 15  # engine2 Path A fits the last 15 closes once a ticker has 60 bars
+
+
+def _u_shape(recent: np.ndarray) -> np.ndarray:
+    """engine2 Path A's U-shape test for every row of *recent* (the last U_SHAPE_BARS closes)."""
+    if recent.shape[1] < U_SHAPE_BARS:
+        return np.zeros(len(recent), dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = recent.mean(axis=1, keepdims=True)
+        std = recent.std(axis=1, keepdims=True)
+        ok = std[:, 0] >= 1e-8  # NaN rows and flat rows fail, as in the engine
+        yn = np.where(ok[:, None], (recent - mean) / np.where(ok, std[:, 0], 1.0)[:, None], 0.0)
+        a, b, _ = quadratic_fit_batch(yn).T
+        vertex_x = np.where(np.abs(a) > 1e-8, -b / (2.0 * a), -1.0)
+    return ok & (a > 0.005) & (vertex_x >= 0.0) & (vertex_x <= float(U_SHAPE_BARS))
+
+
+def _history(b: LastBar) -> np.ndarray:
+    # Engines 2/3/5: len(data) >= 60 and at least 55 valid closes
+    return (b.n_bars >= 60) & (b.n_closes >= 55)
+
+
+def _near_ema(b: LastBar) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d8 = np.where(b.l8 > 0, np.abs(b.lc - b.l8) / b.l8, np.inf)
+        d20 = np.where(b.l20 > 0, np.abs(b.lc - b.l20) / b.l20, np.inf)
+    return (d8 <= 0.02) | (d20 <= 0.02)
+
+
+Rule = Tuple[str, Callable[[LastBar], np.ndarray]]
+
+RULES: Dict[str, Tuple[Rule, ...]] = {
+    # engine2.scan_vcp
+    "vcp": (
+        ("history", _history),
+        ("finite", lambda b: b.finite("lc", "lh", "ll", "l8", "l20", "l50", "l200", "latr")),
+        ("trend template", lambda b: (b.l8 > b.l20) & (b.lc > b.l50) & (b.lc > b.l200)),
+        ("volume average", lambda b: b.vsm50 > 0),
+    ),
+    # engine2.scan_near_breakout — proximity only, so nearly every ticker passes
+    "near_breakout": (
+        ("history", lambda b: b.n_bars >= 20),
+        ("finite", lambda b: b.finite("lc")),
+    ),
+    # engine3.scan_pullback
+    "pullback": (
+        ("history", _history),
+        ("finite", lambda b: b.finite("lc", "lh", "ll", "l8", "l20", "l50", "latr", "cci", "cci_prev")),
+        ("trend", lambda b: (b.l8 > b.l20) & (b.lc > b.l50)),
+        ("value zone", lambda b: (b.ll <= b.l8) | (b.ll <= b.l20)),
+        ("close above EMA20", lambda b: b.lc >= b.l20),
+        ("CCI hook", lambda b: (b.cci_prev < -50.0) & (b.cci > b.cci_prev)),
+    ),
+    # engine3.scan_relaxed_pullback
+    "relaxed_pullback": (
+        ("history", _history),
+        ("finite", lambda b: b.finite("lc", "lh", "ll", "l8", "l20", "l50", "latr", "cci", "cci_prev")),
+        ("trend", lambda b: (b.l8 > b.l20) & (b.lc > b.l50)),
+        ("buffer zone", _near_ema),
+        ("CCI turning", lambda b: (b.cci > b.cci_prev) & (b.cci_prev < 0)),
+        ("volume average", lambda b: b.vsm50 > 0),
+        ("low volume", lambda b: ~(b.vol3 > b.vsm50)),
+    ),
+    # engine5.scan_cup_handle and scan_flat_base (shared prefix)
+    "base": (
+        ("history", _history),
+        ("above SMA200", lambda b: ~((b.l200 > 0) & (b.lc < b.l200))),
+        ("above SMA50", lambda b: ~((b.l50 > 0) & (b.lc < b.l50))),
+        ("prior advance", lambda b: ~((b.yr_low > 0) & (b.lc < b.yr_low * 1.30))),
+        ("rising SMA200", lambda b: ~((b.l200 > 0) & (b.l200_prev > 0) & (b.l200 <= b.l200_prev))),
+        ("ATR", lambda b: b.latr > 0),
+        ("volume average", lambda b: b.vsm50 > 0),
+    ),
+}
+
+# Upstream computation → engines that consume it
+REQUIRES: Dict[str, Tuple[str, ...]] = {
+    "sr_zones": ("vcp", "near_breakout", "pullback", "relaxed_pullback"),
+    "trendline": ("vcp", "near_breakout", "pullback", "relaxed_pullback"),
+}
+
+
+# Engine input → predicate; the result is handed to the engine, not used to skip it
+VERDICTS: Dict[str, Callable[[LastBar], np.ndarray]] = {
+    # engine2.scan_vcp Path A (u_shape argument)
+    "vcp_u_shape": lambda b: _history(b) & b.u_shape,
+}
+
+
+def evaluate(matrix: BarMatrix) -> Dict[str, np.ndarray]:
+    """``{engine, upstream input or verdict: bool array}`` aligned with ``matrix.tickers``."""
+    if len(matrix) == 0:
+        return {key: np.zeros(0, dtype=bool) for key in (*RULES, *REQUIRES, *VERDICTS)}
+    bar = LastBar(matrix)
+    passed: Dict[str, np.ndarray] = {}
+    with np.errstate(invalid="ignore"):
+        for engine, rules in RULES.items():
+            mask = np.ones(len(matrix), dtype=bool)
+            for _, predicate in rules:
+                mask &= predicate(bar)
+            passed[engine] = mask
+    for key, consumers in REQUIRES.items():
+        passed[key] = np.logical_or.reduce([passed[e] for e in consumers])
+    for key, predicate in VERDICTS.items():
+        passed[key] = predicate(bar)
+    return passed
+
+
+def prescreen(frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Dict[str, bool]]:
+    """
+    ``{ticker: {key: passed}}`` for every stackable frame in *frames*; keys
+    are the RULES engines, the REQUIRES inputs and the VERDICTS.  Tickers missing from
+    the result were not screened and should run every engine.
+    """
+    matrix = BarMatrix.from_frames(frames)
+    passed = evaluate(matrix)
+    return {
+        ticker: {key: bool(mask[row]) for key, mask in passed.items()}
+        for row, ticker in enumerate(matrix.tickers)
+    }
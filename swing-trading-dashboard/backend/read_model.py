@@ -0,0 +1,91 @@
+"""
+Read model — the latest scan's setups, decoded, sorted and serialized once.
+
+The setup endpoints (/api/setups, /api/setups/{vcp,pullback,base} and
+/api/watchlist) used to query SQLite and json.loads every row's metadata
+on every request.  SetupsReadModel loads each endpoint's view of the latest
+completed scan once (ordered by SQLite on the promoted columns) and renders
+every response body to JSON bytes with an ETag.  A request is then a
+dictionary lookup, and a poll whose If-None-Match matches gets a 304.
+
+The snapshot is rebuilt when a scan completes (refresh) and whenever the
+latest completed scan differs from the snapshot's, e.g. after another
+process wrote the database.  That check uses the in-process latest-scan
+pointer, so it does not touch SQLite either.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+from database import get_latest_scan_timestamp, query_setups
+
+# View name → (setup_type filter or None for all, database.SETUP_ORDERS key, items key)
+VIEWS: Dict[str, Tuple[Optional[str], str, str]] = {
+    "all":       (None, "id", "setups"),
+    "vcp":       ("VCP", "id", "setups"),
+    "pullback":  ("PULLBACK", "id", "setups"),
+    "base":      ("BASE", "quality", "setups"),        # best first
+    "watchlist": ("WATCHLIST", "distance", "items"),   # closest first
+}
+
+
+def _render(payload: Dict) -> bytes:
+    # Same encoding as Starlette's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class SetupsSnapshot:
+    """Every view of one scan's setups: ``items[view]`` lists and ``bodies[view] = (json_bytes, etag)``."""
+
+    __slots__ = ("db_path", "scan_timestamp", "items", "bodies")
+
+    def __init__(self, db_path: str, scan_timestamp: Optional[str], items: Dict[str, List[Dict]]) -> None:
+        self.db_path = db_path
+        self.scan_timestamp = scan_timestamp
+        self.items = items
+        self.bodies: Dict[str, Tuple[bytes, str]] = {}
+        for view, (_, _, items_key) in VIEWS.items():
+            body = _render({items_key: items[view], "count": len(items[view])})
+            self.bodies[view] = (body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+
+
+class SetupsReadModel:
+    """Process-wide holder of the current SetupsSnapshot."""
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[SetupsSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db_path: str) -> SetupsSnapshot:
+        """Rebuild from the latest completed scan in *db_path*."""
+        async with self._lock:
+            return await self._build(db_path)
+
+    async def snapshot(self, db_path: str) -> SetupsSnapshot:
+        """The current snapshot, rebuilt first if a newer scan has completed."""
+        latest = await get_latest_scan_timestamp(db_path)
+        snap = self._snapshot
+        if snap is not None and snap.db_path == db_path and snap.scan_timestamp == latest:
+            return snap
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            snap = self._snapshot
+            if snap is not None and snap.db_path == db_path and snap.scan_timestamp == latest:
+                return snap
+            return await self._build(db_path)
+
+    async def _build(self, db_path: str) -> SetupsSnapshot:
+        scan_ts = await get_latest_scan_timestamp(db_path)
+        items: Dict[str, List[Dict]] = {}
+        for view, (setup_type, order_by, _) in VIEWS.items():
+            items[view], _ = await query_setups(db_path, setup_type, order_by=order_by, details=True)
+        # A scan completing mid-build changes the latest scan: build again
+        if await get_latest_scan_timestamp(db_path) != scan_ts:
+            return await self._build(db_path)
+        self._snapshot = SetupsSnapshot(db_path, scan_ts, items)
+        return self._snapshot
+
+    def clear(self) -> None:
+        self._snapshot = None
@@ -17,10 +17,11 @@ from datetime import datetime, timedelta
 from engines.engine2 import (
     _calculate_base_depth,
     _count_contractions,
-    _tr,
+    detect_trendline,
     scan_vcp,
 )
 from engines.engine1 import calculate_sr_zones
+from indicators import true_range as _tr
 
 
 print("=" * 80)
@@ -186,7 +187,8 @@ try:
         spy_3m_return=0.05,  # Assuming SPY up 5% in 3 months
         rs_ratio=1.1,        # Stock outperforming SPY
         rs_52w_high=1.0,
-        rs_blue_dot=False
+        rs_blue_dot=False,
+        trendline=detect_trendline(ticker, df),
     )
 
     if result:
@@ -0,0 +1,45 @@
+"""Shared test helpers: synthetic daily bars, yf.download-shaped batches and setup dicts."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+NY = "America/New_York"  # exchange timezone of Ticker.history() bars
+
+
+def make_bars(start="2024-01-01", periods=10, base=100.0, *, tz, actions=True):
+    """
+    *periods* business days of rising bars from *start*.
+
+    *tz* is required: Ticker.history() bars are tz-aware (NY) and
+    yf.download() bars are naive (None), and tests must say which they mimic.
+    Dividends / Stock Splits columns (all zero) are included when *actions*.
+    """
+    dates = pd.date_range(start, periods=periods, freq="B", tz=tz, name="Date")
+    close = base + np.arange(periods, dtype=float)
+    df = pd.DataFrame({
+        "Open": close - 0.5,
+        "High": close + 1.0,
+        "Low": close - 1.0,
+        "Close": close,
+        "Adj Close": close * 0.99,
+        "Volume": np.full(periods, 1_000_000.0),
+    }, index=dates)
+    if actions:
+        df["Dividends"] = 0.0
+        df["Stock Splits"] = 0.0
+    return df
+
+
+def make_batch(frames):
+    """Mimic yf.download(group_by="ticker"): (ticker, field) MultiIndex columns."""
+    return pd.concat(frames, axis=1)
+
+
+def make_setup(ticker, setup_type, **extra):
+    """Minimal engine setup dict as batch_save_setups receives it; *extra* adds fields."""
+    return {"ticker": ticker, "setup_type": setup_type, "entry": 10.0, "stop_loss": 9.0,
+            "take_profit": 12.0, "rr": 2.0, "setup_date": "2026-01-02", **extra}
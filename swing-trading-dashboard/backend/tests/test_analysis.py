@@ -0,0 +1,106 @@
+"""Tests for analysis.py — bar transport, analyze_ticker parity and the process pool."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis
+from benchmarks.synthetic import PATTERNS, make_pattern_series, make_spy
+from engines.engine1 import calculate_sr_zones
+from engines.engine2 import detect_trendline, scan_near_breakout, scan_vcp
+from engines.engine3 import scan_pullback, scan_relaxed_pullback
+from engines.engine5 import scan_base_pattern
+
+
+@pytest.fixture(scope="module")
+def spy():
+    return make_spy(np.random.default_rng(0))
+
+
+class TestBarTransport:
+
+    def test_round_trip_tz_aware(self):
+        df = make_pattern_series("cup", 300, seed=1)
+        df["Volume"] = df["Volume"].astype("int64")
+        pd.testing.assert_frame_equal(analysis.unpack_bars(analysis.pack_bars(df)), df, check_freq=False)
+
+    def test_round_trip_naive_and_none(self):
+        df = make_pattern_series("walk", 100, seed=1)
+        df.index = df.index.tz_localize(None)
+        pd.testing.assert_frame_equal(analysis.unpack_bars(analysis.pack_bars(df)), df, check_freq=False)
+        assert analysis.pack_bars(None) is None and analysis.unpack_bars(None) is None
+
+    def test_payload_is_plain_arrays(self):
+        packed = analysis.pack_bars(make_pattern_series("walk", 50, seed=1))
+        assert all(type(v).__module__ == "numpy" for v in packed["columns"].values())
+
+
+class TestAnalyzeTicker:
+
+    @pytest.mark.parametrize("pattern", list(PATTERNS))
+    def test_matches_direct_engine_calls(self, pattern):
+        df = make_pattern_series(pattern, 504, seed=4)
+        result = analysis.analyze_ticker("T", df, None, 0.05)
+
+        zones = calculate_sr_zones("T", df)
+        tl = detect_trendline("T", df)
+        vcp = scan_vcp("T", df, zones, 0.05, trendline=tl)
+        pb = scan_pullback("T", df, zones, tl)
+        assert result["zones"] == zones
+        assert result["vcp"] == vcp
+        near = None if vcp else scan_near_breakout("T", df, zones, tl)
+        assert result["near"] == (dict(near, rs_blue_dot=False) if near else None)
+        assert result["pullback"] == pb
+        assert result["relaxed_pullback"] == (None if pb else scan_relaxed_pullback("T", df, zones, tl))
+        assert result["base"] == scan_base_pattern("T", df, 0.05)
+
+    def test_rs_inputs_from_spy(self, spy):
+        result = analysis.analyze_ticker("T", make_pattern_series("cup", 504, seed=4), spy, 0.05)
+        assert isinstance(result["rs_blue_dot"], bool)
+
+    def test_failed_gates_skip_work(self, monkeypatch):
+        df = make_pattern_series("vcp", 400, seed=2)
+
+        def boom(*args, **kwargs):
+            raise AssertionError("engine should have been skipped")
+
+        for name in ("calculate_sr_zones", "detect_trendline", "scan_vcp", "scan_near_breakout",
+                     "scan_pullback", "scan_relaxed_pullback", "scan_base_pattern"):
+            monkeypatch.setattr(analysis, name, boom)
+        gates = {key: False for key in ("sr_zones", "trendline", "vcp", "near_breakout",
+                                        "pullback", "relaxed_pullback", "base")}
+        result = analysis.analyze_ticker("T", df, None, 0.0, gates)
+        assert result["zones"] == [] and all(result[k] is None for k in analysis.SETUP_KEYS)
+
+    def test_precomputed_zones_are_used(self, monkeypatch):
+        df = make_pattern_series("cup", 504, seed=4)
+        zones = calculate_sr_zones("T", df)
+        expected = analysis.analyze_ticker("T", df)
+        monkeypatch.setattr(analysis, "calculate_sr_zones", lambda *a: 1 / 0)
+        assert analysis.analyze_ticker("T", df, zones=zones) == expected
+
+    def test_engine_error_is_contained(self, monkeypatch):
+        monkeypatch.setattr(analysis, "IndicatorContext", lambda df: 1 / 0)
+        result = analysis.analyze_ticker("T", make_pattern_series("walk", 300, seed=0))
+        assert result["zones"] == []
+
+
+class TestProcessPool:
+
+    def test_workers_match_in_process_analysis(self, spy):
+        frames = {p: make_pattern_series(p, 400, seed=6) for p in ("cup", "flat_base", "pullback")}
+        pool = analysis.create_pool(1)
+        try:
+            spy_bars = analysis.pack_bars(spy)
+            remote = {
+                p: pool.submit(analysis.analyze_packed, p, analysis.pack_bars(df), spy_bars, 0.02).result()
+                for p, df in frames.items()
+            }
+        finally:
+            pool.shutdown()
+        for p, df in frames.items():
+            assert remote[p] == analysis.analyze_ticker(p, df, spy, 0.02)
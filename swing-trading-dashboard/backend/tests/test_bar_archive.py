@@ -0,0 +1,109 @@
+"""Tests for bar_archive.py and BarStore archive compaction."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+from bar_archive import BarArchive, write_bar_archive
+from bar_store import BarStore, bars_fingerprint
+from tests.conftest import NY, make_bars
+
+
+class TestBarArchive:
+
+    def test_open_missing_returns_none(self, tmp_path):
+        assert BarArchive.open(str(tmp_path / "archive")) is None
+
+    def test_roundtrip_preserves_values_index_and_tz(self, tmp_path):
+        root = str(tmp_path / "archive")
+        frames = {
+            # Dividends / Stock Splits change dtype in the archive
+            "AAPL": make_bars(periods=12, base=150.0, tz=NY, actions=False),
+            "MSFT": make_bars(periods=7, base=300.0, tz=NY, actions=False),
+            "NAIVE": make_bars(periods=5, tz=None, actions=False),
+        }
+        write_bar_archive(root, frames, {"AAPL": 123.0})
+        archive = BarArchive.open(root)
+
+        assert len(archive) == 3
+        assert archive.synced_at("AAPL") == 123.0
+        assert archive.synced_at("MSFT") is None
+        for ticker, df in frames.items():
+            out = archive.frame(ticker)
+            pd.testing.assert_frame_equal(out, df, check_index_type=False, check_freq=False)
+            assert out.index.equals(df.index)
+
+    def test_frame_is_zero_copy_and_read_only(self, tmp_path):
+        root = str(tmp_path / "archive")
+        write_bar_archive(root, {"AAPL": make_bars(tz=NY), "MSFT": make_bars(base=50.0, tz=NY)})
+        archive = BarArchive.open(root)
+
+        close = archive.frame("MSFT")["Close"].to_numpy()
+        assert np.shares_memory(close, archive._columns["Close"])
+        assert not close.flags.writeable
+
+    def test_missing_fields_are_not_invented(self, tmp_path):
+        root = str(tmp_path / "archive")
+        write_bar_archive(root, {"RAW": make_bars(tz=NY).drop(columns=["Adj Close"])})
+        out = BarArchive.open(root).frame("RAW")
+        assert "Adj Close" not in out.columns
+
+    def test_rewrite_switches_version(self, tmp_path):
+        root = str(tmp_path / "archive")
+        write_bar_archive(root, {"AAPL": make_bars(tz=NY)})
+        first = BarArchive.open(root)
+        write_bar_archive(root, {"AAPL": make_bars(base=999.0, tz=NY)})
+        second = BarArchive.open(root)
+
+        assert second.frame("AAPL")["Close"].iloc[0] == 999.0
+        assert first.root != second.root
+        assert len([n for n in os.listdir(root) if n.startswith("v")]) == 1
+
+
+class TestBarStoreCompaction:
+
+    def test_compact_moves_pickles_into_archive(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        aapl = make_bars(base=150.0, tz=NY, actions=False)
+        store.save("AAPL", aapl)
+        store.save("MSFT", make_bars(base=300.0, tz=NY))
+
+        assert store.compact() == 2
+        assert not os.path.exists(store.path("AAPL"))
+        assert store.is_fresh("AAPL")
+        pd.testing.assert_frame_equal(store.load("AAPL"), aapl, check_index_type=False, check_freq=False)
+
+    def test_pickle_overrides_archive(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.save("AAPL", make_bars(base=150.0, tz=NY))
+        store.compact()
+        newer = make_bars(periods=11, base=151.0, tz=NY)
+        store.save("AAPL", newer)
+
+        pd.testing.assert_frame_equal(store.load("AAPL"), newer)
+
+    def test_compact_keeps_archived_tickers(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        store.save("AAPL", make_bars(tz=NY))
+        store.compact()
+        store.save("MSFT", make_bars(base=300.0, tz=NY))
+
+        assert store.compact() == 2
+        assert store.load("AAPL") is not None
+        assert store.load("MSFT") is not None
+
+    def test_fingerprint_survives_compaction(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        bars = make_bars(periods=12, base=150.0, tz=NY)
+        bars["Volume"] = bars["Volume"].astype(np.int64)  # yfinance returns int64 Volume
+        store.save("AAPL", bars)
+        saved = bars_fingerprint(store.load("AAPL"), salt="v1")
+
+        store.compact()
+        archived = store.load("AAPL")
+
+        assert archived["Volume"].dtype == np.float64
+        assert bars_fingerprint(archived, salt="v1") == saved
@@ -0,0 +1,123 @@
+"""Tests for bar_store.py — persistence, tail merge, window trim, freshness."""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+import pytest
+
+from bar_store import BarStore, has_corporate_action, period_to_offset
+from tests.conftest import NY, make_bars
+
+
+class TestPeriodToOffset:
+
+    def test_parses_supported_units(self):
+        assert period_to_offset("2y") == pd.DateOffset(years=2)
+        assert period_to_offset("6mo") == pd.DateOffset(months=6)
+        assert period_to_offset("3wk") == pd.DateOffset(weeks=3)
+        assert period_to_offset("30d") == pd.DateOffset(days=30)
+
+    def test_rejects_unknown_period(self):
+        with pytest.raises(ValueError):
+            period_to_offset("max")
+
+
+class TestBarStore:
+
+    def test_load_missing_returns_none(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        assert store.load("AAPL") is None
+        assert not store.is_fresh("AAPL")
+
+    def test_save_load_roundtrip(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        df = make_bars(tz=NY)
+        store.save("aapl", df)
+        loaded = store.load("AAPL")
+        pd.testing.assert_frame_equal(loaded, df)
+        assert store.is_fresh("AAPL")
+
+    def test_stale_file_is_not_fresh(self, tmp_path):
+        store = BarStore(str(tmp_path), max_age_seconds=60)
+        store.save("AAPL", make_bars(tz=NY))
+        old = time.time() - 120
+        os.utime(store.path("AAPL"), (old, old))
+        assert not store.is_fresh("AAPL")
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        with open(store.path("AAPL"), "wb") as fh:
+            fh.write(b"not a pickle")
+        assert store.load("AAPL") is None
+
+    def test_merge_appends_tail_and_replaces_overlap(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        stored = make_bars(periods=10, tz=NY)
+        # Tail starts on the last stored date (partial bar) and adds 3 new bars
+        tail = make_bars(start=stored.index[-1].strftime("%Y-%m-%d"), periods=4, base=500.0, tz=NY)
+
+        merged = store.merge("AAPL", stored, tail)
+
+        assert len(merged) == 13
+        assert merged.index.is_monotonic_increasing
+        assert not merged.index.duplicated().any()
+        assert merged["Close"].iloc[9] == 500.0  # overlap row replaced by tail
+        pd.testing.assert_frame_equal(store.load("AAPL"), merged)
+
+    def test_merge_trims_to_window(self, tmp_path):
+        store = BarStore(str(tmp_path), period="30d")
+        stored = make_bars(start="2024-01-01", periods=40, tz=NY)
+        tail = make_bars(start="2024-02-26", periods=5, tz=NY)
+
+        merged = store.merge("AAPL", stored, tail)
+
+        assert merged.index[0] >= merged.index[-1] - pd.DateOffset(days=30)
+        assert merged.index[-1] == tail.index[-1]
+
+    def test_merge_naive_batch_tail_into_tz_aware_store(self, tmp_path):
+        # history() bars are tz-aware, yf.download() bars are naive dates
+        store = BarStore(str(tmp_path))
+        store.save("AAPL", make_bars(periods=10, tz=NY))
+        stored = store.load("AAPL")
+        tail = make_bars(start=stored.index[-1].strftime("%Y-%m-%d"), periods=4, base=500.0, tz=None)
+
+        merged = store.merge("AAPL", stored, tail)
+
+        assert merged.index.tz == stored.index.tz
+        assert len(merged) == 13
+        assert not merged.index.duplicated().any()
+        assert merged["Close"].iloc[9] == 500.0
+
+    def test_merge_tz_aware_tail_into_naive_store(self, tmp_path):
+        store = BarStore(str(tmp_path))
+        stored = make_bars(periods=10, tz=None)
+        tail = make_bars(start=stored.index[-1].strftime("%Y-%m-%d"), periods=4, base=500.0, tz=NY)
+
+        merged = store.merge("AAPL", stored, tail)
+
+        assert merged.index.tz is None
+        assert len(merged) == 13
+        assert merged["Close"].iloc[9] == 500.0
+
+
+class TestHasCorporateAction:
+
+    def test_clean_tail(self):
+        assert not has_corporate_action(make_bars(tz=NY))
+
+    def test_dividend_detected(self):
+        tail = make_bars(tz=NY)
+        tail.iloc[3, tail.columns.get_loc("Dividends")] = 0.24
+        assert has_corporate_action(tail)
+
+    def test_split_detected(self):
+        tail = make_bars(tz=NY)
+        tail.iloc[-1, tail.columns.get_loc("Stock Splits")] = 4.0
+        assert has_corporate_action(tail)
+
+    def test_empty_or_missing_columns(self):
+        assert not has_corporate_action(None)
+        assert not has_corporate_action(make_bars(tz=NY).drop(columns=["Dividends", "Stock Splits"]))
@@ -0,0 +1,80 @@
+"""Tests for the batched scan fetch path in main.py (the yfinance provider is mocked)."""
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+import pytest
+
+import main
+from bar_store import BarStore
+from tests.conftest import NY, make_bars, make_batch
+
+
+@pytest.fixture
+def fetch_env(tmp_path):
+    store = BarStore(str(tmp_path), max_age_seconds=0)
+    with patch.object(main, "_bar_store", store), \
+         patch.object(main, "_semaphore", asyncio.Semaphore(2)), \
+         patch("main.asyncio.sleep") as mock_sleep:
+        async def _no_sleep(_):
+            return None
+        mock_sleep.side_effect = _no_sleep
+        yield store
+
+
+class TestDownloadBatch:
+
+    def test_retries_only_missing_tickers(self, fetch_env):
+        calls = []
+
+        def fake_download(symbols, **kwargs):
+            calls.append(symbols)
+            if len(calls) == 1:
+                return make_batch({"AAPL": make_bars(tz=None)})
+            return make_batch({"MSFT": make_bars(base=300.0, tz=None)})
+
+        with patch("market_data.yf.download", side_effect=fake_download):
+            out = asyncio.run(main._download_batch(["AAPL", "MSFT"]))
+
+        assert calls == ["AAPL MSFT", "MSFT"]
+        assert out["AAPL"] is not None and out["MSFT"] is not None
+
+    def test_exhausted_retries_mark_ticker_none(self, fetch_env):
+        with patch("market_data.yf.download", side_effect=RuntimeError("boom")) as mock_dl:
+            out = asyncio.run(main._download_batch(["AAPL", "MSFT"]))
+        assert out == {"AAPL": None, "MSFT": None}
+        assert mock_dl.call_count == main.FETCH_MAX_RETRIES + 1
+
+
+class TestFetchMany:
+
+    def test_stores_and_falls_back_per_ticker(self, fetch_env):
+        fetch_env.save("MSFT", make_bars(base=300.0, tz=None))
+
+        def fake_download(symbols, **kwargs):
+            return make_batch({"AAPL": make_bars(tz=None)}) if "AAPL" in symbols.split() else pd.DataFrame()
+
+        with patch("market_data.yf.download", side_effect=fake_download):
+            out = asyncio.run(main._fetch_many(["AAPL", "MSFT", "DEAD"]))
+
+        assert len(out["AAPL"]) == 10
+        assert fetch_env.load("AAPL") is not None
+        assert out["MSFT"]["Close"].iloc[0] == 300.0   # provider failed → stored bars served
+        assert out["DEAD"] is None                     # nothing stored → dropped
+
+    def test_naive_batch_tail_merges_into_tz_aware_store(self, fetch_env):
+        # The chart path stores tz-aware history() bars; the scan batch is naive
+        stored = make_bars(periods=5, tz=NY)
+        fetch_env.save("AAPL", stored)
+        tail = make_bars(periods=7, base=200.0, tz=None)
+
+        with patch("market_data.yf.download", return_value=make_batch({"AAPL": tail})):
+            out = asyncio.run(main._fetch_many(["AAPL"]))
+
+        assert len(out["AAPL"]) == 7
+        assert str(out["AAPL"].index.tz) == NY
+        assert out["AAPL"]["Close"].iloc[-1] == 206.0
@@ -0,0 +1,74 @@
+"""Tests for batch_indicators.py — BarMatrix alignment and row parity with indicators.py."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_indicators as bi
+import indicators
+from benchmarks.synthetic import PATTERNS, make_pattern_series
+
+
+@pytest.fixture
+def frames():
+    # Unequal lengths exercise the left padding
+    lengths = [300, 504, 260, 420, 504, 350]
+    return {
+        f"T{i}": make_pattern_series(pattern, lengths[i], seed=i)
+        for i, pattern in enumerate(PATTERNS)
+    }
+
+
+class TestBarMatrix:
+
+    def test_right_aligned_with_left_padding(self, frames):
+        m = bi.BarMatrix.from_frames(frames)
+        assert m.close.shape == (len(frames), 504)
+        for row, ticker in enumerate(m.tickers):
+            n = len(frames[ticker])
+            assert m.lengths[row] == n
+            assert np.isnan(m.close[row, :504 - n]).all()
+            np.testing.assert_array_equal(m.close[row, 504 - n:], frames[ticker]["Adj Close"].to_numpy())
+
+    def test_skips_unusable_frames(self, frames):
+        frames["NONE"] = None
+        frames["EMPTY"] = pd.DataFrame()
+        frames["NOHL"] = frames["T0"][["Close"]]
+        m = bi.BarMatrix.from_frames(frames)
+        assert m.tickers == [f"T{i}" for i in range(len(PATTERNS))]
+
+    def test_flattens_multiindex_columns(self, frames):
+        df = frames["T0"]
+        frames["T0"] = df.set_axis(pd.MultiIndex.from_product([df.columns, ["T0"]]), axis=1)
+        m = bi.BarMatrix.from_frames(frames)
+        np.testing.assert_array_equal(m.high[0, -len(df):], df["High"].to_numpy())
+
+
+class TestRowParity:
+
+    def test_indicators_match_single_ticker(self, frames):
+        m = bi.BarMatrix.from_frames(frames)
+        rows = {
+            "ema": bi.ema(m.close, 8),
+            "sma": bi.sma(m.close, 200),
+            "tr": bi.true_range(m.high, m.low, m.close),
+            "atr": bi.atr(m.high, m.low, m.close, 14),
+            "cci": bi.cci(m.high, m.low, m.close, 20),
+        }
+        for row, ticker in enumerate(m.tickers):
+            df = frames[ticker]
+            close, high, low = df["Adj Close"], df["High"], df["Low"]
+            n = len(df)
+            expected = {
+                "ema": indicators.ema(close, 8),
+                "sma": indicators.sma(close, 200),
+                "tr": indicators.true_range(high, low, close),
+                "atr": indicators.atr(high, low, close, 14),
+                "cci": indicators.cci(high, low, close, 20),
+            }
+            for name, series in expected.items():
+                np.testing.assert_array_equal(rows[name][row, -n:], series.to_numpy(), err_msg=f"{ticker} {name}")
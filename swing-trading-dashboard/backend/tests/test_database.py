@@ -0,0 +1,345 @@
+"""Tests for database.py — pooled WAL connections, buffered zones, latest-scan cache, promoted setup columns."""
+import asyncio
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+import database
+from database import (
+    SCHEMA_VERSION,
+    ZoneWriter,
+    batch_save_setups,
+    close_db,
+    complete_scan_run,
+    get_latest_scan_timestamp,
+    get_latest_setups,
+    get_sr_zones_for_ticker_from_db,
+    init_db,
+    open_db,
+    query_setups,
+    save_scan_run,
+)
+from tests.conftest import make_setup
+
+ZONES = [{"level": 10.0, "upper": 10.5, "lower": 9.5, "type": "SUPPORT"}]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "t.db")
+
+
+def _run(coro_fn):
+    return asyncio.run(coro_fn())
+
+
+class TestConnectionPool:
+
+    def test_wal_and_pragmas(self, db_path):
+        async def go():
+            pool = await open_db(db_path, readers=2)
+            try:
+                async with pool.reader() as db:
+                    async with db.execute("PRAGMA journal_mode") as cur:
+                        mode = (await cur.fetchone())[0]
+                    async with db.execute("PRAGMA synchronous") as cur:
+                        sync = (await cur.fetchone())[0]
+                return mode, sync, len(pool._all)
+            finally:
+                await close_db(db_path)
+
+        assert _run(go) == ("wal", 1, 3)  # 1 = NORMAL; one writer + two readers
+        assert db_path not in database._pools
+
+    def test_reads_do_not_wait_on_open_write(self, db_path):
+        async def go():
+            pool = await open_db(db_path)
+            try:
+                await save_scan_run(db_path, "s1")
+                await complete_scan_run(db_path, "s1", 1)
+                await ZoneWriter(db_path, "s1", flush_rows=1).add("AAA", ZONES)
+                async with pool.writer() as db:
+                    # Uncommitted write in progress: readers see the last commit
+                    await db.execute("INSERT INTO scan_runs (scan_timestamp, completed) VALUES ('s2', 1)")
+                    ts = await asyncio.wait_for(get_latest_scan_timestamp(db_path), 1.0)
+                    zones = await asyncio.wait_for(get_sr_zones_for_ticker_from_db(db_path, "AAA"), 1.0)
+                    await db.commit()
+                return ts, zones
+            finally:
+                await close_db(db_path)
+
+        ts, zones = _run(go)
+        assert ts == "s1"
+        assert zones == ZONES
+
+    def test_failed_writer_is_rolled_back(self, db_path):
+        async def go():
+            pool = await open_db(db_path)
+            try:
+                with pytest.raises(RuntimeError):
+                    async with pool.writer() as db:
+                        await db.execute("INSERT INTO scan_runs (scan_timestamp) VALUES ('lost')")
+                        raise RuntimeError("boom")
+                await save_scan_run(db_path, "kept")
+            finally:
+                await close_db(db_path)
+
+        _run(go)
+        with sqlite3.connect(db_path) as conn:
+            rows = [r[0] for r in conn.execute("SELECT scan_timestamp FROM scan_runs")]
+        assert rows == ["kept"]
+
+    def test_concurrent_writers_are_serialized(self, db_path):
+        async def go():
+            await open_db(db_path)
+            try:
+                writers = [ZoneWriter(db_path, "s", flush_rows=1) for _ in range(50)]
+                await asyncio.gather(*(w.add(f"T{i}", ZONES) for i, w in enumerate(writers)))
+            finally:
+                await close_db(db_path)
+
+        _run(go)
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM sr_zones").fetchone()[0] == 50
+
+
+class TestWithoutPool:
+
+    def test_per_call_connections(self, db_path):
+        async def go():
+            await init_db(db_path)
+            await save_scan_run(db_path, "s1")
+            await complete_scan_run(db_path, "s1", 3)
+            return await get_latest_scan_timestamp(db_path)
+
+        assert _run(go) == "s1"
+        assert not database._pools
+
+
+class TestZoneWriter:
+
+    def test_flushes_at_threshold_and_on_demand(self, db_path):
+        async def go():
+            await init_db(db_path)
+            writer = ZoneWriter(db_path, "s1", flush_rows=4)
+            await writer.add("A", ZONES * 3)
+            assert writer.flushes == 0
+            await writer.add("B", ZONES * 2)  # 5 rows ≥ 4: one transaction
+            assert (writer.flushes, writer.rows_written) == (1, 5)
+            await writer.add("C", ZONES)
+            assert await writer.flush() == 1
+            assert await writer.flush() == 0
+            return writer.flushes
+
+        assert _run(go) == 2
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT ticker, COUNT(*) FROM sr_zones GROUP BY ticker ORDER BY ticker").fetchall()
+        assert rows == [("A", 3), ("B", 2), ("C", 1)]
+
+    def test_zones_of_incomplete_scan_are_not_visible(self, db_path):
+        async def go():
+            await init_db(db_path)
+            await save_scan_run(db_path, "s1")
+            writer = ZoneWriter(db_path, "s1", flush_rows=1)
+            await writer.add("A", ZONES)
+            # Scan not completed (e.g. crashed before complete_scan_run)
+            before = await get_sr_zones_for_ticker_from_db(db_path, "A")
+            await complete_scan_run(db_path, "s1", 1)
+            return before, await get_sr_zones_for_ticker_from_db(db_path, "A")
+
+        before, after = _run(go)
+        assert before == [] and after == ZONES
+
+
+class TestLatestScanPointer:
+
+    def test_served_from_memory_until_the_file_changes(self, db_path, monkeypatch):
+        async def go():
+            await open_db(db_path)
+            try:
+                await save_scan_run(db_path, "s1")
+                await complete_scan_run(db_path, "s1", 1)
+
+                def no_read(path):
+                    raise AssertionError("latest scan should come from the in-process pointer")
+
+                with monkeypatch.context() as m:
+                    m.setattr(database, "_read", no_read)
+                    return [await get_latest_scan_timestamp(db_path) for _ in range(3)]
+            finally:
+                await close_db(db_path)
+
+        assert _run(go) == ["s1"] * 3
+
+    def test_complete_scan_run_moves_the_pointer(self, db_path):
+        async def go():
+            await open_db(db_path)
+            try:
+                await save_scan_run(db_path, "s1")
+                await complete_scan_run(db_path, "s1", 1)
+                first = await get_latest_scan_timestamp(db_path)
+                await save_scan_run(db_path, "s2")
+                during = await get_latest_scan_timestamp(db_path)  # s2 not completed yet
+                await complete_scan_run(db_path, "s2", 1)
+                return first, during, database._latest_scan[db_path][0]
+            finally:
+                await close_db(db_path)
+
+        assert _run(go) == ("s1", "s1", "s2")
+
+    def test_write_from_another_process_invalidates(self, db_path):
+        async def go():
+            await open_db(db_path)
+            try:
+                await save_scan_run(db_path, "s1")
+                await complete_scan_run(db_path, "s1", 1)
+                first = await get_latest_scan_timestamp(db_path)
+                # Another process completes a newer scan behind our back
+                with sqlite3.connect(db_path) as conn:
+                    conn.execute("INSERT INTO scan_runs (scan_timestamp, completed) VALUES ('ext', 1)")
+                conn.close()
+                return first, await get_latest_scan_timestamp(db_path)
+            finally:
+                await close_db(db_path)
+
+        assert _run(go) == ("s1", "ext")
+
+
+SETUPS = [
+    make_setup("AAA", "BASE", quality_score=60, base_type="FLAT_BASE", sector="Tech", rs_blue_dot=True, geometry=[1, 2]),
+    make_setup("BBB", "BASE", quality_score=85, base_type="CUP_HANDLE", sector="Energy", rs_blue_dot=False),
+    make_setup("CCC", "WATCHLIST", distance_pct=1.2, sector="Tech", rs_blue_dot=False),
+    make_setup("DDD", "BASE", quality_score=70, base_type="CUP_HANDLE", sector="Tech"),
+    make_setup("EEE", "WATCHLIST", distance_pct=0.4, sector="Energy", rs_blue_dot=True),
+    make_setup("FFF", "VCP", cci=120.5, sector="Tech"),
+]
+
+
+def _saved(db_path):
+    async def go():
+        await init_db(db_path)
+        await save_scan_run(db_path, "s1")
+        await batch_save_setups(db_path, "s1", SETUPS)
+        await complete_scan_run(db_path, "s1", len(SETUPS))
+    asyncio.run(go())
+
+
+class TestPromotedColumns:
+
+    def test_round_trip_and_blob_holds_only_the_rest(self, db_path):
+        _saved(db_path)
+        setups = _run(lambda: get_latest_setups(db_path))
+        assert setups == [{**s, "scan_timestamp": "s1"} for s in SETUPS]
+        assert setups[0]["rs_blue_dot"] is True
+        with sqlite3.connect(db_path) as conn:
+            row = conn.execute(
+                "SELECT quality_score, sector, rs_blue_dot, base_type, metadata FROM scan_setups WHERE ticker = 'AAA'"
+            ).fetchone()
+        assert row == (60, "Tech", 1, "FLAT_BASE", '{"geometry": [1, 2]}')
+
+    def test_filter_order_and_paginate_in_sql(self, db_path):
+        _saved(db_path)
+        page, total = _run(lambda: query_setups(db_path, "BASE", order_by="quality", limit=2))
+        assert [s["ticker"] for s in page] == ["BBB", "DDD"] and total == 3
+        page, total = _run(lambda: query_setups(db_path, "BASE", order_by="quality", limit=2, offset=2))
+        assert [s["ticker"] for s in page] == ["AAA"] and total == 3
+        page, _ = _run(lambda: query_setups(db_path, "WATCHLIST", order_by="distance"))
+        assert [s["ticker"] for s in page] == ["EEE", "CCC"]
+        page, total = _run(lambda: query_setups(db_path, sector="Tech", rs_blue_dot=False))
+        assert [s["ticker"] for s in page] == ["CCC"] and total == 1
+        page, _ = _run(lambda: query_setups(db_path, base_type="CUP_HANDLE", min_quality=80))
+        assert [s["ticker"] for s in page] == ["BBB"]
+        with pytest.raises(ValueError):
+            _run(lambda: query_setups(db_path, order_by="entry; DROP TABLE trades"))
+
+    def test_metadata_decoded_only_for_details(self, db_path, monkeypatch):
+        _saved(db_path)
+
+        def no_decode(*args, **kwargs):
+            raise AssertionError("metadata decoded without details")
+
+        with monkeypatch.context() as m:
+            m.setattr(database.json, "loads", no_decode)
+            summary, _ = _run(lambda: query_setups(db_path, "BASE", order_by="quality", details=False))
+        assert summary[0] == {**SETUPS[1], "scan_timestamp": "s1"}  # BBB has no extra fields
+        assert "geometry" not in summary[-1] and summary[-1]["quality_score"] == 60
+
+    def test_ordered_queries_use_the_composite_indexes(self, db_path):
+        _saved(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ANALYZE")
+            for order, index in ((database.SETUP_ORDERS["quality"], "idx_setups_quality"),
+                                 (database.SETUP_ORDERS["distance"], "idx_setups_distance")):
+                plan = " ".join(r[-1] for r in conn.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM scan_setups WHERE scan_timestamp = 's1' "
+                    f"AND setup_type = 'BASE' ORDER BY {order}"
+                ))
+                assert index in plan and "TEMP B-TREE" not in plan
+
+    def test_missing_distance_sorts_last_and_explicit_null_is_kept(self, db_path):
+        async def go():
+            await init_db(db_path)
+            await save_scan_run(db_path, "s1")
+            await batch_save_setups(db_path, "s1", [
+                make_setup("NUL", "WATCHLIST", distance_pct=None),
+                make_setup("ABS", "WATCHLIST"),
+                *SETUPS,
+            ])
+            await complete_scan_run(db_path, "s1", 8)
+            return await query_setups(db_path, "WATCHLIST", order_by="distance", details=True)
+
+        page, _ = _run(go)
+        assert [s["ticker"] for s in page] == ["EEE", "CCC", "NUL", "ABS"]
+        assert "distance_pct" in page[2] and page[2]["distance_pct"] is None
+        assert "distance_pct" not in page[3]
+
+    def test_migrates_an_old_database(self, db_path):
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript("""
+                CREATE TABLE scan_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, scan_timestamp TEXT NOT NULL UNIQUE,
+                    tickers_scanned INTEGER DEFAULT 0, completed INTEGER DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE scan_setups (id INTEGER PRIMARY KEY AUTOINCREMENT, scan_timestamp TEXT NOT NULL,
+                    ticker TEXT NOT NULL, setup_type TEXT NOT NULL, entry REAL NOT NULL, stop_loss REAL NOT NULL,
+                    take_profit REAL NOT NULL, rr REAL NOT NULL, setup_date TEXT NOT NULL, metadata TEXT);
+                INSERT INTO scan_runs (scan_timestamp, completed) VALUES ('old', 1);
+            """)
+            conn.execute(
+                "INSERT INTO scan_setups (scan_timestamp, ticker, setup_type, entry, stop_loss, take_profit, rr,"
+                " setup_date, metadata) VALUES ('old', 'AAA', 'BASE', 10, 9, 12, 2, '2026-01-02', ?)",
+                ('{"quality_score": 72, "distance_pct": null, "sector": "Tech", "rs_blue_dot": true,'
+                 ' "base_type": "FLAT_BASE", "pivot": 11.5}',),
+            )
+        conn.close()
+
+        _run(lambda: init_db(db_path))
+        _run(lambda: init_db(db_path))  # idempotent
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            row = conn.execute(
+                "SELECT quality_score, distance_pct, sector, rs_blue_dot, base_type, metadata FROM scan_setups"
+            ).fetchone()
+        conn.close()
+        assert row == (72, None, "Tech", 1, "FLAT_BASE", '{"distance_pct":null,"pivot":11.5}')
+        setups = _run(lambda: get_latest_setups(db_path))
+        assert setups[0]["quality_score"] == 72 and setups[0]["rs_blue_dot"] is True
+        assert setups[0]["pivot"] == 11.5 and setups[0]["distance_pct"] is None
+
+    def test_migration_rebuilds_the_distance_index(self, db_path):
+        _run(lambda: init_db(db_path))
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DROP INDEX idx_setups_distance")
+            conn.execute("CREATE INDEX idx_setups_distance ON scan_setups(scan_timestamp, setup_type, distance_pct)")
+            conn.execute("PRAGMA user_version = 1")
+        conn.close()
+
+        _run(lambda: init_db(db_path))
+        with sqlite3.connect(db_path) as conn:
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_setups_distance'").fetchone()[0]
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert "distance_pct IS NULL" in sql and version == SCHEMA_VERSION
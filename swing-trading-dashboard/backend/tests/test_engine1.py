@@ -0,0 +1,151 @@
+"""Tests for Engine 1: S/R zones, the memoized KDE peaks, the binned FFT KDE and batched zones."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import gaussian_kde
+
+from benchmarks.synthetic import PATTERNS, make_pattern_series
+from engines import engine1
+from engines.engine1 import calculate_sr_zones, calculate_sr_zones_batch
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    engine1.clear_peak_cache()
+    yield
+    engine1.clear_peak_cache()
+
+
+class TestPeakCache:
+
+    @pytest.mark.parametrize("pattern", list(PATTERNS))
+    def test_cached_zones_match_uncached(self, pattern, monkeypatch):
+        df = make_pattern_series(pattern, 504, seed=7)
+        monkeypatch.setattr(engine1, "SR_ZONE_CACHE_SIZE", 0)
+        expected = calculate_sr_zones("T", df)
+        monkeypatch.setattr(engine1, "SR_ZONE_CACHE_SIZE", 16)
+        assert calculate_sr_zones("T", df) == expected   # miss
+        assert calculate_sr_zones("T", df) == expected   # hit
+
+    def test_hit_skips_kde(self, monkeypatch):
+        df = make_pattern_series("cup", 400, seed=1)
+        zones = calculate_sr_zones("T", df)
+
+        def boom(*args, **kwargs):
+            raise AssertionError("KDE should have been served from the cache")
+
+        monkeypatch.setattr(engine1, "_compute_density_peaks", boom)
+        assert calculate_sr_zones("T", df.copy()) == zones
+
+    def test_changed_bars_recompute(self, monkeypatch):
+        df = make_pattern_series("walk", 400, seed=2)
+        calculate_sr_zones("T", df)
+        calls = []
+        compute = engine1._compute_density_peaks
+        monkeypatch.setattr(engine1, "_compute_density_peaks", lambda *a: calls.append(1) or compute(*a))
+
+        changed = df.copy()
+        changed.iloc[-1, changed.columns.get_loc("Adj Close")] *= 1.01
+        calculate_sr_zones("T", changed)
+        assert calls == [1]
+
+    def test_unchanged_weekly_cloud_reuses_the_peaks(self, monkeypatch):
+        df = make_pattern_series("walk", 400, seed=3)
+        calculate_sr_zones("T", df)
+        calls = []
+        compute = engine1._compute_density_peaks
+        monkeypatch.setattr(engine1, "_compute_density_peaks", lambda *a: calls.append(1) or compute(*a))
+
+        # The weekly cloud takes each week's last close: revise a Monday's
+        i = next(i for i in range(len(df) - 20, 0, -1) if df.index[i].dayofweek == 0)
+        changed = df.copy()
+        col = changed.columns.get_loc("Adj Close")
+        changed.iloc[i, col] *= 1.01
+        calculate_sr_zones("T", changed)
+        assert calls == []
+
+        changed = df.copy()
+        changed.iloc[-1, col] *= 1.01
+        calculate_sr_zones("T", changed)
+        assert calls == [1]
+
+    def test_size_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(engine1, "SR_ZONE_CACHE_SIZE", 2)
+        for seed in range(4):
+            calculate_sr_zones("T", make_pattern_series("walk", 300, seed=seed))
+        assert len(engine1._peak_cache) == 2
+
+
+class TestBinnedKde:
+
+    def test_density_matches_gaussian_kde(self):
+        rng = np.random.default_rng(0)
+        points = rng.normal(100.0, 5.0, 150)
+        weights = rng.uniform(1.0, 2.0, 150)
+        x = np.linspace(points.min() * 0.98, points.max() * 1.02, 600)
+        expected = gaussian_kde(points, bw_method=0.3, weights=weights)(x)
+        density = engine1._binned_kde_rows(points[None], weights[None], np.array([0.3]), x[None])[0]
+        np.testing.assert_allclose(density, expected, atol=1e-4 * expected.max())
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    @pytest.mark.parametrize("pattern", list(PATTERNS))
+    def test_zone_levels_within_half_width(self, pattern, seed, monkeypatch):
+        df = make_pattern_series(pattern, 504, seed=seed)
+        monkeypatch.setattr(engine1, "SR_KDE_METHOD", "scipy")
+        exact = calculate_sr_zones("T", df)
+        monkeypatch.setattr(engine1, "SR_KDE_METHOD", "fft")
+        fast = calculate_sr_zones("T", df)
+
+        assert len(fast) == len(exact)
+        for a, b in zip(exact, fast):
+            assert abs(a["level"] - b["level"]) <= 0.2 * a["atr"], (a, b)
+            assert a["type"] == b["type"]
+
+
+@pytest.fixture
+def frames():
+    lengths = [300, 504, 260, 700]
+    out = {
+        f"{pattern}{seed}": make_pattern_series(pattern, lengths[seed], seed=seed)
+        for seed in range(len(lengths)) for pattern in PATTERNS
+    }
+    naive = out["cup0"].copy()
+    naive.index = naive.index.tz_localize(None)
+    tokyo = out["vcp1"].copy()
+    tokyo.index = tokyo.index.tz_localize(None).tz_localize("Asia/Tokyo")
+    multi = out["walk2"].copy()
+    multi.columns = pd.MultiIndex.from_product([multi.columns, ["MULTI"]])
+    out.update(NAIVE=naive, TOKYO=tokyo, MULTI=multi, SHORT=out["cup0"].iloc[:30], NONE=None)
+    return out
+
+
+class TestBatchZones:
+
+    @pytest.mark.parametrize("method", ["scipy", "fft"])
+    def test_matches_single_ticker(self, frames, method, monkeypatch):
+        monkeypatch.setattr(engine1, "SR_KDE_METHOD", method)
+        monkeypatch.setattr(engine1, "SR_ZONE_CACHE_SIZE", 0)
+        batch = calculate_sr_zones_batch(frames)
+        assert set(batch) == set(frames) and batch["NONE"] == [] and batch["SHORT"] == []
+        for ticker, df in frames.items():
+            if df is not None:
+                assert batch[ticker] == calculate_sr_zones(ticker, df), ticker
+
+    def test_shares_peak_cache(self, frames, monkeypatch):
+        frames = {t: df for t, df in frames.items() if df is not None}
+        batch = calculate_sr_zones_batch(frames)
+        monkeypatch.setattr(engine1, "_compute_density_peaks", lambda *a: 1 / 0)
+        monkeypatch.setattr(engine1, "_batch_density_peaks", lambda *a: 1 / 0)
+        assert calculate_sr_zones_batch(frames) == batch
+        assert all(calculate_sr_zones(t, df) == batch[t] for t, df in frames.items())
+
+    def test_small_chunks(self, frames, monkeypatch):
+        expected = calculate_sr_zones_batch(frames)
+        engine1.clear_peak_cache()
+        monkeypatch.setattr(engine1, "_KDE_BATCH_CELLS", 1)  # one cloud per chunk
+        assert calculate_sr_zones_batch(frames) == expected
@@ -0,0 +1,122 @@
+"""Tests for Engine 2 trendlines: candidate scoring, the lazy series and the Path C breakout."""
+import json
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import PATTERNS, bars_from_close, make_pattern_series, trading_index
+from engines import engine2
+from engines.engine2 import TrendlineSeries, detect_trendline, scan_vcp, trendline_to_json
+
+
+def _reference_series(index, anchor, price, slope):
+    """The original per-bar loop the vectorized series replaced."""
+    out = []
+    for date in index:
+        if date < anchor:
+            continue
+        val = price + slope * (date - anchor).days
+        if val > 0:
+            out.append({"time": date.strftime("%Y-%m-%d"), "value": round(float(val), 2)})
+    return out
+
+
+class TestBestTrendline:
+
+    def _resistance(self, spikes):
+        # Resistance 120 → 108.1 touched seven times; *spikes* poke through it
+        index = pd.date_range("2024-01-01", periods=120, freq="D")
+        line = 120.0 - 0.1 * np.arange(120)
+        highs = line - 4.0
+        touched = [10, 40, 55, 70, 85, 100, 115]
+        highs[touched] = line[touched]
+        highs[spikes] = line[spikes] + 15.0
+        return index, highs, np.array(sorted(touched + list(spikes)))
+
+    def test_prefers_most_touched_line(self):
+        # The spike is the most prominent pivot: the old top-2 pick anchored on it
+        index, highs, pivots = self._resistance([60])
+        prominences = np.where(pivots == 60, 19.0, 4.0)
+        a, b, slope, touches, violations = engine2._best_trendline(
+            highs, index, pivots, prominences, descending=True
+        )
+        assert a == 10 and b != 60
+        assert slope == pytest.approx(-0.1)
+        assert touches == 7 and violations == 1
+
+    def test_violations_outweigh_touches(self):
+        # Two early breaks cost more than the one touch a later anchor gives up
+        index, highs, pivots = self._resistance([20, 25])
+        a, _, _, touches, violations = engine2._best_trendline(
+            highs, index, pivots, np.ones(len(pivots)), descending=True
+        )
+        assert a == 40 and touches == 6 and violations == 0
+
+    def test_wrong_direction_is_rejected(self):
+        index = pd.date_range("2024-01-01", periods=60, freq="D")
+        lows = 50.0 + 0.2 * np.arange(60)
+        pivots = np.array([5, 30, 50])
+        assert engine2._best_trendline(lows, index, pivots, np.ones(3), descending=True) is None
+        a, _, slope, touches, _ = engine2._best_trendline(lows, index, pivots, np.ones(3), descending=False)
+        assert a == 5 and slope == pytest.approx(0.2) and touches == 55
+
+
+class TestTrendlineSeries:
+
+    @pytest.mark.parametrize("tz", [None, "America/New_York"])
+    def test_matches_reference_loop(self, tz):
+        index = pd.date_range("2024-01-02", periods=250, freq="B", tz=tz)
+        series = TrendlineSeries.from_line(index, index[30], 120.0, -0.4)
+        expected = _reference_series(index, index[30], 120.0, -0.4)
+        assert series.to_list() == expected
+        assert len(series) == len(expected) and series[-1] == expected[-1] and series[5] == expected[5]
+        assert series[-3:] == expected[-3:]
+
+    def test_compact_and_picklable(self):
+        index = pd.date_range("2024-01-02", periods=100, freq="B", tz="America/New_York")
+        series = TrendlineSeries.from_line(index, index[0], 50.0, 0.1)
+        assert pickle.loads(pickle.dumps(series)) == series
+        assert not hasattr(series, "__dict__")
+
+    @pytest.mark.parametrize("pattern", list(PATTERNS))
+    def test_detect_trendline_json(self, pattern):
+        tl = detect_trendline("T", make_pattern_series(pattern, 400, seed=3))
+        encoded = trendline_to_json(tl)
+        json.dumps(encoded)
+        for side in ("descending", "ascending"):
+            if tl and tl[side]:
+                assert encoded[side]["series"] == tl[side]["series"].to_list()
+                assert tl[side]["series"][-1]["value"] > 0
+
+    def test_to_json_none(self):
+        assert trendline_to_json(None) is None
+
+
+class TestTrendlineBreakout:
+
+    def test_scan_vcp_path_c(self):
+        # Steady advance (trend template passes), last bar closes 1% over a
+        # descending line on double volume; no zones, so Paths A/B cannot fire
+        rng = np.random.default_rng(11)
+        close = np.linspace(50.0, 100.0, 300) * (1.0 + rng.normal(0.0, 0.002, 300))
+        df = bars_from_close(close, rng, index=trading_index(300))
+        df.iloc[-1, df.columns.get_loc("Volume")] = df["Volume"].iloc[-51:-1].mean() * 2.0
+
+        anchor = df.index[-60]
+        target = float(df["Adj Close"].iloc[-1]) / 1.01
+        slope = (target - 120.0) / (df.index[-1] - anchor).days
+        series = TrendlineSeries.from_line(df.index, anchor, 120.0, slope)
+        trendline = {"descending": {"series": series, "touches": 3, "violations": 0}, "ascending": None}
+
+        vcp = scan_vcp("T", df, [], trendline=trendline)
+        assert vcp is not None and vcp["is_trendline_breakout"]
+        assert vcp["trendline"] == trendline_to_json(trendline)
+        assert vcp["trendline"]["descending"]["series"] == series.to_list()
+        without = scan_vcp("T", df, [])
+        assert without is None or not without["is_trendline_breakout"]
@@ -0,0 +1,43 @@
+"""Smoke tests for benchmarks/engine_benchmark.py and the planted synthetic patterns."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+from benchmarks.engine_benchmark import BUDGETS_US, ENGINES, check_budgets, format_results, run_engine_benchmark
+from benchmarks.synthetic import PATTERNS, make_pattern_series
+
+
+class TestPatternSeries:
+
+    @pytest.mark.parametrize("pattern", list(PATTERNS))
+    def test_deterministic_and_continuous(self, pattern):
+        a = make_pattern_series(pattern, 300, seed=5)
+        b = make_pattern_series(pattern, 300, seed=5)
+        assert len(a) == 300
+        np.testing.assert_array_equal(a["Close"].to_numpy(), b["Close"].to_numpy())
+        # Planting must not introduce price gaps larger than a normal daily move
+        assert np.abs(np.diff(np.log(a["Close"].to_numpy()))).max() < 0.1
+
+
+class TestEngineBenchmark:
+
+    def test_reports_every_engine_and_length(self):
+        results = run_engine_benchmark(lengths=(260,), n_series=2)
+        assert set(results) == set(ENGINES)
+        for per_len in results.values():
+            m = per_len["260"]
+            assert m["us_per_ticker"] > 0
+            assert m["peak_alloc_kib"] > 0
+            assert m["series"] == 2
+        assert "calculate_sr_zones" in format_results(results)
+
+    def test_check_budgets(self):
+        # Timings are enforced by `engine_benchmark --check`, not here: wall time is noisy on shared CI
+        budget = BUDGETS_US["detect_trendline"]
+        results = {"detect_trendline": {"250": {"us_per_ticker": budget / 2}, "5000": {"us_per_ticker": budget * 2}}}
+        failures = check_budgets(results)
+        assert len(failures) == 1 and "5000 bars" in failures[0]
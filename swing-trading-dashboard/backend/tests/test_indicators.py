@@ -0,0 +1,149 @@
+"""Tests for indicators.py — IndicatorContext memoization, the shared bar view, engine parity, vectorized CCI."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis
+import indicators
+from benchmarks.synthetic import PATTERNS, make_pattern_series
+from engines import engine2, engine3, engine5
+from engines.engine1 import calculate_sr_zones
+from engines.engine2 import detect_trendline, scan_vcp
+from engines.engine3 import scan_pullback, scan_relaxed_pullback
+from engines.engine5 import scan_base_pattern
+from indicators import IndicatorContext
+
+
+@pytest.fixture
+def bars():
+    return make_pattern_series("vcp", 400, seed=2)
+
+
+class TestIndicatorContext:
+
+    def test_matches_plain_functions(self, bars):
+        ctx = IndicatorContext(bars)
+        close, high, low = bars["Adj Close"], bars["High"], bars["Low"]
+        pd.testing.assert_series_equal(ctx.ema(8), indicators.ema(close, 8))
+        pd.testing.assert_series_equal(ctx.sma(200), indicators.sma(close, 200))
+        pd.testing.assert_series_equal(ctx.atr(14), indicators.atr(high, low, close, 14))
+        pd.testing.assert_series_equal(ctx.cci(20), indicators.cci(high, low, close, 20))
+        pd.testing.assert_series_equal(ctx.true_range(), indicators.true_range(high, low, close))
+        pd.testing.assert_series_equal(ctx.vol_sma(50), bars["Volume"].rolling(50).mean())
+
+    def test_each_indicator_computed_once(self, bars, monkeypatch):
+        calls = []
+        real_ema = indicators.ema
+        monkeypatch.setattr(indicators, "ema", lambda s, n: calls.append(n) or real_ema(s, n))
+        ctx = IndicatorContext(bars)
+        assert ctx.ema(8) is ctx.ema(8)
+        ctx.ema(20)
+        assert calls == [8, 20]
+
+    def test_falls_back_to_close_and_flattens_columns(self, bars):
+        flat = bars.drop(columns=["Adj Close"])
+        multi = flat.set_axis(pd.MultiIndex.from_product([flat.columns, ["X"]]), axis=1)
+        ctx = IndicatorContext(multi)
+        assert ctx.close_col == "Close"
+        assert list(ctx.df.columns) == list(flat.columns)
+
+    def test_shared_frame_is_not_copied(self, bars):
+        assert IndicatorContext(bars).df is bars
+
+    def test_debug_mode_detects_mutation(self, bars, monkeypatch):
+        monkeypatch.setattr(indicators, "DEBUG_READONLY_BARS", True)
+        bars = bars.copy()
+        ctx = IndicatorContext(bars)
+        ctx.ema(8)
+        ctx.assert_unchanged()
+        bars.iloc[-1, 0] += 1.0
+        with pytest.raises(AssertionError):
+            ctx.assert_unchanged()
+
+
+class TestBarView:
+
+    def test_normalized_frame_is_returned_as_is(self, bars):
+        assert indicators.bar_view(bars) is bars
+
+    def test_flattens_and_dedupes_without_copying_values(self, bars):
+        multi = bars.set_axis(pd.MultiIndex.from_product([bars.columns, ["X"]]), axis=1)
+        view = indicators.bar_view(multi)
+        assert list(view.columns) == list(bars.columns)
+        assert np.shares_memory(view["Close"].to_numpy(), multi[("Close", "X")].to_numpy())
+        doubled = pd.concat([bars, bars[["Close"]]], axis=1)
+        assert list(indicators.bar_view(doubled).columns) == list(bars.columns)
+
+    @pytest.mark.parametrize("prep", [engine2._prep, engine3._prep, engine5._prep])
+    def test_engines_do_not_copy(self, bars, prep):
+        assert prep(bars) is bars
+
+    def test_engines_leave_input_untouched(self, bars, monkeypatch):
+        monkeypatch.setattr(indicators, "DEBUG_READONLY_BARS", True)
+        before = bars.copy()
+        for pattern in PATTERNS:
+            analysis.analyze_ticker("T", make_pattern_series(pattern, 400, seed=1))
+        analysis.analyze_ticker("T", bars)
+        pd.testing.assert_frame_equal(bars, before)
+
+
+class TestEngineParity:
+
+    @pytest.mark.parametrize("pattern", list(PATTERNS))
+    def test_engines_identical_with_shared_context(self, pattern):
+        df = make_pattern_series(pattern, 504, seed=4)
+        ctx = IndicatorContext(df)
+
+        zones = calculate_sr_zones("T", df)
+        assert calculate_sr_zones("T", df, ctx) == zones
+        tl = detect_trendline("T", df)
+        assert detect_trendline("T", df, ctx) == tl
+        vcp = scan_vcp("T", df, zones, 0.05, trendline=tl)
+        assert scan_vcp("T", df, zones, 0.05, trendline=tl, ctx=ctx) == vcp
+        assert scan_pullback("T", df, zones, tl, ctx) == scan_pullback("T", df, zones, tl)
+        assert scan_relaxed_pullback("T", df, zones, tl, ctx) == scan_relaxed_pullback("T", df, zones, tl)
+        assert scan_base_pattern("T", df, ctx=ctx) == scan_base_pattern("T", df)
+
+
+def _cci_reference(high, low, close, length=20, constant=0.015):
+    """The original rolling-apply implementation, kept as the parity oracle."""
+    tp = (high + low + close) / 3.0
+    tp_sma = tp.rolling(window=length, min_periods=length).mean()
+    mean_dev = tp.rolling(window=length, min_periods=length).apply(
+        lambda x: np.mean(np.abs(x - x.mean())), raw=True
+    )
+    denom = (constant * mean_dev).replace(0, np.nan)
+    return (tp - tp_sma) / denom
+
+
+class TestCci:
+
+    @pytest.mark.parametrize("length", [5, 14, 20, 50])
+    def test_identical_to_rolling_apply(self, bars, length):
+        h, l, c = bars["High"], bars["Low"], bars["Adj Close"]
+        pd.testing.assert_series_equal(indicators.cci(h, l, c, length), _cci_reference(h, l, c, length),
+                                       check_exact=True)
+
+    def test_nan_and_flat_windows(self, bars):
+        df = bars.copy()
+        df.iloc[100, df.columns.get_loc("High")] = np.nan
+        df.iloc[200:230, [df.columns.get_loc(col) for col in ("High", "Low", "Adj Close")]] = 50.0
+        h, l, c = df["High"], df["Low"], df["Adj Close"]
+        pd.testing.assert_series_equal(indicators.cci(h, l, c), _cci_reference(h, l, c), check_exact=True)
+
+    def test_shorter_than_window(self, bars):
+        short = bars.iloc[:10]
+        assert indicators.cci(short["High"], short["Low"], short["Adj Close"]).isna().all()
+
+    def test_batch_rows_match_single(self):
+        frames = [make_pattern_series(p, 300, seed=1) for p in PATTERNS]
+        stack = lambda col: np.vstack([f[col].to_numpy() for f in frames])
+        out = indicators.cci_batch(stack("High"), stack("Low"), stack("Adj Close"), chunk_rows=2)
+        for i, f in enumerate(frames):
+            expected = indicators.cci(f["High"], f["Low"], f["Adj Close"]).to_numpy()
+            np.testing.assert_array_equal(out[i], expected)
@@ -0,0 +1,108 @@
+"""Tests for market_data.py — provider interface, fixture replay, batch splitting."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import market_data
+from market_data import (
+    FixtureProvider,
+    MarketDataProvider,
+    YFinanceProvider,
+    get_provider,
+    save_fixture,
+    set_provider,
+    split_batch_frame,
+)
+from tests.conftest import NY, make_bars, make_batch
+
+
+class TestSplitBatchFrame:
+
+    def test_splits_multiindex_and_drops_missing(self):
+        df = make_batch({"AAPL": make_bars(tz=None), "MSFT": make_bars(base=300.0, tz=None)})
+        df.loc[:, "MSFT"] = np.nan
+        out = split_batch_frame(df, ["AAPL", "MSFT", "GOOG"])
+        assert list(out) == ["AAPL"]
+        assert list(out["AAPL"].columns) == list(make_bars(tz=None).columns)
+
+    def test_single_ticker_flat_columns(self):
+        out = split_batch_frame(make_bars(tz=None), ["AAPL"])
+        assert list(out) == ["AAPL"]
+
+    def test_drops_non_trading_rows(self):
+        aapl = make_bars(tz=None)
+        msft = make_bars(base=300.0, tz=None).iloc[2:]
+        out = split_batch_frame(make_batch({"AAPL": aapl, "MSFT": msft}), ["AAPL", "MSFT"])
+        assert len(out["AAPL"]) == 10
+        assert len(out["MSFT"]) == 8
+
+
+class TestFixtureProvider:
+
+    def test_csv_roundtrip_keeps_dates(self, tmp_path):
+        bars = make_bars(periods=30, tz=NY)
+        save_fixture(str(tmp_path), "aapl", bars)
+        df = FixtureProvider(str(tmp_path)).history("AAPL")
+        assert len(df) == 30
+        assert [d.date() for d in df.index] == [d.date() for d in bars.index]
+        np.testing.assert_array_equal(df["Close"].to_numpy(), bars["Close"].to_numpy())
+
+    def test_period_is_relative_to_fixture_end(self, tmp_path):
+        save_fixture(str(tmp_path), "AAPL", make_bars(start="2020-01-01", periods=300, tz=None))
+        df = FixtureProvider(str(tmp_path)).history("AAPL", period="1mo")
+        assert df.index[-1] == pd.Timestamp("2021-02-23")
+        assert df.index[0] >= df.index[-1] - pd.DateOffset(months=1)
+
+    def test_start_slices_tail(self, tmp_path):
+        save_fixture(str(tmp_path), "AAPL", make_bars(periods=10, tz=NY))
+        df = FixtureProvider(str(tmp_path)).history("AAPL", start="2024-01-10")
+        assert len(df) == 3
+
+    def test_download_omits_missing_and_actions(self, tmp_path):
+        save_fixture(str(tmp_path), "AAPL", make_bars(tz=None))
+        out = FixtureProvider(str(tmp_path)).download(["AAPL", "NOPE"], period="2y")
+        assert list(out) == ["AAPL"]
+        assert "Dividends" not in out["AAPL"].columns
+
+    def test_info_from_json(self, tmp_path):
+        with open(tmp_path / "info.json", "w", encoding="utf-8") as fh:
+            json.dump({"AAPL": {"sector": "Technology"}}, fh)
+        provider = FixtureProvider(str(tmp_path))
+        assert provider.info("aapl") == {"sector": "Technology"}
+        assert provider.info("MSFT") == {}
+
+    def test_missing_ticker_returns_none(self, tmp_path):
+        assert FixtureProvider(str(tmp_path)).history("AAPL") is None
+
+
+class TestProviderRegistry:
+
+    def test_incomplete_provider_cannot_be_created(self):
+        class HistoryOnly(MarketDataProvider):
+            def history(self, ticker, period=None, start=None):
+                return None
+
+        with pytest.raises(TypeError):
+            HistoryOnly()
+
+    def test_set_and_reset(self, tmp_path):
+        fixture = FixtureProvider(str(tmp_path))
+        try:
+            set_provider(fixture)
+            assert get_provider() is fixture
+            set_provider(None)
+            assert isinstance(get_provider(), YFinanceProvider)
+        finally:
+            set_provider(None)
+
+    def test_unknown_provider_rejected(self, monkeypatch):
+        monkeypatch.setattr(market_data, "MARKET_DATA_PROVIDER", "carrier-pigeon")
+        set_provider(None)
+        with pytest.raises(ValueError):
+            get_provider()
@@ -0,0 +1,55 @@
+"""Tests for polyfit.py — closed-form quadratic fits against scipy's curve_fit."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from scipy.optimize import curve_fit
+
+from polyfit import quadratic_fit, quadratic_fit_batch
+
+
+def _parabola(x, a, b, c):
+    return a * x ** 2 + b * x + c
+
+
+class TestQuadraticFit:
+
+    @pytest.mark.parametrize("n", [6, 15, 120])
+    def test_matches_curve_fit(self, n):
+        rng = np.random.default_rng(n)
+        x = np.arange(n, dtype=float)
+        y = 0.02 * (x - n / 2) ** 2 + rng.normal(0, 1, n)
+        popt, _ = curve_fit(_parabola, x, y, maxfev=3000)
+        np.testing.assert_allclose(quadratic_fit(y), popt, rtol=1e-6, atol=1e-8)
+
+    def test_exact_parabola_recovered(self):
+        x = np.arange(40, dtype=float)
+        np.testing.assert_allclose(quadratic_fit(_parabola(x, 0.5, -3.0, 7.0)), [0.5, -3.0, 7.0], atol=1e-9)
+
+    def test_nan_and_short_input(self):
+        assert np.isnan(quadratic_fit([1.0, np.nan, 2.0, 3.0])).all()
+        with pytest.raises(ValueError):
+            quadratic_fit([1.0, 2.0])
+
+
+
+class TestBatchFit:
+
+    def test_rows_match_np_polyfit(self):
+        windows = np.random.default_rng(0).normal(100, 5, (50, 15))
+        batch = quadratic_fit_batch(windows)
+        assert batch.shape == (50, 3)
+        x = np.arange(15, dtype=float)
+        for row, window in zip(batch, windows):
+            np.testing.assert_allclose(row, np.polyfit(x, window, 2), rtol=1e-9, atol=1e-9)
+
+    def test_nan_row_and_bad_shape(self):
+        windows = np.ones((2, 15))
+        windows[1, 4] = np.nan
+        fits = quadratic_fit_batch(windows)
+        assert np.isfinite(fits[0]).all() and np.isnan(fits[1]).all()
+        with pytest.raises(ValueError):
+            quadratic_fit_batch(np.zeros((4, 2)))
@@ -0,0 +1,102 @@
+"""Tests for prescreen.py — every rejection must match an engine returning None."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+import prescreen
+from benchmarks.synthetic import PATTERNS, make_pattern_series
+from engines import engine2
+from engines.engine1 import calculate_sr_zones
+from engines.engine2 import detect_trendline, scan_near_breakout, scan_vcp
+from engines.engine3 import scan_pullback, scan_relaxed_pullback
+from engines.engine5 import scan_base_pattern
+from polyfit import quadratic_fit
+
+
+def _scaled(df, start, stop):
+    out = df.copy()
+    scale = np.linspace(start, stop, len(df))
+    for col in ("Open", "High", "Low", "Close", "Adj Close"):
+        out[col] = df[col].to_numpy() * scale
+    return out
+
+
+def _engine_results(ticker, df):
+    zones = calculate_sr_zones(ticker, df)
+    tl = detect_trendline(ticker, df)
+    return {
+        "vcp": scan_vcp(ticker, df, zones, trendline=tl),
+        "near_breakout": scan_near_breakout(ticker, df, zones, tl),
+        "pullback": scan_pullback(ticker, df, zones, tl),
+        "relaxed_pullback": scan_relaxed_pullback(ticker, df, zones, tl),
+        "base": scan_base_pattern(ticker, df),
+    }
+
+
+class TestSoundness:
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_rejected_engines_return_none(self, seed):
+        frames = {}
+        for pattern in PATTERNS:
+            df = make_pattern_series(pattern, 260 + 60 * seed, seed=seed)
+            frames[f"{pattern}{seed}"] = df
+            frames[f"{pattern}{seed}D"] = _scaled(df, 1.6, 1.0)
+        verdicts = prescreen.prescreen(frames)
+        assert set(verdicts) == set(frames)
+        for ticker, df in frames.items():
+            for engine, result in _engine_results(ticker, df).items():
+                if not verdicts[ticker][engine]:
+                    assert result is None, f"{ticker} {engine}"
+
+    def test_downtrend_rejected_by_trend_rules(self):
+        df = _scaled(make_pattern_series("walk", 300, seed=0), 2.0, 1.0)
+        verdict = prescreen.prescreen({"DOWN": df})["DOWN"]
+        assert not any(verdict[e] for e in ("vcp", "pullback", "relaxed_pullback", "base"))
+        # The watchlist pass is proximity-only, so zones and trendline are still needed
+        assert verdict["near_breakout"] and verdict["sr_zones"] and verdict["trendline"]
+
+    def test_short_history_needs_nothing(self):
+        df = make_pattern_series("walk", 15, seed=0)
+        verdict = prescreen.prescreen({"SHORT": df})["SHORT"]
+        assert not any(verdict.values())
+
+
+class TestEvaluate:
+
+    def test_requires_is_union_of_consumers(self):
+        frames = {f"T{i}": make_pattern_series(p, 400, seed=i) for i, p in enumerate(PATTERNS)}
+        passed = prescreen.evaluate(prescreen.BarMatrix.from_frames(frames))
+        for key, consumers in prescreen.REQUIRES.items():
+            expected = np.logical_or.reduce([passed[e] for e in consumers])
+            np.testing.assert_array_equal(passed[key], expected)
+
+    def test_u_shape_matches_per_ticker_fit(self):
+        frames = {f"{p}{seed}": make_pattern_series(p, 300, seed=seed) for p in PATTERNS for seed in range(4)}
+        verdicts = prescreen.prescreen(frames)
+        assert any(v["vcp_u_shape"] for v in verdicts.values())
+        for ticker, df in frames.items():
+            close = df["Adj Close"].to_numpy()[-15:]
+            a, b, _ = quadratic_fit((close - close.mean()) / close.std())
+            expected = a > 0.005 and 0.0 <= -b / (2.0 * a) <= 15.0
+            assert verdicts[ticker]["vcp_u_shape"] == expected, ticker
+
+    def test_scan_vcp_skips_its_fit_given_the_verdict(self, monkeypatch):
+        df = make_pattern_series("vcp", 300, seed=0)   # reaches Path A's U-shape check
+        zones = calculate_sr_zones("T", df)
+        tl = detect_trendline("T", df)
+        verdict = prescreen.prescreen({"T": df})["T"]["vcp_u_shape"]
+        expected = scan_vcp("T", df, zones, trendline=tl)
+        calls = []
+        monkeypatch.setattr(engine2, "quadratic_fit", lambda y: calls.append(1) or quadratic_fit(y))
+        assert scan_vcp("T", df, zones, trendline=tl) == expected
+        assert calls == [1]
+        assert scan_vcp("T", df, zones, trendline=tl, u_shape=verdict) == expected
+        assert calls == [1]
+
+    def test_unscreenable_frames_are_omitted(self):
+        assert prescreen.prescreen({"NONE": None}) == {}
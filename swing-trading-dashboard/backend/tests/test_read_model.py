@@ -0,0 +1,168 @@
+"""Tests for read_model.py — snapshot views, rebuilds on a new scan, ETag/304 and filtered responses."""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from database import batch_save_setups, close_db, complete_scan_run, get_latest_setups, open_db, save_scan_run
+from read_model import SetupsReadModel
+from tests.conftest import make_setup
+
+
+SETUPS = [
+    make_setup("AAA", "VCP", sector="Tech"),
+    make_setup("BBB", "BASE", quality_score=60, base_type="FLAT_BASE"),
+    make_setup("CCC", "WATCHLIST", distance_pct=1.2),
+    make_setup("DDD", "PULLBACK"),
+    make_setup("EEE", "BASE", quality_score=85, base_type="CUP_HANDLE"),
+    make_setup("FFF", "WATCHLIST", distance_pct=0.4),
+    make_setup("GGG", "BASE"),
+    make_setup("HHH", "WATCHLIST"),  # no distance: sorts last
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "t.db")
+
+
+async def _scan(db_path, scan_ts, setups):
+    await save_scan_run(db_path, scan_ts)
+    await batch_save_setups(db_path, scan_ts, setups)
+    await complete_scan_run(db_path, scan_ts, len(setups))
+
+
+def _with_db(db_path, body):
+    async def go():
+        await open_db(db_path)
+        try:
+            return await body()
+        finally:
+            await close_db(db_path)
+    return asyncio.run(go())
+
+
+class TestSnapshot:
+
+    def test_views_match_the_old_endpoints(self, db_path):
+        model = SetupsReadModel()
+
+        async def body():
+            await _scan(db_path, "s1", SETUPS)
+            snap = await model.snapshot(db_path)
+            old = {
+                "all": await get_latest_setups(db_path),
+                "vcp": await get_latest_setups(db_path, "VCP"),
+                "pullback": await get_latest_setups(db_path, "PULLBACK"),
+                "base": sorted(await get_latest_setups(db_path, "BASE"),
+                               key=lambda x: x.get("quality_score", 0), reverse=True),
+                "watchlist": sorted(await get_latest_setups(db_path, "WATCHLIST"),
+                                    key=lambda x: x.get("distance_pct", 99)),
+            }
+            return snap, old
+
+        snap, old = _with_db(db_path, body)
+        assert snap.scan_timestamp == "s1"
+        for view, items in old.items():
+            assert snap.items[view] == items
+            key = "items" if view == "watchlist" else "setups"
+            assert json.loads(snap.bodies[view][0]) == {key: items, "count": len(items)}
+        assert [s["ticker"] for s in snap.items["base"]] == ["EEE", "BBB", "GGG"]
+        assert [s["ticker"] for s in snap.items["watchlist"]] == ["FFF", "CCC", "HHH"]
+
+    def test_reused_until_a_new_scan_completes(self, db_path):
+        model = SetupsReadModel()
+
+        async def body():
+            await _scan(db_path, "s1", SETUPS)
+            first = await model.snapshot(db_path)
+            again = await model.snapshot(db_path)
+            await save_scan_run(db_path, "s2")
+            await batch_save_setups(db_path, "s2", SETUPS[:1])
+            during = await model.snapshot(db_path)  # s2 not completed: keep serving s1
+            await complete_scan_run(db_path, "s2", 1)
+            after = await model.snapshot(db_path)
+            return first, again, during, after
+
+        first, again, during, after = _with_db(db_path, body)
+        assert again is first and during is first
+        assert after.scan_timestamp == "s2" and after.items["all"][0]["ticker"] == "AAA"
+        assert after.bodies["all"][1] != first.bodies["all"][1]
+        assert after.bodies["watchlist"][1] != first.bodies["watchlist"][1]
+
+    def test_picks_up_scans_written_by_another_process(self, db_path):
+        model = SetupsReadModel()
+
+        async def body():
+            await _scan(db_path, "s1", SETUPS)
+            first = await model.snapshot(db_path)
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("INSERT INTO scan_runs (scan_timestamp, completed) VALUES ('ext', 1)")
+            conn.close()
+            return first, await model.snapshot(db_path)
+
+        first, second = _with_db(db_path, body)
+        assert first.scan_timestamp == "s1"
+        assert second.scan_timestamp == "ext" and second.items["all"] == []
+
+    def test_empty_database(self, db_path):
+        snap = _with_db(db_path, lambda: SetupsReadModel().snapshot(db_path))
+        assert snap.scan_timestamp is None
+        assert json.loads(snap.bodies["watchlist"][0]) == {"items": [], "count": 0}
+
+
+class TestEndpoints:
+
+    def _request(self, if_none_match=None):
+        from starlette.requests import Request
+        headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+        return Request({"type": "http", "method": "GET", "headers": headers})
+
+    def test_etag_and_304(self, db_path, monkeypatch):
+        import main
+        monkeypatch.setattr(main, "DB_PATH", db_path)
+        monkeypatch.setattr(main, "_setups_model", SetupsReadModel())
+
+        async def body():
+            await _scan(db_path, "s1", SETUPS)
+            full = await main._setups_response(self._request(), "base", main.SetupsQuery())
+            etag = full.headers["etag"]
+            cached = await main._setups_response(self._request(f'"x", {etag}'), "base", main.SetupsQuery())
+            stale = await main._setups_response(self._request('"x"'), "base", main.SetupsQuery())
+            return full, cached, stale
+
+        full, cached, stale = _with_db(db_path, body)
+        assert full.status_code == 200 and full.headers["cache-control"] == "no-cache"
+        assert [s["ticker"] for s in json.loads(full.body)["setups"]] == ["EEE", "BBB", "GGG"]
+        assert cached.status_code == 304 and cached.body == b""
+        assert stale.status_code == 200 and stale.body == full.body
+
+    def test_filters_and_pages_in_sql(self, db_path, monkeypatch):
+        import main
+        monkeypatch.setattr(main, "DB_PATH", db_path)
+        monkeypatch.setattr(main, "_setups_model", SetupsReadModel())
+
+        async def body():
+            await _scan(db_path, "s1", SETUPS)
+            page = await main._setups_response(
+                self._request(), "base", main.SetupsQuery(limit=1, offset=1, details=False)
+            )
+            closest = await main._setups_response(self._request(), "watchlist", main.SetupsQuery(limit=1))
+            return page, closest
+
+        page, closest = _with_db(db_path, body)
+        assert "etag" not in page.headers
+        assert json.loads(page.body) == {"setups": [{**SETUPS[1], "scan_timestamp": "s1"}], "count": 1, "total": 3}
+        assert [i["ticker"] for i in json.loads(closest.body)["items"]] == ["FFF"]
+
+    def test_etag_matching(self):
+        import main
+        assert main._etag_matches('"a", "b"', '"b"')
+        assert main._etag_matches('W/"b"', '"b"')
+        assert main._etag_matches("*", '"b"')
+        assert not main._etag_matches("", '"b"')
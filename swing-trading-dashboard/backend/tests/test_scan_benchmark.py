@@ -0,0 +1,74 @@
+"""Smoke tests for benchmarks/scan_benchmark.py — fixture replay scan and baseline check."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from benchmarks import synthetic
+from benchmarks.scan_benchmark import compare, engine_cpu_timers, ensure_fixtures, run_scan_benchmark
+
+
+class TestSynthetic:
+
+    def test_seeded_and_superset(self):
+        small = synthetic.make_universe(3, seed=1, n_bars=100)
+        large = synthetic.make_universe(5, seed=1, n_bars=100)
+        for ticker, df in small.items():
+            np.testing.assert_array_equal(df["Close"].to_numpy(), large[ticker]["Close"].to_numpy())
+
+    def test_bar_shape(self):
+        df = synthetic.make_ticker(0, n_bars=250)
+        assert len(df) == 250
+        assert (df["High"] >= df[["Open", "Close"]].max(axis=1)).all()
+        assert (df["Low"] <= df[["Open", "Close"]].min(axis=1)).all()
+        assert str(df.index.tz) == synthetic.TZ
+
+
+class TestCompare:
+
+    BASE = {"stages": {"total": 10.0, "db_save": 0.01}, "engine_cpu": {"scan_vcp": 2.0}, "peak_rss_mb": 200}
+
+    def test_within_tolerance(self):
+        result = {"stages": {"total": 14.0, "db_save": 0.2}, "engine_cpu": {"scan_vcp": 2.5}, "peak_rss_mb": 250}
+        assert compare(result, self.BASE, tolerance=0.5, min_slack=0.25) == []
+
+    def test_flags_regressions(self):
+        result = {"stages": {"total": 20.0, "db_save": 0.01}, "engine_cpu": {"scan_vcp": 5.0}, "peak_rss_mb": 400}
+        failures = compare(result, self.BASE, tolerance=0.5, min_slack=0.25)
+        assert len(failures) == 3
+        assert failures[0].startswith("stages.total")
+
+    def test_flags_metrics_missing_from_baseline(self):
+        result = {"stages": {"total": 10.0, "sr_zones": 0.5}, "engine_cpu": {"scan_vcp": 2.0}, "peak_rss_mb": 200}
+        failures = compare(result, {**self.BASE, "stages": {"total": 10.0, "compact": 1.0}},
+                           tolerance=0.5, min_slack=0.25)
+        assert len(failures) == 1 and failures[0].startswith("stages.sr_zones")
+        assert "no baseline entry" in failures[0]
+
+
+class TestEngineCpuTimers:
+
+    def test_wraps_and_restores(self):
+        class Module:
+            @staticmethod
+            def work(n):
+                return sum(range(n))
+
+        original = Module.work
+        with engine_cpu_timers(Module, names=("work",)) as cpu:
+            assert Module.work(100_000) == sum(range(100_000))
+        assert cpu["work"] > 0
+        assert Module.work is original
+
+
+class TestScanBenchmark:
+
+    def test_small_fixture_scan(self, tmp_path):
+        tickers = ensure_fixtures(4, root=str(tmp_path), seed=3)
+        result = run_scan_benchmark(tickers, fixture_dir=str(tmp_path))
+        assert result["tickers"] == 4
+        for stage in ("regime", "spy", "fetch", "analysis", "process", "total"):
+            assert stage in result["stages"]
+        assert result["engine_cpu"]["calculate_sr_zones_batch"] > 0
@@ -0,0 +1,131 @@
+"""Tests for the fetch → compute pipeline in main._run_scan."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from benchmarks.scan_benchmark import ensure_fixtures, run_scan_benchmark
+
+
+@pytest.fixture(scope="module")
+def universe(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("fixtures"))
+    return ensure_fixtures(12, root=root, seed=5), root
+
+
+class TestScanPipeline:
+
+    def test_tiny_queue_gives_same_results(self, universe, monkeypatch):
+        import main
+        tickers, root = universe
+        baseline = run_scan_benchmark(tickers, fixture_dir=root)
+
+        monkeypatch.setattr(main, "FETCH_BATCH_SIZE", 5)
+        monkeypatch.setattr(main, "SCAN_QUEUE_SIZE", 1)
+        monkeypatch.setattr(main, "SCAN_COMPUTE_WORKERS", 1)
+        narrow = run_scan_benchmark(tickers, fixture_dir=root)
+
+        assert narrow["setups"] == baseline["setups"]
+        assert main._scan_state["progress"] == len(tickers)
+        assert "compute_idle" in narrow["stages"]
+
+    def test_producer_failure_stops_workers(self, universe, monkeypatch):
+        import main
+        tickers, root = universe
+
+        async def broken_fetch(batch):
+            raise RuntimeError("provider down")
+
+        monkeypatch.setattr(main, "_fetch_many", broken_fetch)
+        with pytest.raises(RuntimeError, match="provider down"):
+            run_scan_benchmark(tickers, fixture_dir=root)
+
+
+def _scan(main, root, db_path, store_dir, scan_ts, tickers, incremental):
+    """Run main._run_scan against fixture *root* with its own DB and bar store."""
+    import asyncio
+
+    from bar_store import BarStore
+    from database import init_db
+    from market_data import FixtureProvider, get_provider, set_provider
+
+    previous = get_provider()
+    saved = (main.DB_PATH, main._bar_store, main._semaphore)
+    set_provider(FixtureProvider(root))
+    main.DB_PATH = db_path
+    main._bar_store = BarStore(store_dir, max_age_seconds=0)
+
+    async def _go():
+        main._semaphore = asyncio.Semaphore(4)
+        await init_db(db_path)
+        await main._run_scan(scan_ts, tickers, incremental)
+
+    try:
+        asyncio.run(_go())
+    finally:
+        set_provider(previous)
+        main.DB_PATH, main._bar_store, main._semaphore = saved
+    assert main._scan_state["last_error"] is None
+
+
+def _rows(db_path, table, scan_ts):
+    import sqlite3
+    cols = {
+        "scan_setups": "ticker, setup_type, entry, stop_loss, take_profit, rr, setup_date, metadata",
+        "sr_zones": "ticker, level, zone_upper, zone_lower, zone_type",
+    }[table]
+    with sqlite3.connect(db_path) as db:
+        return sorted(db.execute(f"SELECT {cols} FROM {table} WHERE scan_timestamp = ?", (scan_ts,)).fetchall())
+
+
+class TestIncrementalScan:
+
+    def test_unchanged_tickers_are_copied_forward(self, universe, tmp_path, monkeypatch):
+        import analysis
+        import main
+        tickers, root = universe
+        db = str(tmp_path / "scan.db")
+        _scan(main, root, db, str(tmp_path / "store"), "2026-01-02T10:00:00", tickers, False)
+
+        calls, zoned = [], []
+        real = analysis.analyze_ticker
+        real_zones = main.calculate_sr_zones_batch
+        monkeypatch.setattr(main, "analyze_ticker", lambda t, *a: calls.append(t) or real(t, *a))
+        monkeypatch.setattr(main, "calculate_sr_zones_batch", lambda f: zoned.extend(f) or real_zones(f))
+        _scan(main, root, db, str(tmp_path / "store"), "2026-01-02T11:00:00", tickers, True)
+
+        assert calls == [] and zoned == []
+        for table in ("scan_setups", "sr_zones"):
+            assert _rows(db, table, "2026-01-02T11:00:00") == _rows(db, table, "2026-01-02T10:00:00")
+
+    def test_changed_ticker_is_reanalysed(self, universe, tmp_path, monkeypatch):
+        import shutil
+
+        import analysis
+        import main
+        from market_data import FixtureProvider, save_fixture
+        tickers, root = universe
+        work = str(tmp_path / "fixtures")
+        shutil.copytree(root, work)
+        db = str(tmp_path / "scan.db")
+        _scan(main, work, db, str(tmp_path / "store"), "2026-01-02T10:00:00", tickers, False)
+
+        changed = tickers[3]
+        df = FixtureProvider(work).history(changed, period="5y")
+        df.iloc[-1, df.columns.get_loc("Close")] *= 1.01
+        save_fixture(work, changed, df)
+
+        calls, zoned = [], []
+        real = analysis.analyze_ticker
+        real_zones = main.calculate_sr_zones_batch
+        monkeypatch.setattr(main, "analyze_ticker", lambda t, *a: calls.append(t) or real(t, *a))
+        monkeypatch.setattr(main, "calculate_sr_zones_batch", lambda f: zoned.extend(f) or real_zones(f))
+        _scan(main, work, db, str(tmp_path / "store"), "2026-01-02T11:00:00", tickers, True)
+        assert calls == [changed] and zoned == [changed]
+
+        # Same result as a full scan over the changed data
+        _scan(main, work, db, str(tmp_path / "store2"), "2026-01-02T12:00:00", tickers, False)
+        for table in ("scan_setups", "sr_zones"):
+            assert _rows(db, table, "2026-01-02T11:00:00") == _rows(db, table, "2026-01-02T12:00:00")
@@ -203,7 +203,7 @@ class TestFilterPriceVolume:
     """Tests for filter_price_volume (mocks yf.download)."""
 
     @patch("universe_builder.time.sleep")  # don't actually sleep in tests
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_filters_below_min_price(self, mock_download, _mock_sleep):
         """Ticker with close=$5 should be excluded by the price filter."""
         mock_download.return_value = _make_single_ticker_df(close=5.0, volume=1_000_000)
@@ -214,7 +214,7 @@ class TestFilterPriceVolume:
         assert result == []
 
     @patch("universe_builder.time.sleep")
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_filters_below_min_volume(self, mock_download, _mock_sleep):
         """Ticker with vol=100K should be excluded by the volume filter."""
         mock_download.return_value = _make_single_ticker_df(close=50.0, volume=100_000)
@@ -225,7 +225,7 @@ class TestFilterPriceVolume:
         assert result == []
 
     @patch("universe_builder.time.sleep")
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_passes_valid_ticker(self, mock_download, _mock_sleep):
         """Ticker with close=$150 and vol=2M should pass both filters."""
         mock_download.return_value = _make_single_ticker_df(close=150.0, volume=2_000_000)
@@ -235,7 +235,7 @@ class TestFilterPriceVolume:
         assert result == ["GOOD"]
 
     @patch("universe_builder.time.sleep")
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_handles_failed_download(self, mock_download, _mock_sleep):
         """Empty DataFrame from yf.download should not crash."""
         mock_download.return_value = pd.DataFrame()
@@ -245,7 +245,7 @@ class TestFilterPriceVolume:
         assert result == []
 
     @patch("universe_builder.time.sleep")
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_handles_single_ticker_batch(self, mock_download, _mock_sleep):
         """Single ticker produces flat (non-MultiIndex) columns — must work."""
         df = _make_single_ticker_df(close=200.0, volume=3_000_000)
@@ -258,7 +258,7 @@ class TestFilterPriceVolume:
         assert result == ["SOLO"]
 
     @patch("universe_builder.time.sleep")
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_skips_ticker_with_too_few_rows(self, mock_download, _mock_sleep):
         """Ticker with fewer than 10 rows of data should be skipped."""
         mock_download.return_value = _make_single_ticker_df(close=100.0, volume=1_000_000, rows=5)
@@ -268,7 +268,7 @@ class TestFilterPriceVolume:
         assert result == []
 
     @patch("universe_builder.time.sleep")
-    @patch("universe_builder.yf.download")
+    @patch("market_data.yf.download")
     def test_exception_in_download_skips_batch(self, mock_download, _mock_sleep):
         """If yf.download raises an exception, the batch is skipped gracefully."""
         mock_download.side_effect = Exception("Network timeout")
@@ -289,7 +289,7 @@ class TestBuildSectorMap:
     def test_reuses_existing_sectors(self):
         """Known tickers should use existing sector, not re-fetch."""
         existing = {"AAPL": "Technology", "MSFT": "Technology"}
-        with patch("universe_builder.yf.Ticker") as mock_yf:
+        with patch("market_data.yf.Ticker") as mock_yf:
             result = build_sector_map(["AAPL", "MSFT"], existing_sectors=existing)
             # yf.Ticker should NOT be called since both are in existing
             mock_yf.assert_not_called()
@@ -300,7 +300,7 @@ class TestBuildSectorMap:
         existing = {"AAPL": "Technology"}
         mock_ticker = MagicMock()
         mock_ticker.info = {"sector": "Consumer Cyclical", "quoteType": "EQUITY"}
-        with patch("universe_builder.yf.Ticker", return_value=mock_ticker):
+        with patch("market_data.yf.Ticker", return_value=mock_ticker):
             with patch("universe_builder.time.sleep"):
                 result = build_sector_map(["AAPL", "TSLA"], existing_sectors=existing)
                 assert result["AAPL"] == "Technology"  # from existing
@@ -310,7 +310,7 @@ class TestBuildSectorMap:
         """ETFs should get sector 'ETF'."""
         mock_ticker = MagicMock()
         mock_ticker.info = {"quoteType": "ETF", "sector": ""}
-        with patch("universe_builder.yf.Ticker", return_value=mock_ticker):
+        with patch("market_data.yf.Ticker", return_value=mock_ticker):
             with patch("universe_builder.time.sleep"):
                 result = build_sector_map(["SPY"], existing_sectors={})
                 assert result["SPY"] == "ETF"
@@ -320,7 +320,7 @@ class TestBuildSectorMap:
         mock_ticker = MagicMock()
         mock_ticker.info.__getitem__ = MagicMock(side_effect=Exception("fail"))
         mock_ticker.info.get = MagicMock(return_value="")
-        with patch("universe_builder.yf.Ticker", return_value=mock_ticker):
+        with patch("market_data.yf.Ticker", return_value=mock_ticker):
             with patch("universe_builder.time.sleep"):
                 result = build_sector_map(["MYSTERY"], existing_sectors={})
                 assert result["MYSTERY"] == "Unknown"
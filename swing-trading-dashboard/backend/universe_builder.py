@@ -18,7 +18,8 @@ from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from market_data import get_provider
 
 # ---------------------------------------------------------------------------
 # Module-level constants
@@ -174,7 +175,7 @@ def filter_price_volume(
 ) -> List[str]:
     """Filter tickers by minimum price and average daily volume.
 
-    Downloads 3 months of daily data from yfinance in batches of
+    Downloads 3 months of daily data from the market-data provider in batches of
     ``BATCH_SIZE``, then checks each ticker's last close price and
     50-day average volume against the supplied thresholds.
 
@@ -194,21 +195,12 @@ def filter_price_volume(
         )
 
         try:
-            df = yf.download(
-                " ".join(batch),
-                period="3mo",
-                interval="1d",
-                auto_adjust=False,
-                prepost=False,
-                progress=False,
-                threads=True,
-                group_by="ticker",
-            )
+            frames = get_provider().download(batch, period="3mo")
         except Exception:
-            logger.exception("yf.download failed for batch %d", batch_idx + 1)
+            logger.exception("Data download failed for batch %d", batch_idx + 1)
             continue
 
-        if df is None or df.empty:
+        if not frames:
             logger.warning("Empty result for batch %d — skipping", batch_idx + 1)
             if batch_idx < total_batches - 1:
                 time.sleep(BATCH_DELAY)
@@ -216,19 +208,10 @@ def filter_price_volume(
 
         for ticker in batch:
             try:
-                # --- extract per-ticker sub-DataFrame ---
-                if len(batch) == 1:
-                    # Single ticker: yfinance may return flat columns or
-                    # a MultiIndex with one ticker at level 0.
-                    if isinstance(df.columns, pd.MultiIndex):
-                        ticker_df = df[ticker].copy()
-                    else:
-                        ticker_df = df.copy()
-                else:
-                    # Multiple tickers: group_by="ticker" gives MultiIndex
-                    if ticker not in df.columns.get_level_values(0):
-                        continue
-                    ticker_df = df[ticker].copy()
+                # Provider returns per-ticker frames; absent tickers had no data
+                ticker_df = frames.get(ticker)
+                if ticker_df is None:
+                    continue
 
                 # Drop rows that are entirely NaN (non-trading days / missing)
                 ticker_df = ticker_df.dropna(how="all")
@@ -281,7 +264,7 @@ def build_sector_map(
 
     If *existing_sectors* is ``None``, tries to load ``sectors.json`` from the
     current directory as a base map.  Tickers already present in the map are
-    reused; only genuinely new tickers are fetched from yfinance.
+    reused; only genuinely new tickers are fetched from the data provider.
 
     ETFs (``quoteType == "ETF"``) get sector ``"ETF"``; tickers whose sector
     cannot be determined get ``"Unknown"``.
@@ -324,7 +307,7 @@ def build_sector_map(
 
         for ticker in batch:
             try:
-                info = yf.Ticker(ticker).info
+                info = get_provider().info(ticker)
                 quote_type = info.get("quoteType", "")
                 if quote_type == "ETF":
                     sector_map[ticker] = "ETF"